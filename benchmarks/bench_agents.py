@@ -0,0 +1,67 @@
+# benchmarks/bench_agents.py
+"""Agent scoring and ensemble combine, scalar and batch paths, and ensemble weight learning."""
+import numpy as np
+from agent_lab.agents.base import decide_many
+from agent_lab.agents.registry import get_agent
+from agent_lab.ensemble.learning import OnlineWeights, member_votes
+from agent_lab.ensemble.oversight import OversightAgent
+from .common import SYMBOLS, fundamentals
+
+class AgentScoring:
+    params = (SYMBOLS, ["buffett", "ackman", "cathie", "oversight"])
+    param_names = ["symbols", "agent"]
+
+    def setup(self, n, name):
+        self.frame = fundamentals(n)
+        self.symbols = list(self.frame.index)
+        self.rows = {s: self.frame.loc[s].to_dict() for s in self.symbols}
+        self.agent = get_agent(name)
+
+    def time_decide_batch(self, n, name):
+        decide_many(self.agent, self.symbols, self.frame)
+
+    def time_decide_scalar(self, n, name):
+        for s in self.symbols:
+            self.agent.decide(s, data=self.rows[s])
+
+class EnsembleCombine:
+    params = [SYMBOLS]
+    param_names = ["symbols"]
+
+    def setup(self, n):
+        frame = fundamentals(n)
+        symbols = list(frame.index)
+        self.oversight = OversightAgent(agents=[get_agent("buffett"), get_agent("ackman")])
+        self.batches = {a.name: decide_many(a, symbols, frame) for a in self.oversight.agents}
+        self.votes = {}
+        for name, batch in self.batches.items():
+            for d in batch:
+                self.votes.setdefault(d.symbol, []).append((name, d))
+
+    def time_combine(self, n):
+        self.oversight.combine(self.votes)
+
+    def time_combine_batch(self, n):
+        self.oversight.combine_batch(self.batches)
+
+class EnsembleLearning:
+    params = [SYMBOLS]
+    param_names = ["symbols"]
+
+    def setup(self, n):
+        frame = fundamentals(n)
+        symbols = list(frame.index)
+        self.learner = OnlineWeights(["buffett", "ackman"])
+        self.oversight = OversightAgent(agents=[get_agent("buffett"), get_agent("ackman")], learner=self.learner)
+        self.batches = {a.name: decide_many(a, symbols, frame) for a in self.oversight.agents}
+        self.votes = member_votes(self.batches, self.learner.agents, symbols)
+        self.returns = np.random.default_rng(0).normal(0.0, 0.05, n)
+        self.sectors = frame["sector"]
+        self.sector_values = self.sectors.to_numpy(dtype=object)
+        self.learner.update(self.votes, self.returns, self.sector_values)
+
+    def time_update(self, n):
+        self.learner.update(self.votes, self.returns, self.sector_values)
+
+    def time_combine_batch_learned(self, n):
+        self.oversight.combine_batch(self.batches, sectors=self.sectors)
@@ -0,0 +1,36 @@
+# benchmarks/bench_api.py
+"""POST /generate end to end, with synthetic fundamentals and a stubbed LLM."""
+import os
+import shutil
+import tempfile
+from .common import source
+
+async def _stub_rationale(metrics, action):
+    return f"Stub rationale: {action}."
+
+class GenerateEndpoint:
+    params = ([10, 500], [False, True])
+    param_names = ["symbols", "include_oversight"]
+    timeout = 300
+
+    def setup(self, n, include_oversight):
+        from fastapi.testclient import TestClient
+        from agent_lab.api import main
+        from agent_lab.data_connectors.sources import set_data_source
+
+        set_data_source(source(n))
+        main.generate_gemini_rationale = _stub_rationale
+        self.client = TestClient(main.app)
+        self.payload = {"agent": "buffett", "universe": source(n).universe(), "include_oversight": include_oversight}
+        # /generate writes its CSVs to the working directory
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp(prefix="agent_lab_bench_")
+        os.chdir(self.dir)
+
+    def teardown(self, n, include_oversight):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def time_generate(self, n, include_oversight):
+        resp = self.client.post("/generate", json=self.payload)
+        resp.raise_for_status()
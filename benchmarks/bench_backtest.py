@@ -0,0 +1,71 @@
+# benchmarks/bench_backtest.py
+"""BacktestEngine.run over synthetic panels, cold and from the result cache, and intraday streaming."""
+import shutil
+import tempfile
+from agent_lab.agents.base import decide_many
+from agent_lab.agents.registry import get_agent
+from agent_lab.backtesting.engine import BacktestEngine
+from agent_lab.backtesting.result_cache import BacktestCache
+from agent_lab.backtesting.streaming import stream_backtest
+from agent_lab.data_connectors.panel_store import PartitionedPanel
+from agent_lab.data_connectors.sources import use_data_source
+from .common import SYMBOLS, YEARS, fundamentals, prices, source
+
+# (symbols, years) pairs too large to run in a benchmark timeout
+_SKIP = {(5000, 10), (5000, 30)}
+
+class BacktestRun:
+    params = (SYMBOLS, YEARS)
+    param_names = ["symbols", "years"]
+    timeout = 300
+    number = 1
+    repeat = (1, 5, 30.0)
+
+    def setup(self, n, years):
+        if (n, years) in _SKIP:
+            raise NotImplementedError
+        self.prices = prices(n, years)
+        self.funds = fundamentals(n)
+        self.agent = get_agent("buffett")
+        decisions = decide_many(self.agent, list(self.prices.columns), self.funds)
+        self.decider = lambda dt: decisions
+        self.cache_dir = tempfile.mkdtemp(prefix="agent_lab_bench_")
+        self.cache = BacktestCache(self.cache_dir)
+        BacktestEngine(self.prices).run(self.decider, agent=self.agent, inputs=self.funds, cache=self.cache)
+
+    def teardown(self, n, years):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def time_run(self, n, years):
+        BacktestEngine(self.prices).run(self.decider)
+
+    def time_run_cached(self, n, years):
+        BacktestEngine(self.prices).run(self.decider, agent=self.agent, inputs=self.funds, cache=self.cache)
+
+    def peakmem_run(self, n, years):
+        BacktestEngine(self.prices).run(self.decider)
+
+class StreamRun:
+    """Three months of 5-minute bars streamed a month at a time: time and peak memory stay per-partition."""
+    params = ([10, 500], [None, "1D"])
+    param_names = ["symbols", "rebalance"]
+    timeout = 300
+    number = 1
+    repeat = (1, 3, 30.0)
+
+    def setup(self, n, rebalance):
+        self.path = tempfile.mkdtemp(prefix="agent_lab_bench_")
+        src = source(n)
+        with use_data_source(src):
+            self.panel = PartitionedPanel.build(self.path, src.universe(), "2024-10-01", "2024-12-31", interval="5m")
+        decisions = decide_many(get_agent("buffett"), self.panel.symbols, fundamentals(n))
+        self.decider = lambda dt: decisions
+
+    def teardown(self, n, rebalance):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def time_stream(self, n, rebalance):
+        stream_backtest(self.panel, self.decider, rebalance=rebalance)
+
+    def peakmem_stream(self, n, rebalance):
+        stream_backtest(self.panel, self.decider, rebalance=rebalance)
@@ -0,0 +1,73 @@
+# benchmarks/bench_data.py
+"""Fundamentals and price cache loads (disk and in-memory)."""
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from agent_lab.data_connectors import cache, price_data
+from agent_lab.data_connectors.offline import set_offline
+from agent_lab.data_connectors.sources import set_data_source
+from .common import SYMBOLS, raw_fundamentals, source
+
+class FundamentalsCache:
+    params = [SYMBOLS]
+    param_names = ["symbols"]
+
+    def setup(self, n):
+        # a fresh on-disk cache in the format get_fundamentals writes
+        self.dir = tempfile.mkdtemp(prefix="agent_lab_bench_")
+        now = time.time()
+        for s, raw in raw_fundamentals(n).items():
+            with open(os.path.join(self.dir, f"{s}.json"), "w") as f:
+                json.dump({"fetched_at": now, "raw": raw}, f)
+        self.symbols = sorted(raw_fundamentals(n))
+        self._saved_dir = cache.DISK_CACHE_DIR
+        cache.DISK_CACHE_DIR = self.dir
+        set_data_source("live")
+        set_offline(True)
+
+    def teardown(self, n):
+        cache.DISK_CACHE_DIR = self._saved_dir
+        set_offline(False)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def time_load_disk(self, n):
+        cache._inmem.clear()
+        for s in self.symbols:
+            cache.get_fundamentals(s)
+
+    def time_load_memory(self, n):
+        for s in self.symbols:
+            cache.get_fundamentals(s)
+
+class PriceCache:
+    params = ([10, 500], [1, 10, 30])
+    param_names = ["symbols", "years"]
+
+    def setup(self, n, years):
+        self.dir = tempfile.mkdtemp(prefix="agent_lab_bench_")
+        src = source(n, years)
+        self.symbols = src.universe()
+        for s in self.symbols:
+            with open(os.path.join(self.dir, f"{s}.pkl"), "wb") as f:
+                pickle.dump(src.price_history(s), f)
+        self._saved_dir = price_data.CACHE_DIR
+        price_data.CACHE_DIR = self.dir
+        set_data_source("live")
+        set_offline(True)
+
+    def teardown(self, n, years):
+        price_data.CACHE_DIR = self._saved_dir
+        set_offline(False)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def time_load_disk(self, n, years):
+        price_data.clear_price_cache()
+        for s in self.symbols:
+            price_data.get_price_history(s, start="1990-01-01", end="2100-01-01")
+
+    def time_load_memory(self, n, years):
+        for s in self.symbols:
+            price_data.get_price_history(s, start="1990-01-01", end="2100-01-01")
@@ -0,0 +1,39 @@
+# benchmarks/common.py
+"""
+Synthetic fixtures shared by the benchmarks, built from SyntheticSource so every
+run (and every commit) sees exactly the same data. Built once per process.
+"""
+from functools import lru_cache
+import pandas as pd
+from agent_lab.data_connectors.normalize import normalize_frame
+from agent_lab.data_connectors.sources import SyntheticSource
+
+SYMBOLS = [10, 500, 5000]
+YEARS = [1, 10, 30]
+
+@lru_cache(maxsize=None)
+def source(n_symbols: int, years: int = 1) -> SyntheticSource:
+    return SyntheticSource(n_symbols=n_symbols, years=years)
+
+def raw_fundamentals(n_symbols: int) -> dict:
+    """{symbol: {"profile", "ratios", "insider"}} as Finnhub would return it."""
+    src = source(n_symbols)
+    return {
+        s: {
+            "profile": src.company_profile2(s),
+            "ratios": src.company_basic_financials(s),
+            "insider": src.stock_insider_transactions(s)["data"],
+        }
+        for s in src.universe()
+    }
+
+@lru_cache(maxsize=None)
+def fundamentals(n_symbols: int) -> pd.DataFrame:
+    """Normalized, typed fundamentals frame indexed by symbol (what agents score)."""
+    return normalize_frame(raw_fundamentals(n_symbols), as_of=source(n_symbols).as_of)
+
+@lru_cache(maxsize=None)
+def prices(n_symbols: int, years: int) -> pd.DataFrame:
+    """Adj Close panel, dates x symbols."""
+    src = source(n_symbols, years)
+    return pd.DataFrame({s: src.price_history(s)["Adj Close"] for s in src.universe()})
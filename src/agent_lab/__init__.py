@@ -1 +1,11 @@
+import importlib
+
 __all__ = ["agents", "ensemble", "data_connectors", "backtesting"]
+
+def __getattr__(name):
+    # submodules load on first access, so `import agent_lab` stays cheap
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
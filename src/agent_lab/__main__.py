@@ -0,0 +1,4 @@
+import sys
+from agent_lab.cli import main
+
+sys.exit(main())
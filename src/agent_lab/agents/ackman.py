@@ -1,8 +1,12 @@
 from __future__ import annotations
-from typing import Dict, Callable, Optional
-from .base import Agent, Decision, Action
+from typing import TYPE_CHECKING, Dict, Callable, Optional
+import numpy as np
+from .base import Agent, Decision, DecisionBatch, Action, reason_code, frame_column
 from agent_lab.data_connectors.cache import get_fundamentals
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # class AckmanAgent(Agent):
 #     name = "AckmanAgent"
 
@@ -114,6 +118,11 @@ from agent_lab.data_connectors.cache import get_fundamentals
 #             rationale=" | ".join(rationale),
 #         )
 
+_HIGH_ROE = reason_code("High ROE")
+_HIGH_ROIC = reason_code("High ROIC")
+_LOW_LEVERAGE = reason_code("Low leverage")
+_INSIDER_BUY = reason_code("Insider buying")
+
 class AckmanAgent:
     name = "ackman"
     def __init__(self):
@@ -129,20 +138,40 @@ class AckmanAgent:
         rationale = []
 
         if row.get("roe", 0) > 0.15:
-            score += 1; rationale.append("High ROE")
+            score += 1; rationale.append((_HIGH_ROE, None))
         if row.get("roic", 0) > 0.12:
-            score += 1; rationale.append("High ROIC")
+            score += 1; rationale.append((_HIGH_ROIC, None))
         if row.get("debt_to_equity", 1) < 0.5:
-            score += 1; rationale.append("Low leverage")
+            score += 1; rationale.append((_LOW_LEVERAGE, None))
         if row.get("recent_insider_buy", 0) > 0:
-            score += 1; rationale.append("Insider buying")
+            score += 1; rationale.append((_INSIDER_BUY, None))
 
         # Confidence scales with score
         confidence = min(0.3 + 0.15 * score, 0.9)
+        rationale = tuple(rationale)
 
         if score >= self.min_score_to_buy:
-            return Decision(symbol, Action.BUY, confidence, score, " | ".join(rationale))
+            return Decision(symbol, Action.BUY, confidence, score, rationale)
         elif score >= 1:
-            return Decision(symbol, Action.HOLD, 0.4, score, " | ".join(rationale))
+            return Decision(symbol, Action.HOLD, 0.4, score, rationale)
         else:
-            return Decision(symbol, Action.SELL, 0.25, score, " | ".join(rationale))
+            return Decision(symbol, Action.SELL, 0.25, score, rationale)
+
+    def decide_batch(self, frame: pd.DataFrame) -> DecisionBatch:
+        """Vectorized decide() over a fundamentals frame indexed by symbol."""
+        with np.errstate(invalid="ignore"):
+            passed = np.column_stack([
+                frame_column(frame, "roe") > 0.15,
+                frame_column(frame, "roic") > 0.12,
+                frame_column(frame, "debt_to_equity") < 0.5,
+                frame_column(frame, "recent_insider_buy") > 0,
+            ])
+        score = passed.sum(axis=1)
+
+        buy = score >= self.min_score_to_buy
+        hold = ~buy & (score >= 1)
+        actions = np.select([buy, hold], [Action.BUY.code, Action.HOLD.code], Action.SELL.code)
+        confidence = np.select([buy, hold], [np.minimum(0.3 + 0.15 * score, 0.9), 0.4], 0.25)
+
+        codes = np.where(passed, np.array([_HIGH_ROE, _HIGH_ROIC, _LOW_LEVERAGE, _INSIDER_BUY]), -1)
+        return DecisionBatch(frame.index, actions, confidence, score, codes)
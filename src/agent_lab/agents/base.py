@@ -1,23 +1,288 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Any, Protocol, List
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Any, Protocol, List, Iterable, Iterator, Sequence, Tuple, Union
+import numpy as np
 from datetime import date
+from agent_lab import metrics
+
+if TYPE_CHECKING:
+    # pandas is imported where it is used, so scoring one symbol never pays for it
+    import pandas as pd
 
 class Action(str, Enum):
     BUY = "BUY"
     SELL = "SELL"
     HOLD = "HOLD"
 
-@dataclass
+    @property
+    def code(self) -> int:
+        """Signed int8 code: BUY=1, HOLD=0, SELL=-1 (doubles as the vote)."""
+        return _ACTION_CODES[self]
+
+    @staticmethod
+    def from_code(code: int) -> "Action":
+        return _CODE_ACTIONS[int(code)]
+
+_ACTION_CODES = {Action.BUY: 1, Action.HOLD: 0, Action.SELL: -1}
+_CODE_ACTIONS = {v: k for k, v in _ACTION_CODES.items()}
+
+# --- Reason codes ---
+# Agents record *why* as (code, value) pairs instead of formatted strings; the
+# text is only produced when someone reads `rationale`.
+RATIONALE_SEP = " | "
+_REASON_TEMPLATES: List[str] = []
+_REASON_INDEX: Dict[str, int] = {}
+
+def reason_code(template: str) -> int:
+    """Register a rationale template (e.g. "ROE {:.2f}") and return its code. Idempotent."""
+    code = _REASON_INDEX.get(template)
+    if code is None:
+        code = len(_REASON_TEMPLATES)
+        _REASON_TEMPLATES.append(template)
+        _REASON_INDEX[template] = code
+    return code
+
+def format_reason(code: int, arg: Any = None) -> str:
+    template = _REASON_TEMPLATES[code]
+    if arg is None or (isinstance(arg, float) and np.isnan(arg)):
+        return template
+    return template.format(arg)
+
+Reasons = Union[str, Tuple[Tuple[int, Any], ...]]
+
+def _reason_pairs(reasons: Reasons) -> Tuple[Tuple[int, Any], ...]:
+    # fixed free-text rationales ("no data", ...) become templates without placeholders
+    if isinstance(reasons, str):
+        return ((reason_code(reasons.replace("{", "{{").replace("}", "}}")), None),) if reasons else ()
+    return reasons
+
+def format_reasons(reasons: Reasons) -> str:
+    if isinstance(reasons, str):
+        return reasons
+    return RATIONALE_SEP.join(format_reason(c, a) for c, a in reasons)
+
+@dataclass(frozen=True, slots=True)
 class Decision:
     symbol: str
     action: Action
     confidence: float          # 0..1
     score: float               # agent-internal score
-    rationale: str             # short, human-readable rationale
-    # extras: Dict[str, Any]     # extra debug/metrics
+    reasons: Reasons = ()      # plain text, or (reason_code, value) pairs formatted lazily
+
+    @property
+    def rationale(self) -> str:
+        """Short, human-readable rationale."""
+        return format_reasons(self.reasons)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "action": self.action.name,
+            "confidence": self.confidence,
+            "score": self.score,
+            "rationale": self.rationale,
+        }
+
+class DecisionBatch:
+    """
+    Struct-of-arrays decisions for many symbols: int8 action codes, float
+    confidence/score, and an (n, k) grid of reason codes (-1 = empty slot) with
+    their values. Rationale strings are only built on request.
+    """
+    __slots__ = ("symbols", "actions", "confidence", "score", "reason_codes", "reason_args", "_index")
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        actions: np.ndarray,
+        confidence: np.ndarray,
+        score: np.ndarray,
+        reason_codes: np.ndarray | None = None,
+        reason_args: np.ndarray | None = None,
+    ):
+        n = len(symbols)
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.actions = np.asarray(actions, dtype=np.int8)
+        self.confidence = np.asarray(confidence, dtype=np.float64)
+        self.score = np.asarray(score, dtype=np.float64)
+        if reason_codes is None:
+            reason_codes = np.full((n, 0), -1, dtype=np.int16)
+        reason_codes = np.asarray(reason_codes, dtype=np.int16)
+        self.reason_codes = reason_codes if reason_codes.ndim == 2 else reason_codes.reshape(n, -1 if n else 0)
+        if reason_args is None:
+            reason_args = np.full(self.reason_codes.shape, np.nan)
+        self.reason_args = np.asarray(reason_args, dtype=np.float64).reshape(self.reason_codes.shape)
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[Decision]:
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, i: int) -> Decision:
+        return Decision(
+            str(self.symbols[i]),
+            Action.from_code(self.actions[i]),
+            float(self.confidence[i]),
+            float(self.score[i]),
+            self.reasons(i),
+        )
+
+    @property
+    def index(self) -> pd.Index:
+        if self._index is None:
+            import pandas as pd
+            self._index = pd.Index(self.symbols, name="symbol")
+        return self._index
+
+    def get(self, symbol: str) -> Decision | None:
+        pos = self.index.get_indexer([symbol])[0]
+        return None if pos < 0 else self[pos]
+
+    def reasons(self, i: int) -> Reasons:
+        codes, args = self.reason_codes[i], self.reason_args[i]
+        return tuple((int(c), None if np.isnan(a) else float(a)) for c, a in zip(codes, args) if c >= 0)
+
+    def rationale(self, i: int) -> str:
+        return format_reasons(self.reasons(i))
+
+    def align(self, symbols: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Reorder onto `symbols`. Returns (present, actions, confidence, score);
+        symbols without a decision are marked absent and read as HOLD/0.
+        """
+        n = len(symbols)
+        if not len(self):
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=np.int8), np.zeros(n), np.zeros(n)
+        pos = self.index.get_indexer(symbols)
+        present = pos >= 0
+        take = np.where(present, pos, 0)
+        actions = np.where(present, self.actions[take], 0).astype(np.int8)
+        confidence = np.where(present, self.confidence[take], 0.0)
+        score = np.where(present, self.score[take], 0.0)
+        return present, actions, confidence, score
+
+    def take(self, positions: np.ndarray) -> "DecisionBatch":
+        return DecisionBatch(
+            self.symbols[positions], self.actions[positions], self.confidence[positions],
+            self.score[positions], self.reason_codes[positions], self.reason_args[positions],
+        )
+
+    def to_frame(self, rationale: bool = False) -> pd.DataFrame:
+        import pandas as pd
+        df = pd.DataFrame({
+            "action": pd.Categorical.from_codes(self.actions + 1, ["SELL", "HOLD", "BUY"]),
+            "confidence": self.confidence,
+            "score": self.score,
+        }, index=self.index)
+        if rationale:
+            df["rationale"] = [self.rationale(i) for i in range(len(self))]
+        return df
+
+    def to_dict(self) -> Dict[str, Decision]:
+        return {d.symbol: d for d in self}
+
+    @classmethod
+    def from_decisions(cls, decisions: Iterable[Decision]) -> "DecisionBatch":
+        decisions = list(decisions)
+        pairs = [_reason_pairs(d.reasons) for d in decisions]
+        n, width = len(decisions), max(map(len, pairs), default=0)
+        codes = np.full((n, width), -1, dtype=np.int16)
+        args = np.full((n, width), np.nan)
+        for i, reasons in enumerate(pairs):
+            for j, (c, a) in enumerate(reasons):
+                codes[i, j] = c
+                args[i, j] = np.nan if a is None else a
+        return cls(
+            [d.symbol for d in decisions],
+            np.fromiter((d.action.code for d in decisions), dtype=np.int8, count=n),
+            np.fromiter((d.confidence for d in decisions), dtype=np.float64, count=n),
+            np.fromiter((d.score for d in decisions), dtype=np.float64, count=n),
+            codes, args,
+        )
+
+    @classmethod
+    def coerce(cls, decisions) -> "DecisionBatch":
+        """Accept a DecisionBatch, a {symbol: Decision} dict or an iterable of Decisions."""
+        if isinstance(decisions, DecisionBatch):
+            return decisions
+        if isinstance(decisions, dict):
+            decisions = decisions.values()
+        return cls.from_decisions(decisions)
+
+    @classmethod
+    def concat(cls, batches: Sequence["DecisionBatch"]) -> "DecisionBatch":
+        width = max((b.reason_codes.shape[1] for b in batches), default=0)
+
+        def _pad(a, fill):
+            return np.pad(a, ((0, 0), (0, width - a.shape[1])), constant_values=fill)
+
+        return cls(
+            np.concatenate([b.symbols for b in batches]),
+            np.concatenate([b.actions for b in batches]),
+            np.concatenate([b.confidence for b in batches]),
+            np.concatenate([b.score for b in batches]),
+            np.concatenate([_pad(b.reason_codes, -1) for b in batches]),
+            np.concatenate([_pad(b.reason_args, np.nan) for b in batches]),
+        )
+
+def frame_column(frame: pd.DataFrame, col: str) -> np.ndarray:
+    """
+    Column as a float array (NaN for missing values or a missing column). Float
+    columns, such as the float32 metrics of a normalized frame, come back as
+    they are without a copy; treat the result as read-only.
+    """
+    import pandas as pd
+    if col not in frame.columns:
+        return np.full(len(frame), np.nan)
+    values = frame[col]
+    if values.dtype.kind == "f":
+        return values.to_numpy()
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        # nullable ints (Int64) and plain ints / bools
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+
+def decide_many(agent, symbols: Sequence[str], data=None) -> DecisionBatch:
+    """
+    Decisions for `symbols` as a DecisionBatch. `data` is a fundamentals frame
+    indexed by symbol or a {symbol: row} dict. Uses the agent's vectorized
+    decide_batch when it has one, else falls back to per-symbol decide().
+    """
+    with metrics.span("decide", agent=getattr(agent, "name", type(agent).__name__)):
+        return _decide_many(agent, symbols, data)
+
+def _decide_many(agent, symbols: Sequence[str], data=None) -> DecisionBatch:
+    import pandas as pd
+    symbols = list(symbols)
+    if hasattr(agent, "decide_batch") and data is not None:
+        if isinstance(data, dict):
+            data = pd.DataFrame.from_dict({s: r for s, r in data.items() if r is not None}, orient="index")
+        have = pd.Index(symbols).isin(data.index)
+        scored = agent.decide_batch(data.reindex(pd.Index(symbols)[have]))
+        if have.all():
+            return scored
+        missing = [s for s, h in zip(symbols, have) if not h]
+        n = len(missing)
+        no_data = DecisionBatch(
+            missing, np.zeros(n), np.full(n, 0.2), np.zeros(n),
+            np.full((n, 1), reason_code("no data")), None,
+        )
+        batch = DecisionBatch.concat([scored, no_data])
+        return batch.take(batch.index.get_indexer(symbols))
+
+    if isinstance(data, pd.DataFrame):
+        data = {s: data.loc[s].to_dict() for s in symbols if s in data.index}
+    decisions = []
+    for sym in symbols:
+        row = data.get(sym) if data is not None else None
+        try:
+            decisions.append(agent.decide(sym, data=row))
+        except TypeError:
+            decisions.append(agent.decide(sym))
+    return DecisionBatch.from_decisions(decisions)
 
 class Agent(Protocol):
     name: str
@@ -124,9 +124,20 @@
 #         )
 
 # src/agent_lab/agents/buffett.py
-from .base import Decision, Action
+from typing import TYPE_CHECKING
+import numpy as np
+from .base import Decision, DecisionBatch, Action, reason_code, frame_column
 from agent_lab.data_connectors.cache import get_fundamentals
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+_PE_OK = reason_code("PE {:.1f} ok")
+_ROE = reason_code("ROE {:.2f}")
+_ROIC = reason_code("ROIC {:.2f}")
+_DEBT = reason_code("Debt/Equity {:.2f}")
+_REV_STABLE = reason_code("Revenue stable")
+
 class BuffettAgent:
     name = "buffett"
     def __init__(self):
@@ -141,20 +152,20 @@ class BuffettAgent:
 
     def _score(self, row):
         score = 0
-        rationale = []
+        reasons = []
 
         if row.get("pe") is not None and row["pe"] < self.criteria["pe_max"]:
-            score += 1; rationale.append(f"PE {row['pe']:.1f} ok")
+            score += 1; reasons.append((_PE_OK, row["pe"]))
         if row.get("roe", 0) > self.criteria["roe_min"]:
-            score += 1; rationale.append(f"ROE {row['roe']:.2f}")
+            score += 1; reasons.append((_ROE, row["roe"]))
         if row.get("roic", 0) > self.criteria["roic_min"]:
-            score += 1; rationale.append(f"ROIC {row['roic']:.2f}")
+            score += 1; reasons.append((_ROIC, row["roic"]))
         if row.get("debt_to_equity", 2) < self.criteria["debt_to_equity_max"]:
-            score += 1; rationale.append(f"Debt/Equity {row['debt_to_equity']:.2f}")
+            score += 1; reasons.append((_DEBT, row["debt_to_equity"]))
         if row.get("revenue_stability", 1) < 0.5:
-            score += 1; rationale.append("Revenue stable")
+            score += 1; reasons.append((_REV_STABLE, None))
 
-        return score, " | ".join(rationale)
+        return score, tuple(reasons)
 
     def decide(self, symbol, data=None):
         row = data or get_fundamentals(symbol)
@@ -171,3 +182,32 @@ class BuffettAgent:
             return Decision(symbol, Action.HOLD, 0.45, score, rationale)
         else:
             return Decision(symbol, Action.SELL, 0.2, score, rationale)
+
+    def decide_batch(self, frame: "pd.DataFrame") -> DecisionBatch:
+        """Vectorized decide() over a fundamentals frame indexed by symbol."""
+        values = np.column_stack([
+            frame_column(frame, "pe"),
+            frame_column(frame, "roe"),
+            frame_column(frame, "roic"),
+            frame_column(frame, "debt_to_equity"),
+            frame_column(frame, "revenue_stability"),
+        ])
+        c = self.criteria
+        with np.errstate(invalid="ignore"):
+            passed = np.column_stack([
+                values[:, 0] < c["pe_max"],
+                values[:, 1] > c["roe_min"],
+                values[:, 2] > c["roic_min"],
+                values[:, 3] < c["debt_to_equity_max"],
+                values[:, 4] < 0.5,
+            ])
+        score = passed.sum(axis=1)
+
+        buy = score >= c["min_score_to_buy"]
+        hold = ~buy & (score >= 2)
+        actions = np.select([buy, hold], [Action.BUY.code, Action.HOLD.code], Action.SELL.code)
+        confidence = np.select([buy, hold], [np.minimum(0.2 + 0.15 * score, 0.75), 0.45], 0.2)
+
+        codes = np.where(passed, np.array([_PE_OK, _ROE, _ROIC, _DEBT, _REV_STABLE]), -1)
+        values[:, 4] = np.nan  # "Revenue stable" takes no value
+        return DecisionBatch(frame.index, actions, confidence, score, codes, values)
@@ -1,12 +1,26 @@
 # src/agent_lab/agents/cathie.py
-from .base import Decision, Action
+from typing import TYPE_CHECKING
+from .base import Decision, DecisionBatch, Action, reason_code, frame_column
 from agent_lab.data_connectors.cache import get_fundamentals
-import random
+from agent_lab.seeding import DEFAULT_SEED, unit_hash, unit_hash_array
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_REV_EXPLOSIVE = reason_code("Explosive rev growth {:.2f}")
+_REV_HEALTHY = reason_code("Healthy rev growth {:.2f}")
+_FCF_POSITIVE = reason_code("Positive FCF")
+_FCF_TOLERATED = reason_code("Tolerates negative FCF for growth")
+_PE_VERY_HIGH = reason_code("Very high PE {:.1f}")
+_PE_UNDERVALUED = reason_code("Undervalued PE")
 
 class CathieAgent:
     name = "cathie"
 
-    def __init__(self):
+    def __init__(self, seed: int = DEFAULT_SEED):
+        # Tie-breaking jitter is drawn per (seed, symbol), so decisions are reproducible
+        self.seed = seed
         # Strong bias toward high-growth stocks
         self.min_rev_growth = 0.25
         self.weights = {
@@ -28,36 +42,77 @@ class CathieAgent:
         rev = row.get("revenue_growth_cagr") or 0
         if rev > 0.35:
             score += self.weights["rev_high"]
-            rationale.append(f"Explosive rev growth {rev:.2f}")
+            rationale.append((_REV_EXPLOSIVE, rev))
         elif rev > self.min_rev_growth:
             score += self.weights["rev_mod"]
-            rationale.append(f"Healthy rev growth {rev:.2f}")
+            rationale.append((_REV_HEALTHY, rev))
 
         # FCF handling
         fcf = row.get("free_cashflow")
         if fcf and fcf > 0:
             score += 1
-            rationale.append("Positive FCF")
+            rationale.append((_FCF_POSITIVE, None))
         elif rev > 0.35:
             score += self.weights["neg_fcf_tolerance"]
-            rationale.append("Tolerates negative FCF for growth")
+            rationale.append((_FCF_TOLERATED, None))
 
         # PE consideration
         pe = row.get("pe")
         if pe and pe > 80:
             score -= 0.5
-            rationale.append(f"Very high PE {pe:.1f}")
+            rationale.append((_PE_VERY_HIGH, pe))
         elif pe and pe < 20:
             score += 0.5
-            rationale.append("Undervalued PE")
+            rationale.append((_PE_UNDERVALUED, None))
 
         # Slight randomization to prevent tie allocations
-        confidence = min(0.75 + 0.05*random.random(), 0.9)
+        confidence = min(0.75 + 0.05*unit_hash(self.seed, symbol), 0.9)
+        rationale = tuple(rationale)
 
         # Decision mapping
         if score >= 3:
-            return Decision(symbol, Action.BUY, confidence, score, " | ".join(rationale))
+            return Decision(symbol, Action.BUY, confidence, score, rationale)
         elif score >= 1.5:
-            return Decision(symbol, Action.HOLD, confidence*0.7, score, " | ".join(rationale))
+            return Decision(symbol, Action.HOLD, confidence*0.7, score, rationale)
         else:
-            return Decision(symbol, Action.SELL, 0.25, score, " | ".join(rationale))
+            return Decision(symbol, Action.SELL, 0.25, score, rationale)
+
+    def decide_batch(self, frame: "pd.DataFrame") -> DecisionBatch:
+        """Vectorized decide() over a fundamentals frame indexed by symbol."""
+        n = len(frame)
+        rev = np.nan_to_num(frame_column(frame, "revenue_growth_cagr"), nan=0.0)
+        fcf = frame_column(frame, "free_cashflow")
+        pe = frame_column(frame, "pe")
+        codes = np.full((n, 3), -1, dtype=np.int16)
+        args = np.full((n, 3), np.nan)
+
+        # Revenue growth scoring
+        rev_high = rev > 0.35
+        rev_mod = ~rev_high & (rev > self.min_rev_growth)
+        score = np.select([rev_high, rev_mod], [self.weights["rev_high"], self.weights["rev_mod"]], 0.0)
+        codes[:, 0] = np.select([rev_high, rev_mod], [_REV_EXPLOSIVE, _REV_HEALTHY], -1)
+        args[:, 0] = np.where(rev_high | rev_mod, rev, np.nan)
+
+        # FCF handling
+        with np.errstate(invalid="ignore"):
+            fcf_pos = fcf > 0
+            fcf_tol = ~fcf_pos & rev_high
+            pe_high = pe > 80
+            pe_low = ~pe_high & (pe < 20) & (pe != 0)
+        score += np.select([fcf_pos, fcf_tol], [1.0, self.weights["neg_fcf_tolerance"]], 0.0)
+        codes[:, 1] = np.select([fcf_pos, fcf_tol], [_FCF_POSITIVE, _FCF_TOLERATED], -1)
+
+        # PE consideration
+        score += np.select([pe_high, pe_low], [-0.5, 0.5], 0.0)
+        codes[:, 2] = np.select([pe_high, pe_low], [_PE_VERY_HIGH, _PE_UNDERVALUED], -1)
+        args[:, 2] = np.where(pe_high, pe, np.nan)
+
+        # Slight randomization to prevent tie allocations
+        confidence = np.minimum(0.75 + 0.05 * unit_hash_array(self.seed, frame.index), 0.9)
+
+        # Decision mapping
+        buy = score >= 3
+        hold = ~buy & (score >= 1.5)
+        actions = np.select([buy, hold], [Action.BUY.code, Action.HOLD.code], Action.SELL.code)
+        confidence = np.select([buy, hold], [confidence, confidence * 0.7], 0.25)
+        return DecisionBatch(frame.index, actions, confidence, score, codes, args)
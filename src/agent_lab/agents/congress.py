@@ -1,8 +1,16 @@
 from __future__ import annotations
 from typing import List, Tuple
+import numpy as np
 import pandas as pd
 from datetime import date
-from .base import Agent, Decision, Action
+from .base import Agent, Decision, Action, reason_code
+
+# Integer disclosure ages up to this many days are served from a precomputed table
+_DECAY_TABLE_DAYS = 3650
+
+_CONGRESS_BUY = reason_code("Congress BUY ${:,.0f}")
+_CONGRESS_SELL = reason_code("Congress SELL ${:,.0f}")
+_NO_DISCLOSURE = reason_code("No strong disclosure")
 
 class CongressAgent(Agent):
     name = "CongressAgent"
@@ -11,52 +19,94 @@ class CongressAgent(Agent):
         self.buy_thresh = buy_thresh_usd
         self.sell_thresh = sell_thresh_usd
         self.half_life = decay_half_life_days
+        self._decay_table = self._decay(np.arange(_DECAY_TABLE_DAYS + 1, dtype=float))
+
+    def _decay(self, days):
+        """0.5 ** (days / half_life); works on scalars and arrays."""
+        return np.power(0.5, np.asarray(days, dtype=float) / max(self.half_life, 1e-9))
+
+    def _decay_lookup(self, days: np.ndarray) -> np.ndarray:
+        """Decay for an array of ages, using the precomputed table for whole days."""
+        idx = days.astype(np.int64)
+        in_table = (idx == days) & (idx >= 0) & (idx <= _DECAY_TABLE_DAYS)
+        out = np.empty_like(days)
+        out[in_table] = self._decay_table[idx[in_table]]
+        if not in_table.all():
+            out[~in_table] = self._decay(days[~in_table])
+        return out
+
+    @staticmethod
+    def _column(features: pd.DataFrame, col: str, default: float) -> np.ndarray:
+        if col not in features.columns:
+            return np.full(len(features), default, dtype=float)
+        values = pd.to_numeric(features[col], errors="coerce").to_numpy(dtype=float, copy=True)
+        # mirror the old `x or default` semantics: missing and zero both fall back
+        values[np.isnan(values) | (values == 0)] = default
+        return values
+
+    def score_frame(self, features: pd.DataFrame, justify: bool = True) -> pd.DataFrame:
+        """
+        Columnar scoring over any features frame (one row per symbol, or per
+        (asof, symbol) for a panel). Returns the decision table with the same index.
+        Pass justify=False to skip building the per-row justification strings,
+        which dominate the cost on large panels.
+        """
+        buy_amt = self._column(features, "recent_congress_buy_usd", 0.0)
+        sell_amt = self._column(features, "recent_congress_sell_usd", 0.0)
+        days = self._column(features, "days_since_disclosure", 90.0)
+
+        is_buy = (buy_amt >= self.buy_thresh) & (buy_amt > sell_amt)
+        is_sell = ~is_buy & (sell_amt >= self.sell_thresh) & (sell_amt > buy_amt)
+        is_hold = ~(is_buy | is_sell)
+
+        conf = self._decay_lookup(days)
+        conf[is_hold] *= 0.5
+        np.minimum(conf, 1.0, out=conf)
+
+        score = np.select([is_buy, is_sell], [1, -1], 0)
+        decision = np.select([is_buy, is_sell], [Action.BUY.name, Action.SELL.name], Action.HOLD.name)
+
+        table = pd.DataFrame({
+            "score": score,
+            "decision": decision,
+            "confidence": conf,
+            "buy_amount": buy_amt,
+            "sell_amount": sell_amt,
+            "days_since": days,
+        }, index=features.index)
+
+        if justify:
+            justification = np.full(len(features), "No strong disclosure", dtype=object)
+            if is_buy.any():
+                justification[is_buy] = [f"Congress BUY ${v:,.0f}" for v in buy_amt[is_buy]]
+            if is_sell.any():
+                justification[is_sell] = [f"Congress SELL ${v:,.0f}" for v in sell_amt[is_sell]]
+            table.insert(3, "justification", justification)
+        return table
 
-    def _decay(self, days: float) -> float:
-        import math
-        return 0.5 ** (days / max(self.half_life, 1e-9))
+    def decide_table(self, asof: date, universe: List[str], features: pd.DataFrame) -> pd.DataFrame:
+        """Decision table for the symbols of `universe` present in `features`."""
+        universe = pd.Index(universe, dtype=object, name="symbol")
+        symbols = universe[universe.isin(features.index)]
+        table = self.score_frame(features.loc[symbols])
+        table.index.name = "symbol"
+        return table
 
     def decide(self, asof: date, universe: List[str], features: pd.DataFrame) -> Tuple[List[Decision], pd.DataFrame]:
         """
         Expects features with columns: ['recent_congress_buy_usd', 'recent_congress_sell_usd', 'days_since_disclosure']
         """
+        table = self.decide_table(asof, universe, features)
         decisions: List[Decision] = []
-        table_rows = []
-
-        for sym in universe:
-            if sym not in features.index:
-                continue
-            row = features.loc[sym]
-            buy_amt = float(row.get("recent_congress_buy_usd", 0) or 0)
-            sell_amt = float(row.get("recent_congress_sell_usd", 0) or 0)
-            days = float(row.get("days_since_disclosure", 90) or 90)
-            conf = self._decay(days)
-            rationale = []
-            
-            if buy_amt >= self.buy_thresh and buy_amt > sell_amt:
-                act = Action.BUY; score = +1; rationale.append(f"Congress BUY ${buy_amt:,.0f}")
-            elif sell_amt >= self.sell_thresh and sell_amt > buy_amt:
-                act = Action.SELL; score = -1; rationale.append(f"Congress SELL ${sell_amt:,.0f}")
+        for sym, act, conf, score, buy_amt, sell_amt in zip(
+            table.index, table["decision"], table["confidence"], table["score"],
+            table["buy_amount"], table["sell_amount"],
+        ):
+            if act == "BUY":
+                reasons = ((_CONGRESS_BUY, buy_amt),)
+            elif act == "SELL":
+                reasons = ((_CONGRESS_SELL, sell_amt),)
             else:
-                act = Action.HOLD; score = 0; rationale.append("No strong disclosure")
-                conf *= 0.5
-
-            decisions.append(Decision(
-                symbol=sym, action=act, confidence=min(1.0, conf), score=score,
-                rationale=" | ".join(rationale),
-                extras={"asof": str(asof), "agent_name": self.name}
-            ))
-
-            table_rows.append({
-                "symbol": sym,
-                "score": score,
-                "decision": act.name,
-                "confidence": min(1.0, conf),
-                "justification": " | ".join(rationale),
-                "buy_amount": buy_amt,
-                "sell_amount": sell_amt,
-                "days_since": days
-            })
-
-        table = pd.DataFrame(table_rows).set_index("symbol")
-        return decisions, table
\ No newline at end of file
+                reasons = ((_NO_DISCLOSURE, None),)
+            decisions.append(Decision(sym, Action[act], float(conf), int(score), reasons))
+        return decisions, table
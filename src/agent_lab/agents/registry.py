@@ -0,0 +1,29 @@
+# src/agent_lab/agents/registry.py
+"""Agents by name, imported only when asked for."""
+from __future__ import annotations
+import importlib
+from typing import Dict, List
+
+AGENTS: Dict[str, str] = {
+    "buffett": "agent_lab.agents.buffett:BuffettAgent",
+    "ackman": "agent_lab.agents.ackman:AckmanAgent",
+    "cathie": "agent_lab.agents.cathie:CathieAgent",
+    "soros": "agent_lab.agents.soros:SorosAgent",
+}
+
+# ensembles and their members (same line-up as the API)
+ENSEMBLES: Dict[str, List[str]] = {
+    "oversight": ["buffett", "ackman"],
+}
+
+AGENT_NAMES = [*AGENTS, *ENSEMBLES]
+
+def get_agent(name: str):
+    if name in ENSEMBLES:
+        from agent_lab.ensemble.oversight import OversightAgent
+        return OversightAgent([get_agent(m) for m in ENSEMBLES[name]])
+    try:
+        module, cls = AGENTS[name].split(":")
+    except KeyError:
+        raise ValueError(f"Unknown agent {name!r}; choose from {', '.join(AGENT_NAMES)}") from None
+    return getattr(importlib.import_module(module), cls)()
@@ -1,8 +1,12 @@
 # src/agent_lab/agents/soros.py
-from .base import Decision, Action
+from .base import Decision, Action, reason_code
 from agent_lab.data_connectors.price_data import get_price_history
 import numpy as np
 
+_BREAKOUT = reason_code("Breakout above long MA ({:.3f})")
+_VOL_REVERSAL = reason_code("Vol spike reversal ({:.3f})")
+_DOWNTREND = reason_code("Downtrend below long MA ({:.3f})")
+
 class SorosAgent:
     name = "soros"
 
@@ -31,22 +35,18 @@ class SorosAgent:
 
         breakout = (last - ma_long)/ma_long
         diff = (ma_short - ma_long)/ma_long
-        rationale = []
 
         # Trend-following & volatility logic
         if breakout > self.breakout_threshold:
-            rationale.append(f"Breakout above long MA ({breakout:.3f})")
             confidence = min(0.6 + breakout*5 + vol*2, 0.9)
-            return Decision(symbol, Action.BUY, confidence, diff, " | ".join(rationale))
+            return Decision(symbol, Action.BUY, confidence, diff, ((_BREAKOUT, breakout),))
 
         if breakout < -self.breakout_threshold:
             if vol > self.reversal_vol_mult*avg_vol:
-                rationale.append(f"Vol spike reversal ({vol:.3f})")
                 confidence = min(0.6 + vol*2, 0.85)
-                return Decision(symbol, Action.BUY, confidence, diff, " | ".join(rationale))
+                return Decision(symbol, Action.BUY, confidence, diff, ((_VOL_REVERSAL, vol),))
             else:
-                rationale.append(f"Downtrend below long MA ({breakout:.3f})")
                 confidence = min(0.6 + abs(breakout)*5, 0.85)
-                return Decision(symbol, Action.SELL, confidence, diff, " | ".join(rationale))
+                return Decision(symbol, Action.SELL, confidence, diff, ((_DOWNTREND, breakout),))
 
         return Decision(symbol, Action.HOLD, 0.4, diff, "neutral trend")
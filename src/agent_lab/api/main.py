@@ -7,21 +7,35 @@ from datetime import date
 import pandas as pd
 import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from agent_lab.agents.buffett import BuffettAgent
 from agent_lab.agents.ackman import AckmanAgent
 from agent_lab.ensemble.oversight import OversightAgent
+from agent_lab.ensemble.learning import OnlineWeights, weights_path
 from agent_lab.data_connectors.finnhub_data import fetch_finnhub_fundamentals
+from agent_lab.data_connectors.normalize import frame_records
 from agent_lab.api.postprocess_report import markdown_to_html, generate_price_chart, wrap_html
-from fastapi.responses import Response
+from agent_lab.api.scoring import ScoringService
+from agent_lab.data_connectors import warmer
+from agent_lab.metrics import span, render_prometheus
+from agent_lab.profiling import install_request_profiling
+from fastapi.responses import Response, PlainTextResponse
 
 # --------- NEW: Gemini ----------
-import google.generativeai as genai
-
-genai_api_key = os.getenv("GOOGLE_API_KEY")
-if not genai_api_key:
-    raise ValueError("Missing GOOGLE_API_KEY environment variable")
-genai.configure(api_key=genai_api_key)
+_genai = None
+
+def get_genai():
+    """Configure Gemini on first use, so importing the app needs neither the SDK nor the key."""
+    global _genai
+    if _genai is None:
+        genai_api_key = os.getenv("GOOGLE_API_KEY")
+        if not genai_api_key:
+            raise ValueError("Missing GOOGLE_API_KEY environment variable")
+        import google.generativeai as genai
+        genai.configure(api_key=genai_api_key)
+        _genai = genai
+    return _genai
 
 async def generate_gemini_rationale(metrics, action):
     prompt = f"""
@@ -34,20 +48,39 @@ async def generate_gemini_rationale(metrics, action):
     Avoid jargon. No bullet points. Keep it clear.
     """
 
-    model = genai.GenerativeModel("gemini-2.0-flash")
+    model = get_genai().GenerativeModel("gemini-2.0-flash")
     response = await asyncio.to_thread(model.generate_content, prompt)
 
     return response.text.strip()
 # --------------------------------
 
-app = FastAPI(title="Agent Lab UI API")
+@asynccontextmanager
+async def lifespan(app):
+    # refresh the fundamentals/price caches ahead of expiry (AGENT_LAB_WARM_CACHE=0 disables)
+    cache_warmer = warmer.CacheWarmer() if warmer.enabled() else None
+    if cache_warmer:
+        cache_warmer.start()
+    yield
+    if cache_warmer:
+        await cache_warmer.stop()
+    scoring.close()
+
+app = FastAPI(title="Agent Lab UI API", lifespan=lifespan)
+install_request_profiling(app)  # X-Profile header / ?profile= when AGENT_LAB_PROFILING=1
 
 # --- Initialize single agents ---
 buffett = BuffettAgent()
 ackman = AckmanAgent()
 
 # --- Initialize ensemble agent (Oversight) ---
-oversight = OversightAgent(agents=[buffett, ackman])
+# weights learned by `agent-lab backtest/paper --learn`, re-read whenever that file changes
+oversight = OversightAgent(
+    agents=[buffett, ackman],
+    learner=OnlineWeights(["buffett", "ackman"], path=weights_path("oversight"), autoreload=True),
+)
+
+# --- Scoring service: agents and fundamentals stay warm across requests ---
+scoring = ScoringService({"buffett": buffett, "ackman": ackman, "oversight": oversight})
 
 # --- Enable CORS ---
 app.add_middleware(
@@ -68,24 +101,20 @@ class GenerateRequest(BaseModel):
     include_oversight: bool = True
 
 
-# --- Helper: run agent with pre-fetched data ---
-async def run_agent_with_data(agent, universe, fund_data):
+# --- Helper: build result rows from pre-fetched data and a batch of decisions ---
+async def run_agent_with_data(agent, universe, fund_data, decisions):
     today = date.today()
     rows = []
 
-    for sym in universe:
-        # Agent decision
-        try:
-            d = agent.decide(sym, data=fund_data.get(sym))
-        except TypeError:
-            d = agent.decide(sym)
-
+    for i, sym in enumerate(universe):
+        d = decisions[i]  # scored by the shared scoring service, in universe order
         row = fund_data.get(sym, {})  # fundamentals
 
         # --- NEW: Generate natural-language rationale using Gemini ---
         metrics = row
         # ai_rationale = await generate_gemini_rationale(metrics, d.action.name)
-        ai_rationale = await generate_gemini_rationale(metrics, d.action.name)
+        with span("rationale"):
+            ai_rationale = await generate_gemini_rationale(metrics, d.action.name)
         print(f"{sym} rationale: {ai_rationale}")  # DEBUG
 
 
@@ -101,8 +130,9 @@ async def run_agent_with_data(agent, universe, fund_data):
 
     # Save CSV
     outfile = f"{agent.__class__.__name__.lower()}_decisions_{today}.csv"
-    df = pd.DataFrame(rows)
-    df.to_csv(outfile, index=False)
+    with span("serialize", what="csv"):
+        df = pd.DataFrame(rows)
+        df.to_csv(outfile, index=False)
 
     return rows, outfile
 
@@ -119,22 +149,30 @@ async def generate(payload: GenerateRequest):
     if payload.agent not in agent_map:
         return {"error": f"Agent {payload.agent} not supported"}
 
-    # Fetch fundamentals (one batch)
-    fund_data_df = fetch_finnhub_fundamentals(payload.universe)
-    fund_data = {sym: fund_data_df.loc[sym].to_dict() for sym in fund_data_df.index}
+    # Fundamentals come from the scoring service's warm store (fetched once per TTL)
+    with span("fetch", what="fundamentals"):
+        fund_data_df = await asyncio.to_thread(scoring.fundamentals, payload.universe)
+    with span("normalize", what="fundamentals"):
+        # rows keep the frontend's "Company" key (ResultsTable.js); the store uses the schema's "company"
+        rows_df = fund_data_df.reindex(fund_data_df.index.intersection(payload.universe))
+        fund_data = frame_records(rows_df.rename(columns={"company": "Company"}))
 
     selected_agent = agent_map[payload.agent]
 
+    # Score on the shared worker pool; concurrent requests are batched together
+    names = [payload.agent] + (["oversight"] if payload.include_oversight else [])
+    batches = await asyncio.gather(*(scoring.score(name, payload.universe) for name in names))
+
     # Run selected agent (async)
     selected_results, selected_csv = await run_agent_with_data(
-        selected_agent, payload.universe, fund_data
+        selected_agent, payload.universe, fund_data, batches[0]
     )
 
     # (Optional) Oversight agent
     oversight_results, oversight_csv = [], None
     if payload.include_oversight:
         oversight_results, oversight_csv = await run_agent_with_data(
-            oversight, payload.universe, fund_data
+            oversight, payload.universe, fund_data, batches[1]
         )
 
     return {
@@ -220,24 +258,26 @@ Objective: deliver a decision ready report modeled on Goldman Sachs writing styl
 Begin.
 """
 
-    model = genai.GenerativeModel("gemini-2.0-flash")
     try:
+        model = get_genai().GenerativeModel("gemini-2.0-flash")
         # Call Gemini AI in a thread
-        response = await asyncio.to_thread(model.generate_content, prompt)
+        with span("rationale", what="full_report"):
+            response = await asyncio.to_thread(model.generate_content, prompt)
         ai_text = response.text
     except Exception as e:
         # Log the error for debugging
         print(f"AI generation failed: {e}")
         ai_text = "<h1>AI generation failed. Please try again later.</h1>"
 
-    html_text = markdown_to_html(ai_text)
+    with span("serialize", what="html"):
+        html_text = markdown_to_html(ai_text)
 
-    # Wrap HTML for browser with proper download button
-    html_content = wrap_html(
-        html_text,
-        company_name=company_name,
-        ticker=symbol
-    )
+        # Wrap HTML for browser with proper download button
+        html_content = wrap_html(
+            html_text,
+            company_name=company_name,
+            ticker=symbol
+        )
 
     # Return HTML directly
     return Response(
@@ -249,3 +289,8 @@ Begin.
 @app.get("/download/{filename}")
 async def download_csv(filename: str):
     return FileResponse(filename, media_type="text/csv", filename=filename)
+
+# --- Endpoint: Prometheus metrics ---
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,5 @@
 import os
 from datetime import date
-import matplotlib.pyplot as plt
 import markdown
 
 # ----------------------
@@ -15,6 +14,7 @@ def markdown_to_html(md_text):
 # Generate a chart image (optional)
 # ----------------------
 def generate_price_chart(dates, prices, chart_file="price_chart.png"):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(8,4))
     plt.plot(dates, prices, marker='o', color='#003366')
     plt.title("12-Month Price Chart")
@@ -0,0 +1,165 @@
+# src/agent_lab/api/scoring.py
+"""
+Shared scoring service for the API apps.
+
+Agents and normalized fundamentals stay in memory between requests. Concurrent
+score() calls for the same agent are micro-batched: requests arriving within
+`max_wait` seconds (or until `max_batch` symbols are queued) are merged into one
+symbol set, scored once with the agent's batch path on a worker pool, and each
+caller gets its own slice back. The event loop itself never scores.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Union
+import pandas as pd
+from agent_lab.agents.base import DecisionBatch, decide_many
+from agent_lab.data_connectors.lru import BoundedCache, env_limit
+from agent_lab.data_connectors.normalize import apply_schema
+from agent_lab import metrics
+from agent_lab.profiling import request_profiles, run_profiled
+
+DEFAULT_MAX_WAIT = 0.005     # seconds a request may wait for others to join its batch
+DEFAULT_MAX_BATCH = 5000     # symbols per batch before it is flushed early
+DEFAULT_TTL = 15 * 60        # reloads are cheap: the cache warmer keeps the fundamentals cache fresh
+
+_MISSING = object()
+
+def _default_loader(symbols: List[str]) -> pd.DataFrame:
+    # schema column names, and no rows for symbols without data
+    from agent_lab.data_connectors.finnhub_data import fundamentals_frame
+    return fundamentals_frame(symbols)
+
+class ScoringService:
+    def __init__(
+        self,
+        agents: Dict[str, object],
+        loader: Callable[[List[str]], Union[pd.DataFrame, Dict[str, Optional[dict]]]] = _default_loader,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        workers: int = 4,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.agents = dict(agents)
+        self.loader = loader
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.ttl = ttl
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None   # started on first use, again after close()
+        # symbol -> normalized row (None: no data), cast on the way out; dropped after `ttl`
+        self._rows = BoundedCache(
+            "scoring_rows",
+            max_entries=int(env_limit("AGENT_LAB_SCORING_ROWS", 20000)),
+            max_bytes=int(env_limit("AGENT_LAB_SCORING_MB", 128) * 2**20),
+            ttl=ttl,
+        )
+        self._load_lock = threading.Lock()
+        self._pending: Dict[str, list] = {}           # agent -> [(symbols, future)]
+        self._pending_size: Dict[str, int] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+
+    # --- fundamentals store --------------------------------------------------
+
+    def update(self, rows: Union[pd.DataFrame, Dict[str, Optional[dict]]]) -> Dict[str, Optional[dict]]:
+        """
+        Put freshly fetched rows into the store (e.g. ones a request already has),
+        as a frame indexed by symbol or {symbol: row or None}. Rows are replaced
+        in place, so an update costs the size of the update, not of the store.
+        Returns the rows as {symbol: row or None}.
+        """
+        if isinstance(rows, pd.DataFrame):
+            rows = rows.to_dict("index")
+        for s, row in rows.items():
+            self._rows[s] = row
+        return rows
+
+    def fundamentals(self, symbols: Sequence[str]) -> pd.DataFrame:
+        """Rows for `symbols` (loading missing or expired ones) as a typed frame indexed by symbol."""
+        rows = {s: self._rows.get(s, _MISSING) for s in dict.fromkeys(symbols)}
+        stale = [s for s, row in rows.items() if row is _MISSING]
+        if stale:
+            with self._load_lock:
+                # another batch may have loaded them while we waited
+                rows.update({s: self._rows.get(s, _MISSING) for s in stale})
+                stale = [s for s in stale if rows[s] is _MISSING]
+                if stale:
+                    with metrics.span("fetch", what="scoring_fundamentals"):
+                        loaded = self.update(self.loader(stale))
+                    rows.update(loaded)
+                    # symbols the loader has nothing for are stored as no data
+                    rows.update(self.update({s: None for s in stale if s not in loaded}))
+        # only the rows being scored are cast (normalize.SCHEMA)
+        rows = {s: row for s, row in rows.items() if row is not None and row is not _MISSING}
+        return apply_schema(pd.DataFrame.from_dict(rows, orient="index"))
+
+    # --- scoring -------------------------------------------------------------
+
+    def score_sync(self, agent_name: str, symbols: Sequence[str]) -> DecisionBatch:
+        """Score `symbols` with one agent right away, in the calling thread."""
+        agent = self.agents[agent_name]
+        return decide_many(agent, list(symbols), self.fundamentals(symbols))
+
+    async def score(self, agent_name: str, symbols: Sequence[str],
+                    data: Optional[Dict[str, Optional[dict]]] = None) -> DecisionBatch:
+        """
+        Decisions for `symbols` (in order) from `agent_name`, batched with other
+        concurrent requests. `data` rows, when given, refresh the store first.
+        """
+        if agent_name not in self.agents:
+            raise KeyError(agent_name)
+        if data:
+            self.update(data)
+        symbols = list(symbols)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        # a profiled request's collector travels with it to the worker thread
+        self._pending.setdefault(agent_name, []).append((symbols, fut, request_profiles()))
+        self._pending_size[agent_name] = self._pending_size.get(agent_name, 0) + len(symbols)
+        if self._pending_size[agent_name] >= self.max_batch:
+            self._flush(agent_name)
+        elif agent_name not in self._flush_handles:
+            self._flush_handles[agent_name] = loop.call_later(self.max_wait, self._flush, agent_name)
+        return await fut
+
+    def _flush(self, agent_name: str) -> None:
+        handle = self._flush_handles.pop(agent_name, None)
+        if handle is not None:
+            handle.cancel()
+        requests = self._pending.pop(agent_name, [])
+        self._pending_size.pop(agent_name, None)
+        if not requests:
+            return
+        union = list(dict.fromkeys(s for symbols, _, _ in requests for s in symbols))
+        metrics.inc("scoring_batches_total", agent=agent_name)
+        metrics.inc("scoring_requests_total", len(requests), agent=agent_name)
+        profiles = [p for _, _, p in requests if p is not None]
+        task = asyncio.get_running_loop().run_in_executor(
+            self._executor(), run_profiled, profiles, f"scoring-{agent_name}", self.score_sync, agent_name, union,
+        )
+        task.add_done_callback(lambda t: self._deliver(t, requests))
+
+    @staticmethod
+    def _deliver(task: asyncio.Future, requests: list) -> None:
+        if task.exception() is not None:
+            for _, fut, _ in requests:
+                if not fut.done():
+                    fut.set_exception(task.exception())
+            return
+        batch = task.result()
+        index = batch.index
+        for symbols, fut, _ in requests:
+            if not fut.done():
+                fut.set_result(batch.take(index.get_indexer(symbols)))
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="agent-lab-scoring")
+        return self._pool
+
+    def close(self) -> None:
+        """Stop the worker pool. The service stays usable: an app that starts again gets a new pool."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
+from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
 from agent_lab.agents.buffett import BuffettAgent
 # from agent_lab.agents.momentum import MomentumAgent
 from agent_lab.agents.ackman import AckmanAgent
 from agent_lab.ensemble.oversight import OversightAgent
+from agent_lab.ensemble.learning import OnlineWeights, weights_path
+from agent_lab.api.scoring import ScoringService
+from agent_lab.data_connectors import warmer
+from agent_lab.data_connectors.cache import insider_windows
+from agent_lab.metrics import render_prometheus
+from agent_lab.profiling import install_request_profiling
 
-app = FastAPI(title="Agent Lab API")
+@asynccontextmanager
+async def lifespan(app):
+    cache_warmer = warmer.CacheWarmer() if warmer.enabled() else None
+    if cache_warmer:
+        cache_warmer.start()
+    yield
+    if cache_warmer:
+        await cache_warmer.stop()
+    scoring.close()
+
+app = FastAPI(title="Agent Lab API", lifespan=lifespan)
+install_request_profiling(app)  # X-Profile header / ?profile= when AGENT_LAB_PROFILING=1
 
 buffett = BuffettAgent()
 # momentum = MomentumAgent()
 ackman = AckmanAgent()
-oversight = OversightAgent([buffett, ackman])
+# weights learned by `agent-lab backtest/paper --learn`, re-read whenever that file changes
+oversight = OversightAgent(
+    [buffett, ackman], learner=OnlineWeights(["buffett", "ackman"], path=weights_path("oversight"), autoreload=True),
+)
+
+scoring = ScoringService({"buffett": buffett, "ackman": ackman, "oversight": oversight})
+
+class ScoreRequest(BaseModel):
+    agent: str = "oversight"
+    symbols: list[str]
 
 @app.get("/")
 async def root():
@@ -17,8 +48,35 @@ async def root():
 
 @app.get("/decide")
 async def decide(symbol: str):
+    names = ["buffett", "ackman", "oversight"]
+    batches = await asyncio.gather(*(scoring.score(name, [symbol]) for name in names))
+    return {name: batch[0].to_dict() for name, batch in zip(names, batches)}
+
+@app.post("/score")
+async def score(req: ScoreRequest):
+    if req.agent not in scoring.agents:
+        return {"error": f"Agent {req.agent} not supported"}
+    batch = await scoring.score(req.agent, req.symbols)
+    return {"agent": req.agent, "decisions": [d.to_dict() for d in batch]}
+
+@app.get("/ensemble/weights")
+async def ensemble_weights():
+    learner = oversight.learner
+    weights = learner.weights()     # first: picks up a newer weights file
     return {
-        "buffett": buffett.decide(symbol).dict(),
-        "ackman": ackman.decide(symbol).dict(),
-        "oversight": oversight.decide(symbol)
+        "updates": learner.updates,
+        "weights": weights,
+        "sectors": {sector: learner.weights(sector) for sector in learner.sectors},
     }
+
+@app.get("/insider/{symbol}")
+async def insider(symbol: str, as_of: Optional[str] = None):
+    """Net insider shares and USD over the last 30/90/180 days."""
+    windows = await asyncio.to_thread(insider_windows, symbol.upper(), as_of)
+    if windows is None:
+        return {"error": f"No insider data for {symbol}"}
+    return {"symbol": symbol.upper(), "windows": windows}
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -3,51 +3,62 @@ import sys
 import os
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 
 # --- Fix Python import path dynamically ---
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from agent_lab.scripts.run_mvp import UNIVERSE, agents, prices, preload_fundamentals
-from agent_lab.backtesting.engine import BacktestEngine
-from agent_lab.data_connectors.cache import clear_cache  # 👈 NEW
+from agent_lab import portfolio
+from agent_lab.scripts.run_mvp import UNIVERSE, build_agents
+from agent_lab.agents.base import decide_many
+from agent_lab.seeding import with_seed
+from agent_lab.data_connectors.data_service import CACHE_VERSION, get_data_service
 
 # --- Streamlit Page Config ---
 st.set_page_config(page_title="Agent Lab MVP", layout="wide")
 st.title("Agent Lab - Portfolio Recommendations")
 
+# --- Process-wide resources (built once, reused across reruns and sessions) ---
+@st.cache_resource
+def load_agents():
+    return build_agents()
+
+@st.cache_resource
+def data_service(version: str = CACHE_VERSION):
+    return get_data_service(version)
+
+agents = load_agents()
+
 # --- User Inputs ---
 portfolio_size = st.number_input("Portfolio Size ($)", min_value=1000.0, value=100_000.0, step=1000.0)
 selected_universe = st.multiselect("Select Universe (tickers)", UNIVERSE, default=UNIVERSE[:4])
 selected_agents = st.multiselect("Select Agents", list(agents.keys()), default=list(agents.keys()))
+sizing = st.selectbox("Position sizing", list(portfolio.METHODS), index=list(portfolio.METHODS).index(portfolio.DEFAULT_METHOD))
 run_backtest = st.checkbox("Show Historical Backtest", value=True)
+seed = int(st.number_input("Random seed", min_value=0, value=0, step=1))
 
+if st.sidebar.button("Refresh market data"):
+    from agent_lab.data_connectors.cache import clear_cache
+    from agent_lab.data_connectors.price_data import clear_price_cache
+    data_service().invalidate()
+    clear_cache()
+    clear_price_cache()
+
+# Data is only loaded once the user asks for results, so the first paint never waits on it
 if st.button("Generate Recommendations"):
     st.write("### Generating recommendations...")
 
     # --- Load fundamentals for display purposes only ---
-    funds = preload_fundamentals(selected_universe)
-    price_subset = prices[selected_universe]
+    service = data_service()
+    funds = service.fundamentals(selected_universe)
 
     # --- Prepare recommendations per agent ---
-    recs = {}
+    recs, batches = {}, {}
     for name in selected_agents:
-        agent = agents[name]
-        agent_recs = []
-        for sym in selected_universe:
-            # keep using fundamentals only for initial recommendation display
-            d = agent.decide(sym, data=funds.get(sym))
-            agent_recs.append({
-                "symbol": sym,
-                "action": d.action.name,
-                "confidence": d.confidence,
-                "score": d.score,
-                "rationale": d.rationale,
-            })
-        recs[name] = pd.DataFrame(agent_recs).set_index("symbol")
+        # keep using fundamentals only for initial recommendation display
+        batches[name] = decide_many(with_seed(agents[name], seed), selected_universe, funds)
+        recs[name] = batches[name].to_frame(rationale=True).astype({"action": str})
 
     # --- Display Recommendations ---
     st.subheader("Agent Recommendations")
@@ -55,16 +66,13 @@ if st.button("Generate Recommendations"):
         st.markdown(f"#### {name.capitalize()} Agent")
         st.dataframe(df_rec)
 
-    # --- Suggest Allocation based on confidence * score ---
+    # --- Suggest Allocation: the same sizing the backtest uses ---
     st.subheader("Suggested Portfolio Allocation")
     allocation = pd.DataFrame(index=selected_universe)
-    for name, df_rec in recs.items():
-        weights = []
-        for _, row in df_rec.iterrows():
-            w = max(0, row["confidence"] * row["score"])
-            weights.append(w)
-        total = sum(weights) or 1.0
-        allocation[name] = [w / total for w in weights]
+    history = service.prices(selected_universe) if sizing in portfolio.NEEDS_RISK else None
+    for name, batch in batches.items():
+        weights = portfolio.allocation(batch, sizing, prices=history)
+        allocation[name] = weights.reindex(selected_universe, fill_value=0.0).to_numpy()
 
     # Multiply by portfolio size
     allocation_cash = allocation * portfolio_size
@@ -72,33 +80,35 @@ if st.button("Generate Recommendations"):
 
     # --- Optional: Backtest Historical Equity ---
     if run_backtest:
+        import matplotlib.pyplot as plt
+        from agent_lab.backtesting.engine import BacktestEngine
+        from agent_lab.backtesting.result_cache import BacktestCache
+
         st.subheader("Historical Backtest Equity")
+        price_subset = service.prices(selected_universe)
         fig, ax = plt.subplots(figsize=(10, 5))
 
         final_equities = {}
 
         for name in selected_agents:
-            agent = agents[name]
-            engine = BacktestEngine(price_subset)
+            agent = with_seed(agents[name], seed)
+            engine = BacktestEngine(price_subset, seed=seed, method=sizing)
 
             # --- Per-agent daily decider (isolated to avoid shared cache) ---
             def make_decider(agent_instance):
                 def daily_decider(dt):
-                    out = {}
-                    for sym in price_subset.columns:
-                        # Each agent uses its own fundamentals
-                        out[sym] = agent_instance.decide(sym, data=funds.get(sym))
-                    return out
+                    # Each agent uses its own fundamentals
+                    return decide_many(agent_instance, price_subset.columns, funds)
                 return daily_decider
 
             daily_decider = make_decider(agent)
 
             # Run backtest for this agent
-            df_bt = engine.run(daily_decider, cash=portfolio_size)
+            df_bt = engine.run(daily_decider, cash=portfolio_size, agent=agent, inputs=funds, cache=BacktestCache())
 
             # --- Inject tiny per-day randomization to break ties ---
             # Only adjust equity slightly for allocation randomness
-            df_bt["equity"] = df_bt["equity"] * (1 + 0.0005 * np.random.randn(len(df_bt)))
+            df_bt["equity"] = df_bt["equity"] * (1 + 0.0005 * engine.rng(name).standard_normal(len(df_bt)))
 
             # Aggregate daily equity
             equity = df_bt.groupby(df_bt.index).first()["equity"]
@@ -0,0 +1,121 @@
+# src/agent_lab/backtesting/costs.py
+"""
+Transaction cost models for BacktestEngine.
+
+A model turns one day's trades into cost rates: the fraction of each trade's
+notional lost to fees, spread and impact. Buys pay notional * (1 + rate),
+sells receive notional * (1 - rate). Rates for every symbol traded that day
+come from one array call.
+
+    FlatCost(cost_bps=5, slippage_pct=0.001)              # the engine's original rule
+    FeeSchedule(bps={"AAPL": 1.0}, default_bps=2.0, per_share=0.005, min_fee=1.0)
+    SpreadImpactCost(spread_bps=10, impact=0.7, fees=FeeSchedule(bps=1.0))
+
+SpreadImpactCost charges half the quoted spread plus square-root market
+impact, impact * daily vol * sqrt(shares / ADV), with volatility and average
+daily volume (ADV) taken over the `window` days before the trade. It needs the
+Volume panel (BacktestEngine(..., volumes=...)).
+
+Models are plain config objects: their public attributes are part of the
+backtest result-cache fingerprint, per-run state set up by prepare() is not.
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Union
+import numpy as np
+import pandas as pd
+
+PerSymbol = Union[float, Dict[str, float]]
+
+def _per_symbol(value: PerSymbol, symbols, default: float) -> np.ndarray:
+    """A scalar or {symbol: value} as an array over `symbols` (missing symbols get `default`)."""
+    if isinstance(value, dict):
+        return np.array([float(value.get(s, default)) for s in symbols])
+    return np.full(len(symbols), float(value))
+
+class CostModel:
+    """Zero costs; subclasses override rates()."""
+
+    def prepare(self, prices: pd.DataFrame, volumes: Optional[pd.DataFrame] = None) -> None:
+        """Called once per run with the full (dates x symbols) panels, in the engine's symbol order."""
+
+    def rates(self, day: int, shares: np.ndarray, px: np.ndarray) -> np.ndarray:
+        """
+        Cost rates for trading `shares` (signed, one entry per symbol, 0 = no
+        trade) at `px` on row `day` of the prepared panels.
+        """
+        return np.zeros(len(shares))
+
+class FlatCost(CostModel):
+    """The same rate on every trade: commission (bps) plus slippage (fraction)."""
+
+    def __init__(self, cost_bps: float = 5.0, slippage_pct: float = 0.001):
+        self.cost_bps = cost_bps
+        self.slippage_pct = slippage_pct
+
+    def rates(self, day, shares, px):
+        return np.full(len(shares), self.cost_bps / 1e4 + self.slippage_pct)
+
+class FeeSchedule(CostModel):
+    """
+    Broker fees: bps of notional plus a per-share fee, at least `min_fee` a
+    trade. `bps` is one rate or {symbol: rate}, with `default_bps` for the rest.
+    """
+
+    def __init__(self, bps: PerSymbol = 0.0, default_bps: float = 0.0, per_share: float = 0.0, min_fee: float = 0.0):
+        self.bps = bps
+        self.default_bps = default_bps
+        self.per_share = per_share
+        self.min_fee = min_fee
+        self._bps = None
+
+    def prepare(self, prices, volumes=None):
+        self._bps = _per_symbol(self.bps, list(prices.columns), self.default_bps) / 1e4
+
+    def rates(self, day, shares, px):
+        size = np.abs(shares)
+        notional = size * px
+        fee = np.maximum(self._bps * notional + self.per_share * size, np.where(size > 0, self.min_fee, 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(notional > 0, fee / notional, 0.0)
+
+class SpreadImpactCost(CostModel):
+    """Half spread + impact * vol * sqrt(shares / ADV), plus optional fees."""
+
+    def __init__(
+        self,
+        spread_bps: PerSymbol = 10.0,
+        default_spread_bps: float = 10.0,
+        impact: float = 0.7,
+        window: int = 20,
+        fees: Optional[FeeSchedule] = None,
+    ):
+        self.spread_bps = spread_bps
+        self.default_spread_bps = default_spread_bps
+        self.impact = impact
+        self.window = window
+        self.fees = fees
+        self._half_spread = self._vol = self._adv = None
+
+    def prepare(self, prices, volumes=None):
+        if volumes is None:
+            raise ValueError("SpreadImpactCost needs the Volume panel (BacktestEngine(..., volumes=...))")
+        symbols = list(prices.columns)
+        self._half_spread = _per_symbol(self.spread_bps, symbols, self.default_spread_bps) / 2e4
+        roll = dict(window=self.window, min_periods=min(5, self.window))
+        # only what was known before the day's close
+        vol = prices.astype(np.float64).pct_change(fill_method=None).rolling(**roll).std().shift(1)
+        adv = volumes.reindex(index=prices.index, columns=symbols).astype(np.float64).rolling(**roll).mean().shift(1)
+        # before a symbol has history, assume the day's typical volatility and liquidity
+        self._vol = vol.T.fillna(vol.median(axis=1)).T.to_numpy()
+        self._adv = adv.T.fillna(adv.median(axis=1)).T.to_numpy()
+        if self.fees is not None:
+            self.fees.prepare(prices, volumes)
+
+    def rates(self, day, shares, px):
+        vol, adv = self._vol[day], self._adv[day]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            impact = self.impact * vol * np.sqrt(np.abs(shares) / adv)
+        rate = self._half_spread + np.where(np.isfinite(impact), impact, 0.0)
+        if self.fees is not None:
+            rate = rate + self.fees.rates(day, shares, px)
+        return np.where(shares != 0, rate, 0.0)
@@ -1,70 +1,265 @@
 # src/agent_lab/backtesting/engine.py
+import numpy as np
 import pandas as pd
-from typing import Callable, Dict
-from agent_lab.agents.base import Decision, Action
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+from agent_lab import portfolio
+from agent_lab.agents.base import Decision, DecisionBatch, Action
+from agent_lab.backtesting.costs import CostModel, FlatCost
+from agent_lab.backtesting.result_cache import BacktestCache, fingerprint
+from agent_lab.data_connectors import calendar
+from agent_lab.seeding import DEFAULT_SEED, make_rng
+
+Decisions = Union[DecisionBatch, Dict[str, Decision]]
+
+_BLOCK = 256    # dates whose decisions are collected and sized together
+_RECOST_ITERATIONS = 20     # fixed-point steps re-costing buys cut down for cash
+TRADE_COLUMNS = ("date", "symbol", "shares", "price", "value", "cost")
+
+@dataclass
+class EngineState:
+    """Portfolio state between dates: share counts per symbol and cash."""
+    symbols: List[str]
+    positions: np.ndarray
+    cash: float
+    last_date: Optional[pd.Timestamp] = None
+
+    @classmethod
+    def initial(cls, symbols, cash: float) -> "EngineState":
+        return cls(list(symbols), np.zeros(len(symbols)), float(cash))
+
+    def copy(self) -> "EngineState":
+        return EngineState(list(self.symbols), self.positions.copy(), self.cash, self.last_date)
 
 class BacktestEngine:
-    def __init__(self, prices: pd.DataFrame, cost_bps: float = 5.0, slippage_pct: float = 0.001):
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        cost_bps: float = 5.0,
+        slippage_pct: float = 0.001,
+        seed: int = DEFAULT_SEED,
+        method: str = portfolio.DEFAULT_METHOD,
+        max_weight: float = portfolio.DEFAULT_CAP,
+        lookback: int = portfolio.DEFAULT_LOOKBACK,
+        costs: Optional[CostModel] = None,
+        volumes: Optional[pd.DataFrame] = None,
+        rebalance: Optional[str] = None,
+        record_trades: bool = False,
+    ):
+        """
+        `method` picks the portfolio.target_weights() sizing rule; `max_weight`
+        caps each position. `costs` is a backtesting.costs model (default:
+        FlatCost(cost_bps, slippage_pct)); `volumes` is the dates x symbols
+        Volume panel the liquidity-based models need.
+
+        `rebalance` (e.g. "1D", "1h", "W"; see calendar.bar_codes) trades only
+        on the first bar of each period, which is also the only time the decider
+        is asked; bars in between are marked to market. Default: every bar.
+        On intraday bars, `lookback` and cost model windows count bars.
+        `record_trades` keeps every fill of a run for trade_log().
+        """
+        if method not in portfolio.METHODS:
+            raise ValueError(f"Unknown portfolio method {method!r}; choose from {sorted(portfolio.METHODS)}")
         self.prices = prices.sort_index()
-        self.cost = cost_bps / 1e4
-        self.slippage = slippage_pct
+        self.costs = costs if costs is not None else FlatCost(cost_bps, slippage_pct)
+        self.volumes = volumes.sort_index() if volumes is not None else None
+        self.seed = seed
+        self.method = method
+        self.max_weight = max_weight
+        self.lookback = lookback
+        self.rebalance = rebalance
+        self.record_trades = record_trades
+        self.trades: List[tuple] = []   # (date, symbol positions, shares, prices, costs) per trading date
+        self.state: Optional[EngineState] = None
+        self.profile = None  # profiling.Profile of the last run(profile=...)
+
+    def rng(self, *keys) -> np.random.Generator:
+        """Seeded generator for anything random around a run (one stream per key)."""
+        return make_rng(self.seed, *keys)
 
-    def run(self, daily_decider: Callable[[pd.Timestamp], Dict[str, Decision]], cash: float = 100_000.0):
+    def run(
+        self,
+        daily_decider: Callable[[pd.Timestamp], Decisions],
+        cash: float = 100_000.0,
+        *,
+        agent: Any = None,
+        inputs: Any = None,
+        cache: Optional[BacktestCache] = None,
+        state: Optional[EngineState] = None,
+        start: Optional[pd.Timestamp] = None,
+        profile: Union[bool, str] = False,
+    ):
         """
         Run backtest. Returns a DataFrame with one row per date: total portfolio equity.
+        `daily_decider` may return a DecisionBatch or a {symbol: Decision} dict.
+
+        With a `cache`, results are memoized by a fingerprint of the prices,
+        `agent` (its config, including seed), `inputs` (whatever else the decider
+        reads, e.g. preloaded fundamentals), volumes, costs and cash; a run whose panel
+        extends a cached one resumes from that checkpoint. Pass `state` to continue
+        from a previous run's `engine.state` instead of starting with `cash`, and
+        `start` to simulate only the bars from then on (earlier ones still feed
+        trailing windows). The end-of-run state is left in `self.state`.
+
+        `profile=True` (or "cprofile" / "sample") profiles the run, writes the
+        profile under results/profiles and leaves it in `self.profile`.
+        """
+        if profile:
+            from agent_lab.profiling import profiled
+            with profiled("backtest", profile) as self.profile:
+                return self.run(daily_decider, cash, agent=agent, inputs=inputs, cache=cache, state=state, start=start)
+
+        if cache is None or agent is None or state is not None or start is not None:
+            prices = self.prices if start is None else self.prices.loc[self.prices.index >= start]
+            equity, self.state = self._simulate(daily_decider, prices, state or EngineState.initial(self.prices.columns, cash))
+            return equity
+
+        base = fingerprint(
+            "backtest", agent, inputs, list(map(str, self.prices.columns)), float(cash),
+            self.costs, self.seed, self.method, self.max_weight,
+            self.lookback if self.method in portfolio.NEEDS_RISK else None, self.rebalance,
+        )
+        # volumes feed the cost model; fingerprinted with the prices bar by bar, so
+        # a run over an extended panel still resumes from a cached prefix
+        panel = self.prices if self.volumes is None else pd.concat(
+            {"price": self.prices, "volume": self.volumes.reindex(self.prices.index)}, axis=1,
+        )
+        hit = cache.get(base, panel)
+        if hit is not None and hit.end == self.prices.index[-1]:
+            self.state = hit.state.copy()
+            return hit.equity.copy()
+
+        if hit is None:
+            equity, self.state = self._simulate(daily_decider, self.prices, EngineState.initial(self.prices.columns, cash))
+        else:
+            rest, self.state = self._simulate(daily_decider, self.prices.loc[self.prices.index > hit.end], hit.state.copy())
+            equity = pd.concat([hit.equity, rest])
+        cache.put(base, panel, equity, self.state)
+        return equity
+
+    def trade_log(self) -> pd.DataFrame:
+        """Fills recorded by runs with record_trades: date, symbol, shares (signed), price, value, cost."""
+        symbols = np.asarray(self.state.symbols if self.state is not None else self.prices.columns, dtype=object)
+        if not self.trades:
+            return pd.DataFrame({c: [] for c in TRADE_COLUMNS})
+        dates, traded, shares, price, cost = zip(*self.trades)
+        shares, price = np.concatenate(shares), np.concatenate(price)
+        return pd.DataFrame({
+            "date": pd.DatetimeIndex(dates).repeat([len(t) for t in traded]),
+            "symbol": symbols[np.concatenate(traded)],
+            "shares": shares,
+            "price": price,
+            "value": shares * price,
+            "cost": np.concatenate(cost),
+        })
+
+    def _weights(self, daily_decider, dates: pd.DatetimeIndex, valid: np.ndarray, symbols, risk):
+        """Decisions for a block of dates and their target weights, sized in one batch."""
+        present = np.zeros(valid.shape, dtype=bool)
+        buy = np.zeros(valid.shape, dtype=bool)
+        signal = np.zeros(valid.shape)
+        for i, dt in enumerate(dates):
+            present[i], actions, confidence, score = DecisionBatch.coerce(daily_decider(dt)).align(symbols)
+            buy[i] = present[i] & (actions == Action.BUY.code)
+            signal[i] = confidence * score
+        return present, portfolio.target_weights(self.method, signal, buy & valid, self.max_weight, risk)
+
+    def _recost(self, day: int, traded: np.ndarray, q: np.ndarray, rate: np.ndarray, mark: np.ndarray,
+                paid: np.ndarray, cut: np.ndarray):
+        """
+        Cost the buys in `cut`, cut down to the cash they got (`paid`, negative),
+        at their own size rather than the full order's: solve
+        q * px * (1 + rate(q)) = -paid by fixed-point iteration. For FlatCost the
+        rates don't depend on size and nothing changes.
         """
-        positions: Dict[str, float] = {sym: 0.0 for sym in self.prices.columns}
-        cash_bal = float(cash)
-        equity_curve = []
-
-        for dt, px in self.prices.iterrows():
-            decs = daily_decider(dt)
-
-            # Compute portfolio value before trades
-            port_val = cash_bal + sum(positions[s] * px[s] for s in positions if pd.notna(px.get(s)))
-
-            # Determine buy weights by confidence * score
-            buy_syms = [s for s, d in decs.items() if d.action == Action.BUY and pd.notna(px.get(s))]
-            weights = {}
-            if buy_syms:
-                scores = [max(0.0, decs[s].confidence * decs[s].score) for s in buy_syms]
-                total = sum(scores) or len(scores)
-                for s, sc in zip(buy_syms, scores):
-                    weights[s] = sc / total
-
-            # Execute trades
-            for s, d in decs.items():
-                if pd.isna(px.get(s)) or px[s] <= 0:
-                    continue
-
-                target_shares = 0.0
-                if s in weights:
-                    target_value = weights[s] * port_val
-                    max_alloc = 0.1 * port_val  # max 10% per position
-                    target_value = min(target_value, max_alloc)
-                    target_shares = target_value / px[s]
-
-                trade = target_shares - positions[s]
-                if abs(trade) < 1e-6:
-                    continue
-
-                trade_value = trade * px[s]
-                if trade > 0:  # buying
-                    trade_cost = trade_value * (1 + self.cost + self.slippage)
-                    if trade_cost > cash_bal:
-                        trade = cash_bal / ((1 + self.cost + self.slippage) * px[s])
-                        trade_value = trade * px[s]
-                        trade_cost = trade_value * (1 + self.cost + self.slippage)
-                    cash_bal -= trade_cost
-                else:  # selling
-                    trade_cost = abs(trade_value) * (self.cost + self.slippage)
-                    cash_bal += abs(trade_value) - trade_cost
-
-                positions[s] += trade
-
-            # --- Record daily equity (ONE ROW per day) ---
-            port_val = cash_bal + sum(positions[s] * px[s] for s in positions if pd.notna(px.get(s)))
-            equity_curve.append({"date": dt, "equity": port_val})
-
-        df = pd.DataFrame(equity_curve).set_index("date")
-        return df
+        shares = np.zeros(len(mark))
+        px = mark[traded]
+        for _ in range(_RECOST_ITERATIONS):
+            shares[traded] = q
+            fresh = self.costs.rates(day, shares, mark)[traded]
+            if np.allclose(fresh[cut], rate[cut], rtol=1e-12, atol=0.0):
+                break
+            rate = np.where(cut, fresh, rate)
+            q = np.where(cut, -paid / (px * (1 + rate)), q)
+        return q, rate
+
+    def _simulate(self, daily_decider, prices: pd.DataFrame, state: EngineState):
+        symbols = state.symbols
+        positions = state.positions.copy()
+        cash_bal = state.cash
+        equity = np.empty(len(prices))
+        # panels are prepared over the full history: when resuming, trailing
+        # windows still see the dates before `prices`
+        rows = self.prices.index.get_indexer(prices.index)
+        history = self.prices.reindex(columns=symbols)
+        values = history.to_numpy(dtype=float)
+        # tradable bars, and the last known price to value positions at on days without one
+        valid = np.isfinite(values) & (values > 0)
+        mark_all = calendar.marks(values, valid)[rows]
+        inv_px = np.where(valid, 1.0 / np.where(valid, values, 1.0), 0.0)[rows]
+        valid = valid[rows]
+        risk = None
+        if self.method in portfolio.NEEDS_RISK and len(prices):
+            risk = portfolio.risk_model(history, self.lookback)
+        volumes = self.volumes.reindex(columns=symbols) if self.volumes is not None else None
+        self.costs.prepare(history, volumes)
+
+        # bars that trade: all of them, or the first of each rebalance period
+        trade_at = np.arange(len(prices))
+        if self.rebalance is not None and len(prices):
+            stamps = prices.index if state.last_date is None else prices.index.insert(0, state.last_date)
+            codes = calendar.bar_codes(stamps, self.rebalance)
+            new = codes[1:] != codes[:-1]
+            trade_at = np.flatnonzero(np.r_[True, new] if state.last_date is None else new)
+
+        done = 0    # rows whose equity is recorded
+        for start in range(0, len(trade_at), _BLOCK):
+            at = trade_at[start:start + _BLOCK]
+            present, weights = self._weights(
+                daily_decider, prices.index[at], valid[at], symbols,
+                risk.rows(rows[at]) if risk is not None else None,
+            )
+            tradable = present & valid[at]
+            for i, ok, w in zip(at, tradable, weights):
+                # bars since the last rebalance just mark the positions held
+                equity[done:i] = cash_bal + mark_all[done:i] @ positions
+                mark, inv = mark_all[i], inv_px[i]
+
+                # Compute portfolio value before trades
+                port_val = cash_bal + positions @ mark
+
+                # Trades towards the target weights, costed together
+                trade = np.where(ok, w * port_val * inv - positions, 0.0)
+                trade[np.abs(trade) < 1e-6] = 0.0
+                if trade.any():
+                    traded = np.flatnonzero(trade)
+                    q = trade[traded]
+                    rate = self.costs.rates(rows[i], trade, mark)[traded]
+                    value = q * mark[traded]
+                    # buys cost value * (1 + rate), sells return |value| * (1 - rate)
+                    flow = np.where(q > 0, -value * (1 + rate), -value * (1 - np.minimum(rate, 1.0)))
+                    # in symbol order, a buy the cash can't cover is cut down to what is left:
+                    # cash_k = max(cash_k-1 + flow_k, 0), i.e. running sum minus its running minimum below 0
+                    run = cash_bal + np.cumsum(flow)
+                    if run.min() < 0:
+                        cash_path = run - np.minimum(np.minimum.accumulate(run), 0.0)
+                        paid = np.diff(cash_path, prepend=cash_bal)
+                        with np.errstate(invalid="ignore", divide="ignore"):
+                            q = q * np.where(q > 0, np.clip(paid / flow, 0.0, 1.0), 1.0)
+                        # the cut-down buys, re-costed at their own size
+                        cut = (q > 0) & (paid > flow * (1 - 1e-9))
+                        q, rate = self._recost(rows[i], traded, q, rate, mark, paid, cut)
+                        run = cash_path
+                    positions[traded] += q
+                    cash_bal = run[-1]
+                    if self.record_trades:
+                        self.trades.append((prices.index[i], traded, q, mark[traded], np.abs(q * mark[traded]) * np.minimum(rate, 1.0)))
+
+                # --- Record daily equity (ONE ROW per day) ---
+                equity[i] = cash_bal + positions @ mark
+                done = i + 1
+        equity[done:] = cash_bal + mark_all[done:] @ positions
+
+        df = pd.DataFrame({"equity": equity}, index=pd.Index(prices.index, name="date"))
+        last = prices.index[-1] if len(prices) else state.last_date
+        return df, EngineState(symbols, positions, cash_bal, last)
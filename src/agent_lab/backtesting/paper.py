@@ -0,0 +1,389 @@
+# src/agent_lab/backtesting/paper.py
+"""
+Paper trading: a BacktestEngine portfolio carried forward one day at a time.
+
+    trader = PaperTrader.create("data/paper/buffett", "buffett", symbols, cash=100_000)
+    trades = trader.step(SourceFeed(symbols).latest())     # today's bar and fundamentals
+    trader = PaperTrader("data/paper/buffett")             # tomorrow, in a new process
+
+    # the same loop over stored history, e.g. against a stand-in for the live feed
+    for update in ReplayFeed.from_panel(PanelStore("data/panels/sp500"), start="2024-01-02", fundamentals=funds):
+        trader.step(update)
+
+An account directory holds account.pkl (engine state, the agent's current
+decisions, the fundamentals they came from and the last few bars), ledger.csv
+(every fill, appended) and equity.csv (one row per day, appended). A step
+touches only the new bar and the fundamentals rows that changed: those symbols
+are re-scored and the rest keep their decisions, and the engine simulates the
+one new date over just the bars its trailing windows need. A day costs
+O(universe) however long the account has been running.
+
+An ensemble account made with learn=True also learns its members' weights as
+it goes (agent_lab.ensemble.learning): each day's member votes are settled
+against the close `horizon` days later, and the learner is saved to
+`weights_path` after every day, where the API's ensemble picks it up.
+
+    trader = PaperTrader.create("data/paper/oversight", "oversight", symbols, learn=True,
+                                weights_path="data/ensemble/oversight.json")
+"""
+from __future__ import annotations
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Union
+import numpy as np
+import pandas as pd
+from agent_lab import portfolio
+from agent_lab.agents.base import DecisionBatch, decide_many
+from agent_lab.backtesting.costs import CostModel
+from agent_lab.backtesting.engine import TRADE_COLUMNS, BacktestEngine, EngineState
+from agent_lab.backtesting.streaming import warmup_bars
+from agent_lab.data_connectors.normalize import apply_schema
+from agent_lab.ensemble.learning import DEFAULT_HORIZON, OnlineWeights, member_votes
+
+DEFAULT_PAPER_DIR = "data/paper"
+ACCOUNT_FILE = "account.pkl"
+LEDGER_FILE = "ledger.csv"
+EQUITY_FILE = "equity.csv"
+_VERSION = 1
+
+def rows_frame(rows: Mapping[str, Optional[dict]]) -> pd.DataFrame:
+    """Normalized {symbol: row or None} rows (e.g. DataService.fundamentals()) as a typed frame."""
+    frame = pd.DataFrame.from_dict({s: r for s, r in rows.items() if r is not None}, orient="index")
+    return apply_schema(frame.rename_axis("symbol"))
+
+@dataclass
+class DailyUpdate:
+    """One day of data: closes per symbol, optionally volumes and fundamentals rows (indexed by symbol)."""
+    date: pd.Timestamp
+    close: pd.Series
+    volume: Optional[pd.Series] = None
+    fundamentals: Optional[pd.DataFrame] = None
+
+class ReplayFeed:
+    """
+    DailyUpdates from stored dates x symbols panels, a local stand-in for the
+    live feed. `fundamentals` is a frame sent with the first day, or
+    {date: frame} sent on those dates.
+    """
+
+    def __init__(
+        self,
+        close: pd.DataFrame,
+        volume: Optional[pd.DataFrame] = None,
+        fundamentals: Union[pd.DataFrame, Mapping, None] = None,
+    ):
+        self.close = close.sort_index()
+        self.volume = volume.reindex_like(self.close) if volume is not None else None
+        self.fundamentals = fundamentals
+
+    @classmethod
+    def from_panel(cls, store, symbols: Optional[Iterable[str]] = None, start=None, end=None,
+                   field: str = "Adj Close", volume: bool = False, fundamentals=None) -> "ReplayFeed":
+        """Replay a PanelStore's `field` (and Volume) from `start` to `end`."""
+        symbols = None if symbols is None else [s for s in symbols if s in store]
+        close = store.field(field, symbols, start, end)
+        vol = store.field("Volume", symbols, start, end) if volume else None
+        return cls(close, vol, fundamentals)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __iter__(self) -> Iterator[DailyUpdate]:
+        snapshots = {}
+        if isinstance(self.fundamentals, Mapping):
+            snapshots = {pd.Timestamp(k): v for k, v in self.fundamentals.items()}
+        elif self.fundamentals is not None and len(self.close):
+            snapshots = {self.close.index[0]: self.fundamentals}
+        for i, day in enumerate(self.close.index):
+            yield DailyUpdate(
+                day, self.close.iloc[i], self.volume.iloc[i] if self.volume is not None else None, snapshots.get(day),
+            )
+
+class SourceFeed:
+    """The latest bar and fundamentals for `symbols` from the active data source: the live daily feed."""
+
+    def __init__(self, symbols: Iterable[str], field: str = "Adj Close", period: str = "5d"):
+        self.symbols = list(symbols)
+        self.field = field
+        self.period = period
+
+    def latest(self) -> DailyUpdate:
+        """The most recent date any symbol has a bar for; symbols without a bar that day are NaN."""
+        from agent_lab.data_connectors.data_service import get_data_service
+        from agent_lab.data_connectors.sources import get_data_source
+
+        source = get_data_source()
+        bars = {}
+        for s in self.symbols:
+            try:
+                df = source.price_history(s, period=self.period)
+            except Exception as e:
+                print(f"[paper] prices {s} failed: {e}", file=sys.stderr)
+                continue
+            if len(df):
+                bars[s] = df.iloc[-1]
+        if not bars:
+            raise LookupError("no prices for any symbol in the feed")
+        day = max(bar.name for bar in bars.values())
+        bars = {s: bar for s, bar in bars.items() if bar.name == day}
+        close = pd.Series({s: bar.get(self.field, np.nan) for s, bar in bars.items()}, dtype=np.float64)
+        volume = pd.Series({s: bar.get("Volume", np.nan) for s, bar in bars.items()}, dtype=np.float64)
+        funds = rows_frame(get_data_service().fundamentals(self.symbols))
+        return DailyUpdate(pd.Timestamp(day), close.reindex(self.symbols), volume.reindex(self.symbols), funds)
+
+class PaperTrader:
+    """A paper-trading account on disk; see the module docstring."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, ACCOUNT_FILE), "rb") as f:
+            account = pickle.load(f)
+        self.agent_name: str = account["agent"]
+        self.seed: int = account["seed"]
+        self.engine_kwargs: dict = account["engine"]
+        self.state: EngineState = account["state"]
+        self.fundamentals: pd.DataFrame = account["fundamentals"]
+        self.decisions: DecisionBatch = account["decisions"]
+        self.history: pd.DataFrame = account["history"]
+        self.volume_history: Optional[pd.DataFrame] = account["volume_history"]
+        self.marks: np.ndarray = account["marks"]
+        # ensemble weight learning: learner, horizon, weights_path, members' decisions, unsettled votes
+        self.learning: Optional[dict] = account.get("learning")
+        self._agent = None
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        agent: str,
+        symbols: Iterable[str],
+        cash: float = 100_000.0,
+        seed: int = 0,
+        method: str = portfolio.DEFAULT_METHOD,
+        max_weight: float = portfolio.DEFAULT_CAP,
+        lookback: int = portfolio.DEFAULT_LOOKBACK,
+        costs: Optional[CostModel] = None,
+        cost_bps: float = 5.0,
+        slippage_pct: float = 0.001,
+        learn: bool = False,
+        horizon: int = DEFAULT_HORIZON,
+        weights_path: Optional[str] = None,
+    ) -> "PaperTrader":
+        """
+        A new account trading `symbols` with the registered agent `agent`,
+        starting from `cash`; the engine options are BacktestEngine's. With
+        `learn`, an ensemble agent learns its weights, continuing from
+        `weights_path` if it exists.
+        """
+        from agent_lab.agents.registry import get_agent
+        template = get_agent(agent)     # fail on an unknown name before anything is written
+        learning = None
+        if learn:
+            if not hasattr(template, "combine_batch"):
+                raise ValueError(f"Agent {agent!r} is not an ensemble; only ensembles learn weights")
+            members = [a.name for a in template.agents]
+            exists = weights_path is not None and os.path.exists(weights_path)
+            learner = OnlineWeights.load(weights_path) if exists else OnlineWeights(members)
+            learning = {"learner": learner, "horizon": horizon, "weights_path": weights_path,
+                        "members": {}, "pending": []}
+        if os.path.exists(os.path.join(path, ACCOUNT_FILE)):
+            raise FileExistsError(f"{path} already holds a paper account")
+        if method not in portfolio.METHODS:
+            raise ValueError(f"Unknown portfolio method {method!r}; choose from {sorted(portfolio.METHODS)}")
+        symbols = list(dict.fromkeys(symbols))
+        os.makedirs(path, exist_ok=True)
+        columns = pd.Index(symbols)
+        _save(path, {
+            "version": _VERSION,
+            "agent": agent,
+            "seed": seed,
+            "engine": dict(method=method, max_weight=max_weight, lookback=lookback, costs=costs,
+                           cost_bps=cost_bps, slippage_pct=slippage_pct),
+            "state": EngineState.initial(symbols, cash),
+            "fundamentals": pd.DataFrame(index=pd.Index([], name="symbol")),
+            "decisions": DecisionBatch([], [], [], []),
+            "history": pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"), dtype=np.float64),
+            "volume_history": None,
+            "marks": np.zeros(len(symbols)),
+            "learning": learning,
+        })
+        return cls(path)
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.state.symbols
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            from agent_lab.agents.registry import get_agent
+            from agent_lab.seeding import with_seed
+            self._agent = with_seed(get_agent(self.agent_name), self.seed)
+            if self.learning is not None:
+                self._agent.learner = self.learning["learner"]
+        return self._agent
+
+    # --- the daily step --------------------------------------------------------
+
+    def step(self, update: DailyUpdate) -> pd.DataFrame:
+        """
+        Ingest one day: re-score the symbols whose fundamentals changed, trade
+        that day's bar towards the target weights, append the fills to the
+        ledger and the day's equity, and save the account. Returns the fills.
+        Days at or before the last one ingested are skipped.
+        """
+        day = pd.Timestamp(update.date)
+        close = update.close.reindex(self.symbols).to_numpy(dtype=np.float64)
+        last = self.state.last_date
+        if (last is not None and day <= last) or not np.isfinite(close).any():
+            return _no_trades()
+        if update.fundamentals is not None:
+            self._rescore(update.fundamentals)
+        if self.learning is not None:
+            self.decisions = self._learn(close)
+        self._append(day, close, update.volume)
+
+        engine = BacktestEngine(
+            self.history, volumes=self.volume_history, seed=self.seed, record_trades=True, **self.engine_kwargs,
+        )
+        decisions = self.decisions
+        equity = engine.run(lambda dt: decisions, state=self.state, start=day)
+        self.state = engine.state
+        self._trim(warmup_bars(engine))
+        # the account first: after a crash the day is not traded twice, at worst missing from the logs
+        self.save()
+        trades = engine.trade_log()
+        self._log(LEDGER_FILE, trades)
+        self._log(EQUITY_FILE, pd.DataFrame({
+            "date": [day], "equity": [float(equity["equity"].iloc[-1])], "cash": [self.state.cash],
+            "positions": [int(np.count_nonzero(self.state.positions))],
+        }))
+        return trades
+
+    def run(self, updates: Iterable[DailyUpdate]) -> pd.DataFrame:
+        """step() through `updates` (e.g. a ReplayFeed); returns all their fills."""
+        trades = [self.step(u) for u in updates]
+        trades = [t for t in trades if len(t)]
+        return pd.concat(trades, ignore_index=True) if trades else _no_trades()
+
+    def _rescore(self, rows: pd.DataFrame) -> None:
+        """Take in fundamentals rows and re-score the symbols whose row changed."""
+        rows = rows.loc[rows.index.isin(self.symbols) & ~rows.index.duplicated(keep="last")]
+        old = self.fundamentals.reindex(index=rows.index, columns=rows.columns)
+        a, b = old.astype(object), rows.astype(object)
+        same = ((a.isna() & b.isna()) | (a.where(a.notna(), np.nan) == b.where(b.notna(), np.nan))).all(axis=1)
+        changed = rows.index[~same.to_numpy()]
+        if not len(changed):
+            return
+        kept = self.fundamentals.drop(index=changed, errors="ignore")
+        self.fundamentals = apply_schema(pd.concat([kept, rows.loc[changed]]) if len(kept) else rows.loc[changed])
+        if self.learning is None:
+            self.decisions = _merge(self.decisions, changed, decide_many(self.agent, list(changed), rows.loc[changed]))
+            return
+        # a learning ensemble keeps its members' decisions and combines them daily with the current weights
+        members = self.learning["members"]
+        for member in self.agent.agents:
+            fresh = decide_many(member, list(changed), rows.loc[changed])
+            members[member.name] = _merge(members.get(member.name), changed, fresh)
+
+    def _learn(self, close: np.ndarray) -> DecisionBatch:
+        """
+        Settle the votes cast `horizon` days ago against today's close, record
+        today's, and combine the members' decisions with the updated weights.
+        """
+        learning = self.learning
+        learner: OnlineWeights = learning["learner"]
+        members, pending = learning["members"], learning["pending"]
+        sectors = None
+        if "sector" in self.fundamentals.columns:
+            sectors = self.fundamentals["sector"].reindex(self.symbols)
+        while len(pending) >= learning["horizon"]:
+            close0, votes = pending.pop(0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                returns = close / close0 - 1.0
+            learner.update(votes, returns, None if sectors is None else sectors.to_numpy(dtype=object))
+        pending.append((close, member_votes(members, learner.agents, self.symbols)))
+        if learning["weights_path"]:
+            learner.save(learning["weights_path"])
+        return self.agent.combine_batch(members, sectors=sectors)
+
+    def _append(self, day: pd.Timestamp, close: np.ndarray, volume: Optional[pd.Series]) -> None:
+        index = pd.DatetimeIndex([day], name=self.history.index.name)
+        row = pd.DataFrame([close], index=index, columns=self.history.columns)
+        self.history = pd.concat([self.history, row]) if len(self.history) else row
+        self.marks = np.where(np.isfinite(close) & (close > 0), close, self.marks)
+        if volume is not None:
+            vol = pd.DataFrame([volume.reindex(self.symbols).to_numpy(dtype=np.float64)], index=index,
+                               columns=self.history.columns)
+            hist = self.volume_history
+            self.volume_history = pd.concat([hist, vol]) if hist is not None and len(hist) else vol
+
+    def _trim(self, keep: int) -> None:
+        """Keep the last `keep` bars; symbols with no bar among them carry their last price on the first one."""
+        self.history = self.history.iloc[-keep:].copy()
+        stale = ~np.isfinite(self.history.to_numpy()).any(axis=0) & (self.marks > 0)
+        if stale.any():
+            self.history.iloc[0, np.flatnonzero(stale)] = self.marks[stale]
+        if self.volume_history is not None:
+            self.volume_history = self.volume_history.iloc[-keep:]
+
+    # --- persistence -------------------------------------------------------------
+
+    def save(self) -> None:
+        _save(self.path, {
+            "version": _VERSION,
+            "agent": self.agent_name,
+            "seed": self.seed,
+            "engine": self.engine_kwargs,
+            "state": self.state,
+            "fundamentals": self.fundamentals,
+            "decisions": self.decisions,
+            "history": self.history,
+            "volume_history": self.volume_history,
+            "marks": self.marks,
+            "learning": self.learning,
+        })
+
+    def _log(self, name: str, rows: pd.DataFrame) -> None:
+        if len(rows):
+            path = os.path.join(self.path, name)
+            rows.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    def _read(self, name: str) -> pd.DataFrame:
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, parse_dates=["date"])
+
+    def ledger(self) -> pd.DataFrame:
+        """Every fill so far: date, symbol, shares (signed), price, value, cost."""
+        return self._read(LEDGER_FILE)
+
+    def equity(self) -> pd.DataFrame:
+        """One row per day ingested: date, equity, cash, positions held."""
+        return self._read(EQUITY_FILE)
+
+    def positions(self) -> pd.Series:
+        """Shares held, by symbol (nonzero only)."""
+        held = np.flatnonzero(self.state.positions)
+        return pd.Series(self.state.positions[held], index=pd.Index(np.asarray(self.symbols)[held], name="symbol"),
+                         name="shares")
+
+def _merge(batch: Optional[DecisionBatch], changed: pd.Index, fresh: DecisionBatch) -> DecisionBatch:
+    """`batch` with the decisions for `changed` symbols replaced by `fresh`."""
+    if batch is None or not len(batch):
+        return fresh
+    keep = np.flatnonzero(~batch.index.isin(changed))
+    return DecisionBatch.concat([batch.take(keep), fresh])
+
+def _no_trades() -> pd.DataFrame:
+    return pd.DataFrame({c: [] for c in TRADE_COLUMNS})
+
+def _save(path: str, account: Dict) -> None:
+    # written aside and swapped in, so a crash mid-save leaves the previous day's account
+    tmp = os.path.join(path, f"{ACCOUNT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(account, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, os.path.join(path, ACCOUNT_FILE))
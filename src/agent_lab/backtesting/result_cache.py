@@ -0,0 +1,178 @@
+# src/agent_lab/backtesting/result_cache.py
+"""
+On-disk cache of BacktestEngine.run results.
+
+A run is identified by a fingerprint of everything that determines its output:
+agent config, the decider's inputs, costs, cash, seed, the symbol set and the
+price panel itself. Entries also keep the engine's end-of-run state, so a run
+over the same panel extended by a few dates resumes from the longest cached
+prefix instead of starting over.
+
+Files are named <base>-<end>-<prices>.pkl, where <base> covers everything but
+the prices, <end> is the last date (ns) and <prices> hashes the panel up to it.
+"""
+from __future__ import annotations
+import datetime
+import hashlib
+import os
+import pickle
+import types
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "data/cache_backtests"
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+def _feed(h, obj: Any) -> None:
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, Enum):
+        h.update(f"{type(obj).__name__}.{obj.name};".encode())
+    elif isinstance(obj, (datetime.date, datetime.time, datetime.timedelta)):
+        # pd.Timestamp / pd.Timedelta included; their repr is the value
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, type):
+        h.update(f"type:{obj.__module__}.{obj.__qualname__};".encode())
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(f"{type(obj).__name__}{obj.shape};".encode())
+        if isinstance(obj, pd.DataFrame):
+            _feed(h, [str(c) for c in obj.columns])
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        _feed(h, list(map(str, obj)))
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray{obj.dtype}{obj.shape};".encode())
+        h.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else repr(obj.tolist()).encode())
+    elif isinstance(obj, np.generic):
+        _feed(h, obj.item())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=repr):
+            _feed(h, k)
+            _feed(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = sorted(obj, key=repr) if isinstance(obj, (set, frozenset)) else obj
+        h.update(b"[")
+        for v in items:
+            _feed(h, v)
+        h.update(b"]")
+    else:
+        # agents and other config objects: class + public attributes
+        cls = type(obj)
+        h.update(f"{cls.__module__}.{cls.__qualname__};".encode())
+        _feed(h, _config(obj))
+
+_OPAQUE = (types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType, types.GeneratorType)
+
+def _config(obj: Any) -> dict:
+    """
+    The public attributes (instance dict and __slots__) that configure `obj`.
+    Objects that can't be fingerprinted by value raise TypeError rather than
+    risk a key that is unstable across runs (a repr with an address) or shared
+    by differently configured instances (state held only in private attributes).
+    """
+    cls = type(obj)
+    if isinstance(obj, _OPAQUE):
+        raise TypeError(f"can't fingerprint {cls.__qualname__} {obj!r}")
+    attrs = dict(vars(obj)) if hasattr(obj, "__dict__") else {}
+    slots = [s for c in cls.__mro__ for s in getattr(c, "__slots__", ()) if s not in ("__dict__", "__weakref__")]
+    attrs.update({s: getattr(obj, s) for s in slots if hasattr(obj, s)})
+    if not hasattr(obj, "__dict__") and not slots:
+        raise TypeError(f"can't fingerprint {cls.__module__}.{cls.__qualname__}: no attributes to hash")
+    public = {k: v for k, v in attrs.items() if not k.startswith("_")}
+    if attrs and not public:
+        raise TypeError(
+            f"can't fingerprint {cls.__module__}.{cls.__qualname__}: its state is all in private attributes"
+        )
+    return public
+
+def fingerprint(*objs: Any) -> str:
+    """Stable content hash of (nested) config values, arrays, frames and agents."""
+    h = hashlib.sha256()
+    for obj in objs:
+        _feed(h, obj)
+    return h.hexdigest()[:32]
+
+@dataclass
+class CachedRun:
+    equity: pd.DataFrame
+    state: Any              # backtesting.engine.EngineState at `equity`'s last date
+    end: pd.Timestamp
+
+class BacktestCache:
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, base: str, end: pd.Timestamp, prices_fp: str) -> str:
+        return os.path.join(self.root, f"{base}-{pd.Timestamp(end).value}-{prices_fp}.pkl")
+
+    @staticmethod
+    def _load(path: str) -> Optional[CachedRun]:
+        try:
+            with open(path, "rb") as f:
+                run = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return run
+
+    def get(self, base: str, prices: pd.DataFrame) -> Optional[CachedRun]:
+        """Exact hit for `prices`, else the longest cached run over a prefix of it (or None)."""
+        if prices.empty or not os.path.isdir(self.root):
+            return None
+        end = prices.index[-1]
+        candidates = []
+        for name in os.listdir(self.root):
+            if not (name.startswith(base + "-") and name.endswith(".pkl")):
+                continue
+            _, end_ns, prices_fp = name[:-4].split("-")
+            cached_end = pd.Timestamp(int(end_ns), tz=getattr(end, "tz", None))
+            if cached_end <= end:
+                candidates.append((cached_end, prices_fp, name))
+
+        for cached_end, prices_fp, name in sorted(candidates, reverse=True):
+            if fingerprint(prices.loc[:cached_end]) == prices_fp:
+                run = self._load(os.path.join(self.root, name))
+                if run is not None:
+                    return run
+        return None
+
+    def put(self, base: str, prices: pd.DataFrame, equity: pd.DataFrame, state: Any) -> None:
+        if prices.empty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        end = prices.index[-1]
+        path = self._path(base, end, fingerprint(prices))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(CachedRun(equity=equity, state=state, end=end), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the directory fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".pkl"):
+                st = os.stat(os.path.join(self.root, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.root, name))
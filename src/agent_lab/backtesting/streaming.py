@@ -0,0 +1,83 @@
+# src/agent_lab/backtesting/streaming.py
+"""
+Backtests over more bars than fit in memory (years of minute bars), streamed
+partition by partition from a PartitionedPanel.
+
+    panel = PartitionedPanel("data/panels/sp500-5m")
+    equity, state = stream_backtest(panel, decider, rebalance="1D", sample="1h")
+
+Every partition is simulated by its own BacktestEngine. The portfolio
+(EngineState) carries over from one to the next, and the last `warmup` bars of
+the previous partition come along as history, so trailing windows (risk model
+lookback, cost model volatility and ADV) don't restart. Only the sampled equity
+is kept, the last bar of each `sample` period, so memory is bounded by one
+partition however long the run.
+"""
+from __future__ import annotations
+import itertools
+from typing import Callable, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from agent_lab import portfolio
+from agent_lab.backtesting.engine import BacktestEngine, Decisions, EngineState
+from agent_lab.data_connectors import calendar
+
+DEFAULT_SAMPLE = "1D"
+
+def sample_equity(equity: pd.DataFrame, every: Optional[str] = DEFAULT_SAMPLE) -> pd.DataFrame:
+    """The last row of each `every` period (see calendar.bar_codes); None keeps every row."""
+    if every is None or equity.empty:
+        return equity
+    codes = calendar.bar_codes(equity.index, every)
+    return equity.loc[np.r_[codes[1:] != codes[:-1], True]]
+
+def warmup_bars(engine: BacktestEngine) -> int:
+    """Bars of history the engine's trailing windows need."""
+    risk = engine.lookback if engine.method in portfolio.NEEDS_RISK else 0
+    return max(risk, getattr(engine.costs, "window", 0)) + 1
+
+def stream_backtest(
+    panel,
+    daily_decider: Callable[[pd.Timestamp], Decisions],
+    cash: float = 100_000.0,
+    *,
+    symbols: Optional[Iterable[str]] = None,
+    start=None,
+    end=None,
+    field: str = "Close",
+    sample: Optional[str] = DEFAULT_SAMPLE,
+    volumes: bool = False,
+    warmup: Optional[int] = None,
+    state: Optional[EngineState] = None,
+    **engine_kwargs,
+) -> Tuple[pd.DataFrame, EngineState]:
+    """
+    Run `daily_decider` over `panel` (a PartitionedPanel) from `start` to `end`.
+    `engine_kwargs` go to every BacktestEngine (method, costs, rebalance, ...);
+    `volumes=True` streams the Volume field alongside for liquidity-based cost
+    models. `warmup` defaults to what the sizing method and cost model need.
+    Returns the sampled equity and the final state, which a later call can
+    continue from.
+    """
+    symbols = None if symbols is None else list(symbols)
+    price_chunks = panel.field(field, symbols, start, end)
+    volume_chunks = panel.field("Volume", symbols, start, end) if volumes else itertools.repeat(None)
+    tail = volume_tail = None
+    sampled = []
+    for prices, vol in zip(price_chunks, volume_chunks):
+        history = prices if tail is None else pd.concat([tail, prices])
+        if vol is not None and volume_tail is not None:
+            vol = pd.concat([volume_tail, vol])
+        engine = BacktestEngine(history, volumes=vol, **engine_kwargs)
+        equity = engine.run(daily_decider, cash, state=state, start=prices.index[0])
+        state = engine.state
+        sampled.append(sample_equity(equity, sample))
+        keep = warmup if warmup is not None else warmup_bars(engine)
+        tail = history.iloc[-keep:] if keep else None
+        volume_tail = vol.iloc[-keep:] if keep and vol is not None else None
+
+    if not sampled:
+        empty = pd.DataFrame({"equity": np.empty(0)}, index=pd.DatetimeIndex([], name="date"))
+        return empty, state or EngineState.initial(symbols or panel.symbols, cash)
+    # a sample period spanning two partitions was sampled in both
+    return sample_equity(pd.concat(sampled), sample), state
@@ -0,0 +1,681 @@
+# src/agent_lab/cli.py
+"""
+`agent-lab` command line entry point.
+
+Subcommands import what they need when they run, so startup stays fast:
+`agent-lab decide AAPL` loads one agent and the fundamentals cache, nothing else.
+
+Batch subcommands (screen, backtest, sweep, evaluate, warm-cache) take a
+universe file, write rows to CSV or Parquet as soon as they are produced,
+fan out over --workers, and with --offline run purely from the local caches.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Optional
+from agent_lab.data_connectors.universe import load_universe
+
+DEFAULT_SCREEN_CHUNK = 200
+
+# --- helpers -----------------------------------------------------------------
+
+def _universe(args) -> List[str]:
+    symbols = [s.upper() for s in (args.symbols or [])]
+    if args.universe:
+        symbols += load_universe(args.universe)
+    if not symbols:
+        # e.g. --data-source synthetic:500 enumerates its own universe
+        from agent_lab.data_connectors.sources import get_data_source
+        symbols = get_data_source().universe()
+    if not symbols:
+        raise SystemExit("no symbols: pass --universe FILE and/or --symbols")
+    return list(dict.fromkeys(symbols))
+
+class ResultWriter:
+    """
+    Streams DataFrame chunks to CSV (header once) or Parquet (one row group per
+    chunk). Path '-' or None writes CSV to stdout.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = None if path in (None, "-") else path
+        self.parquet = bool(self.path) and self.path.endswith(".parquet")
+        self._pq_writer = None
+        self._wrote_header = False
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if not self.parquet and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def write(self, df) -> None:
+        if df is None or df.empty:
+            return
+        if self.parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq_writer is None:
+                self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+            self._pq_writer.write_table(table)
+            return
+        target = self.path or sys.stdout
+        df.to_csv(target, mode="a", header=not self._wrote_header, index=False)
+        self._wrote_header = True
+        if target is sys.stdout:
+            sys.stdout.flush()
+
+    def close(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+            self._pq_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def parallel_map(fn: Callable, jobs: Iterable, workers: int, processes: bool = False) -> Iterator:
+    """Yield fn(job) results as they complete (in order when workers <= 1)."""
+    jobs = list(jobs)
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield fn(job)
+        return
+    pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        futures = [pool.submit(fn, job) for job in jobs]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+def _load_fundamentals(symbols: List[str], workers: int) -> dict:
+    from agent_lab.data_connectors.cache import get_fundamentals
+
+    def _one(sym):
+        try:
+            return sym, get_fundamentals(sym)
+        except Exception as e:
+            print(f"[WARN] fundamentals for {sym} failed: {e}", file=sys.stderr)
+            return sym, None
+
+    return dict(parallel_map(_one, symbols, workers))
+
+def _load_prices(symbols: List[str], start: Optional[str], end: Optional[str], panel: Optional[str] = None):
+    from agent_lab.data_connectors.data_service import get_data_service
+
+    if panel:
+        from agent_lab.data_connectors.panel_store import PanelStore
+        store = PanelStore(panel)
+        prices = store.field("Adj Close", [s for s in symbols if s in store], start, end)
+        if prices.empty:
+            raise SystemExit(f"none of the requested symbols are in the panel {panel}")
+        return prices
+    prices = get_data_service().prices(symbols)
+    if prices.empty:
+        raise SystemExit("no price data for the requested universe")
+    if start:
+        prices = prices.loc[prices.index >= _as_index_ts(start, prices.index)]
+    if end:
+        prices = prices.loc[prices.index <= _as_index_ts(end, prices.index)]
+    return prices
+
+def _load_volumes(prices, costs: Iterable[str], panel: Optional[str] = None):
+    """Volume panel matching `prices`, loaded only when a liquidity-based cost model is used."""
+    from agent_lab.data_connectors.data_service import get_data_service
+
+    if "impact" not in costs:
+        return None
+    if panel:
+        from agent_lab.data_connectors.panel_store import PanelStore
+        return PanelStore(panel).field("Volume", prices.columns, prices.index[0], prices.index[-1])
+    return get_data_service().prices(list(prices.columns), field="Volume").reindex_like(prices)
+
+def _to_bars(prices, volumes, bars: str):
+    """Daily prices (and volumes) as weekly / monthly bars; "D" leaves them daily."""
+    if bars == "D":
+        return prices, volumes
+    from agent_lab.data_connectors.calendar import resample
+    return resample(prices, bars, "last"), resample(volumes, bars, "sum") if volumes is not None else None
+
+def _backtest_symbols(args) -> List[str]:
+    # a panel brings its own universe
+    if args.panel and not (args.universe or args.symbols):
+        from agent_lab.data_connectors.panel_store import PanelStore, PartitionedPanel, is_partitioned
+        return (PartitionedPanel if is_partitioned(args.panel) else PanelStore)(args.panel).symbols
+    return _universe(args)
+
+def _streams(args) -> bool:
+    """Whether --panel is an intraday (partitioned) panel, backtested by streaming it."""
+    from agent_lab.data_connectors.panel_store import is_partitioned
+    return bool(args.panel) and is_partitioned(args.panel)
+
+def _as_index_ts(value: str, index):
+    import pandas as pd
+    ts = pd.Timestamp(value)
+    tz = getattr(index, "tz", None)
+    return ts.tz_localize(tz) if tz is not None and ts.tzinfo is None else ts
+
+BARS_PER_YEAR = {"D": 252, "W": 52, "M": 12}
+
+def _bars_per_year(sample: Optional[str]) -> float:
+    """Annualization for equity sampled every `sample` (intraday: 6.5-hour sessions, 252 a year)."""
+    import pandas as pd
+    if sample is None or sample in BARS_PER_YEAR:
+        return BARS_PER_YEAR.get(sample, 252)
+    return 252 * max(pd.Timedelta(hours=6.5) / pd.Timedelta(sample), 1.0)
+
+def summarize_equity(equity, bars_per_year: int = 252) -> dict:
+    """Total return, annualized Sharpe (daily bars by default) and max drawdown of an equity curve."""
+    import numpy as np
+    values = equity["equity"].to_numpy(dtype=float)
+    if len(values) == 0:
+        return {"final_equity": float("nan"), "total_return": float("nan"), "sharpe": float("nan"), "max_drawdown": float("nan")}
+    rets = np.diff(values) / values[:-1] if len(values) > 1 else np.zeros(0)
+    sd = rets.std(ddof=1) if len(rets) > 1 else 0.0
+    peak = np.maximum.accumulate(values)
+    return {
+        "final_equity": values[-1],
+        "total_return": values[-1] / values[0] - 1.0,
+        "sharpe": float(np.sqrt(bars_per_year) * rets.mean() / sd) if sd > 0 else 0.0,
+        "max_drawdown": float((values / peak - 1.0).min()),
+    }
+
+def _profile_in_workers(jobs: List[dict], args) -> None:
+    # --profile only sees the parent process; runs farmed out to workers profile themselves
+    from agent_lab.profiling import profile_mode
+    if args.profile and args.workers > 1 and len(jobs) > 1:
+        for job in jobs:
+            job["profile"] = profile_mode(args)
+
+def _backtest_job(job: dict):
+    """One backtest; module-level so it can run in a worker process."""
+    from agent_lab.agents.base import decide_many
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.backtesting.costs import FeeSchedule, SpreadImpactCost
+    from agent_lab.backtesting.engine import BacktestEngine
+    from agent_lab.backtesting.result_cache import BacktestCache
+    from agent_lab.seeding import with_seed
+
+    prices, funds = job["prices"], job["funds"]
+    agent = with_seed(get_agent(job["agent"]), job["seed"])
+    if job.get("learn"):
+        return job, _learning_backtest(job, agent)
+    # "impact": spread + square-root impact on top of cost_bps fees; "flat": cost_bps + slippage
+    costs = SpreadImpactCost(fees=FeeSchedule(bps=job["cost_bps"])) if job["costs"] == "impact" else None
+    engine = BacktestEngine(
+        prices, cost_bps=job["cost_bps"], seed=job["seed"], method=job["sizing"],
+        costs=costs, volumes=job.get("volumes"),
+    )
+    # fundamentals are a single snapshot, so every day sees the same decisions
+    decisions = decide_many(agent, list(prices.columns), funds)
+
+    def daily_decider(dt):
+        return decisions
+
+    cache = BacktestCache() if job["cache"] else None
+    equity = engine.run(
+        daily_decider, cash=job["cash"], agent=agent, inputs=funds, cache=cache, profile=job.get("profile"),
+    )
+    if engine.profile is not None:
+        print(f"[profile] backtest {job['agent']}: {engine.profile.path}", file=sys.stderr)
+    return job, equity
+
+def _learning_backtest(job: dict, ensemble):
+    """
+    An ensemble backtest that learns its members' weights as it runs. With a
+    "weights_dir", it continues from <weights_dir>/<agent>.json (if present) and
+    saves the learned weights back there; otherwise they are only reported.
+    """
+    import pandas as pd
+    from agent_lab.agents.base import decide_many
+    from agent_lab.backtesting.costs import FeeSchedule, SpreadImpactCost
+    from agent_lab.backtesting.engine import BacktestEngine
+    from agent_lab.ensemble.learning import LearningDecider, OnlineWeights, weights_path
+
+    prices, funds = job["prices"], job["funds"]
+    costs = SpreadImpactCost(fees=FeeSchedule(bps=job["cost_bps"])) if job["costs"] == "impact" else None
+    engine = BacktestEngine(
+        prices, cost_bps=job["cost_bps"], seed=job["seed"], method=job["sizing"],
+        costs=costs, volumes=job.get("volumes"),
+    )
+    path = weights_path(job["agent"], job["weights_dir"]) if job.get("weights_dir") else None
+    if path is not None and os.path.exists(path):
+        ensemble.learner = OnlineWeights.load(path)
+    members = {a.name: decide_many(a, list(prices.columns), funds) for a in ensemble.agents}
+    sectors = pd.Series({s: row.get("sector") for s, row in funds.items() if row}, dtype=object)
+    decider = LearningDecider(ensemble, lambda dt: members, prices, job["horizon"], sectors=sectors)
+    equity = engine.run(decider, cash=job["cash"], profile=job.get("profile"))
+    weights = ", ".join(f"{name} {w:.2f}" for name, w in ensemble.learner.weights().items())
+    saved = f" -> {ensemble.learner.save(path)}" if path is not None else " (not saved; see --weights-dir)"
+    print(f"{job['agent']}: learned weights {weights}{saved}", file=sys.stderr)
+    return equity
+
+def _stream_job(job: dict):
+    """One intraday backtest streamed from a partitioned panel; module-level for worker processes."""
+    from agent_lab.agents.base import decide_many
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.backtesting.costs import FeeSchedule, SpreadImpactCost
+    from agent_lab.backtesting.streaming import stream_backtest
+    from agent_lab.data_connectors.panel_store import PartitionedPanel
+    from agent_lab.seeding import with_seed
+
+    agent = with_seed(get_agent(job["agent"]), job["seed"])
+    costs = SpreadImpactCost(fees=FeeSchedule(bps=job["cost_bps"])) if job["costs"] == "impact" else None
+    decisions = decide_many(agent, job["symbols"], job["funds"])
+
+    def daily_decider(dt):
+        return decisions
+
+    equity, _ = stream_backtest(
+        PartitionedPanel(job["panel"]), daily_decider, job["cash"], symbols=job["symbols"],
+        start=job["start"], end=job["end"], sample=job["sample"], volumes=costs is not None,
+        cost_bps=job["cost_bps"], seed=job["seed"], method=job["sizing"], costs=costs, rebalance=job["rebalance"],
+    )
+    return job, equity
+
+# --- subcommands -------------------------------------------------------------
+
+def cmd_decide(args) -> int:
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.data_connectors.cache import get_fundamentals
+    from agent_lab.seeding import with_seed
+
+    agent = with_seed(get_agent(args.agent), args.seed)
+    for symbol in args.symbols:
+        symbol = symbol.upper()
+        try:
+            d = agent.decide(symbol, data=get_fundamentals(symbol))
+        except TypeError:
+            d = agent.decide(symbol)
+        print(f"{d.symbol}\t{d.action.name}\t{d.confidence:.2f}\t{d.score:.2f}\t{d.rationale}")
+    return 0
+
+def cmd_screen(args) -> int:
+    from agent_lab.agents.base import decide_many
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.seeding import with_seed
+
+    symbols = _universe(args)
+    agents = [with_seed(get_agent(name), args.seed) for name in args.agent]
+    with ResultWriter(args.out) as out:
+        for i in range(0, len(symbols), args.chunk_size):
+            chunk = symbols[i:i + args.chunk_size]
+            funds = _load_fundamentals(chunk, args.workers)
+            for name, agent in zip(args.agent, agents):
+                df = decide_many(agent, chunk, funds).to_frame(rationale=True).reset_index()
+                df.insert(1, "agent", name)
+                df["action"] = df["action"].astype(str)
+                out.write(df)
+    return 0
+
+def cmd_backtest(args) -> int:
+    symbols = _backtest_symbols(args)
+    if args.learn:
+        from agent_lab.agents.registry import ENSEMBLES
+        plain = [name for name in args.agent if name not in ENSEMBLES]
+        if plain:
+            raise SystemExit(f"--learn needs ensemble agents ({', '.join(ENSEMBLES)}); got {', '.join(plain)}")
+    if _streams(args):
+        if args.learn:
+            raise SystemExit("--learn is for daily backtests; intraday panels are not supported")
+        return _cmd_stream_backtest(args, symbols)
+    prices = _load_prices(symbols, args.start, args.end, args.panel)
+    funds = _load_fundamentals(list(prices.columns), args.workers)
+    volumes = _load_volumes(prices, [args.costs], args.panel)
+    prices, volumes = _to_bars(prices, volumes, args.bars)
+    jobs = [
+        {"agent": name, "prices": prices, "volumes": volumes, "funds": funds, "cash": args.cash,
+         "cost_bps": args.cost_bps, "costs": args.costs, "seed": args.seed, "sizing": args.sizing,
+         "cache": not args.no_cache, "learn": args.learn, "horizon": args.horizon, "weights_dir": args.weights_dir}
+        for name in args.agent
+    ]
+    _profile_in_workers(jobs, args)
+    with ResultWriter(args.out) as out:
+        for job, equity in parallel_map(_backtest_job, jobs, args.workers, processes=True):
+            df = equity.reset_index()
+            df.insert(1, "agent", job["agent"])
+            out.write(df)
+            stats = summarize_equity(equity)
+            print(f"{job['agent']}: final equity ${stats['final_equity']:,.2f} "
+                  f"({stats['total_return']:+.2%}, max DD {stats['max_drawdown']:.2%})", file=sys.stderr)
+    return 0
+
+def _cmd_stream_backtest(args, symbols: List[str]) -> int:
+    from agent_lab.data_connectors.panel_store import PartitionedPanel
+
+    panel = PartitionedPanel(args.panel)
+    symbols = [s for s in symbols if s in panel]
+    if not symbols:
+        raise SystemExit(f"none of the requested symbols are in the panel {args.panel}")
+    funds = _load_fundamentals(symbols, args.workers)
+    jobs = [
+        {"agent": name, "panel": args.panel, "symbols": symbols, "funds": funds, "start": args.start, "end": args.end,
+         "cash": args.cash, "cost_bps": args.cost_bps, "costs": args.costs, "seed": args.seed, "sizing": args.sizing,
+         "rebalance": args.rebalance, "sample": args.sample}
+        for name in args.agent
+    ]
+    with ResultWriter(args.out) as out:
+        for job, equity in parallel_map(_stream_job, jobs, args.workers, processes=True):
+            df = equity.reset_index()
+            df.insert(1, "agent", job["agent"])
+            out.write(df)
+            stats = summarize_equity(equity, _bars_per_year(job["sample"]))
+            print(f"{job['agent']}: final equity ${stats['final_equity']:,.2f} "
+                  f"({stats['total_return']:+.2%}, max DD {stats['max_drawdown']:.2%})", file=sys.stderr)
+    return 0
+
+def cmd_sweep(args) -> int:
+    import pandas as pd
+
+    symbols = _backtest_symbols(args)
+    if _streams(args):
+        raise SystemExit("sweep needs a daily panel; backtest streams intraday panels one agent at a time")
+    prices = _load_prices(symbols, args.start, args.end, args.panel)
+    funds = _load_fundamentals(list(prices.columns), args.workers)
+    volumes = _load_volumes(prices, args.costs, args.panel)
+    prices, volumes = _to_bars(prices, volumes, args.bars)
+    grid = itertools.product(args.agent, args.cost_bps, args.costs, args.seeds, args.cash, args.sizing)
+    jobs = [
+        {"agent": agent, "prices": prices, "volumes": volumes, "funds": funds, "cash": cash,
+         "cost_bps": cost_bps, "costs": costs, "seed": seed, "sizing": sizing, "bars": args.bars,
+         "cache": not args.no_cache}
+        for agent, cost_bps, costs, seed, cash, sizing in grid
+    ]
+    _profile_in_workers(jobs, args)
+    with ResultWriter(args.out) as out:
+        for job, equity in parallel_map(_backtest_job, jobs, args.workers, processes=True):
+            row = {k: job[k] for k in ("agent", "cost_bps", "costs", "seed", "cash", "sizing", "bars")}
+            out.write(pd.DataFrame([{**row, **summarize_equity(equity, BARS_PER_YEAR[job["bars"]])}]))
+    return 0
+
+def cmd_evaluate(args) -> int:
+    import pandas as pd
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.data_connectors.cache import get_fundamentals
+    from agent_lab.evaluation.accuracy_eval import evaluate_agent_accuracy
+
+    trades = pd.concat([pd.read_csv(p) for p in args.trades], ignore_index=True)
+    # warm the fundamentals cache in parallel; evaluation then reads it
+    _load_fundamentals(list(trades["symbol"].astype(str).unique()), args.workers)
+    with ResultWriter(args.out) as out:
+        for name in args.agent:
+            df = evaluate_agent_accuracy(get_agent(name), trades, get_fundamentals)
+            df.insert(0, "agent", name)
+            out.write(df)
+    return 0
+
+def cmd_warm_cache(args) -> int:
+    from agent_lab.data_connectors.cache import get_fundamentals
+    from agent_lab.data_connectors.price_data import get_price_history
+
+    symbols = _universe(args)
+    if args.daemon:
+        from agent_lab.data_connectors.warmer import CacheWarmer
+        warmer = CacheWarmer(symbols, interval=args.interval, calls_per_min=args.budget,
+                             fundamentals=not args.prices_only, prices=not args.fundamentals_only)
+        try:
+            warmer.run_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    def _warm(sym):
+        status = []
+        if not args.prices_only:
+            try:
+                status.append("fundamentals ok" if get_fundamentals(sym) is not None else "fundamentals missing")
+            except Exception as e:
+                status.append(f"fundamentals failed ({e})")
+        if not args.fundamentals_only:
+            try:
+                get_price_history(sym)
+                status.append("prices ok")
+            except Exception as e:
+                status.append(f"prices failed ({e})")
+        return sym, status
+
+    for sym, status in parallel_map(_warm, symbols, args.workers):
+        print(f"{sym}: {', '.join(status)}", file=sys.stderr)
+    return 0
+
+def cmd_build_panel(args) -> int:
+    from agent_lab.data_connectors.panel_store import PanelStore, PartitionedPanel, panel_path
+
+    path = args.path or panel_path(args.name)
+    if args.interval != "1d":
+        if not (args.start and args.end):
+            raise SystemExit("intraday panels need --start and --end")
+        panel = PartitionedPanel.build(
+            path, _universe(args), args.start, args.end, interval=args.interval, partition=args.partition,
+            dtype=args.dtype or "float32",
+        )
+        print(f"{path}: {len(panel.symbols)} symbols, {args.interval} bars in {len(panel)} partitions "
+              f"({panel.parts[0]} .. {panel.parts[-1]})", file=sys.stderr)
+        return 0
+    store = PanelStore.build(path, _universe(args), dtype=args.dtype or "float64")
+    n_dates, n_symbols, n_fields = store.shape
+    print(f"{path}: {n_symbols} symbols x {n_dates} dates x {n_fields} fields "
+          f"({store.values.nbytes / 2**20:,.0f} MB)", file=sys.stderr)
+    return 0
+
+def cmd_paper(args) -> int:
+    import pandas as pd
+    from agent_lab.backtesting.costs import FeeSchedule, SpreadImpactCost
+    from agent_lab.backtesting.paper import DEFAULT_PAPER_DIR, PaperTrader, ReplayFeed, SourceFeed, rows_frame
+    from agent_lab.ensemble.learning import weights_path
+
+    path = args.path or os.path.join(DEFAULT_PAPER_DIR, args.name)
+    if os.path.exists(os.path.join(path, "account.pkl")):
+        trader = PaperTrader(path)
+    else:
+        if args.replay and not (args.universe or args.symbols):
+            from agent_lab.data_connectors.panel_store import PanelStore
+            symbols = PanelStore(args.replay).symbols
+        else:
+            symbols = _universe(args)
+        costs = SpreadImpactCost(fees=FeeSchedule(bps=args.cost_bps)) if args.costs == "impact" else None
+        trader = PaperTrader.create(
+            path, args.agent, symbols, cash=args.cash, seed=args.seed, method=args.sizing,
+            costs=costs, cost_bps=args.cost_bps, learn=args.learn, horizon=args.horizon,
+            weights_path=weights_path(args.agent, args.weights_dir) if args.learn else None,
+        )
+        print(f"{path}: new {args.agent} account, {len(symbols)} symbols, ${args.cash:,.2f}", file=sys.stderr)
+
+    volumes = trader.engine_kwargs.get("costs") is not None
+    if args.replay:
+        from agent_lab.data_connectors.panel_store import PanelStore
+        funds = rows_frame(_load_fundamentals(trader.symbols, args.workers))
+        feed = ReplayFeed.from_panel(PanelStore(args.replay), trader.symbols, args.start, args.end,
+                                     volume=volumes, fundamentals=funds)
+        trades = trader.run(feed)
+    else:
+        trades = trader.step(SourceFeed(trader.symbols).latest())
+    with ResultWriter(args.out) as out:
+        if len(trades):
+            out.write(trades)
+    equity = trader.equity()
+    if len(equity):
+        last = equity.iloc[-1]
+        print(f"{path}: {pd.Timestamp(last['date']).date()} equity ${last['equity']:,.2f}, cash ${last['cash']:,.2f}, "
+              f"{int(last['positions'])} positions, {len(trades)} fills", file=sys.stderr)
+    return 0
+
+def cmd_mvp(args) -> int:
+    from agent_lab.scripts.run_mvp import main
+    main()
+    return 0
+
+# --- parser ------------------------------------------------------------------
+
+def _add_universe_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--universe", "-u", help="file with one symbol per line (or a CSV with a 'symbol' column)")
+    p.add_argument("--symbols", "-s", nargs="+", help="symbols given inline (added to --universe)")
+
+def _add_batch_args(p: argparse.ArgumentParser, out: bool = True) -> None:
+    p.add_argument("--workers", "-j", type=int, default=1, help="parallel workers (default: 1)")
+    p.add_argument("--offline", action="store_true", help="use local caches only, never the network")
+    if out:
+        p.add_argument("--out", "-o", default="-", help="output .csv or .parquet (default: CSV on stdout)")
+
+def build_parser() -> argparse.ArgumentParser:
+    from agent_lab.agents.registry import AGENT_NAMES
+    from agent_lab.ensemble.learning import DEFAULT_HORIZON, DEFAULT_WEIGHTS_DIR
+    from agent_lab.portfolio import DEFAULT_METHOD, METHODS
+    COST_MODELS = ["flat", "impact"]
+    from agent_lab.profiling import add_profile_argument
+
+    parser = argparse.ArgumentParser(prog="agent-lab", description="Agent Lab command line tools")
+    parser.add_argument(
+        "--data-source", metavar="SPEC",
+        help="live (default), record[:DIR], replay[:DIR] or synthetic[:N[:YEARS[:SEED]]]",
+    )
+    add_profile_argument(parser)
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="log per-stage timings, cache hit rates and remote call counts as JSON on stderr",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("decide", help="score one or more symbols with an agent")
+    p.add_argument("symbols", nargs="+")
+    p.add_argument("--agent", default="buffett", choices=AGENT_NAMES)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--offline", action="store_true", help="use local caches only, never the network")
+    p.set_defaults(func=cmd_decide)
+
+    p = sub.add_parser("screen", help="score a universe with one or more agents")
+    _add_universe_args(p)
+    p.add_argument("--agent", "-a", nargs="+", default=["buffett"], choices=AGENT_NAMES)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_SCREEN_CHUNK, help="symbols scored (and written) per batch")
+    _add_batch_args(p)
+    p.set_defaults(func=cmd_screen)
+
+    def _add_backtest_args(p, sweep: bool):
+        _add_universe_args(p)
+        p.add_argument("--agent", "-a", nargs="+", default=["buffett"], choices=AGENT_NAMES)
+        p.add_argument("--start", help="first date (YYYY-MM-DD)")
+        p.add_argument("--end", help="last date (YYYY-MM-DD)")
+        p.add_argument("--panel", help="read prices (and volumes) from a panel store built by build-panel")
+        p.add_argument("--bars", default="D", choices=["D", "W", "M"], help="trade on daily, weekly or monthly bars")
+        p.add_argument("--rebalance", help="with an intraday --panel: trade once per period (e.g. 1D, 1h; default: every bar)")
+        p.add_argument("--sample", default="1D", help="with an intraday --panel: equity rows kept, one per period (default: 1D)")
+        if sweep:
+            p.add_argument("--cash", type=float, nargs="+", default=[100_000.0])
+            p.add_argument("--cost-bps", type=float, nargs="+", default=[5.0])
+            p.add_argument("--costs", nargs="+", default=["flat"], choices=COST_MODELS)
+            p.add_argument("--seeds", type=int, nargs="+", default=[0])
+            p.add_argument("--sizing", nargs="+", default=[DEFAULT_METHOD], choices=list(METHODS))
+        else:
+            p.add_argument("--cash", type=float, default=100_000.0)
+            p.add_argument("--cost-bps", type=float, default=5.0)
+            p.add_argument("--costs", default="flat", choices=COST_MODELS,
+                           help="flat: cost-bps + slippage; impact: spread + sqrt(volume) impact + cost-bps fees")
+            p.add_argument("--seed", type=int, default=0)
+            p.add_argument("--sizing", default=DEFAULT_METHOD, choices=list(METHODS), help="position sizing (agent_lab.portfolio)")
+            p.add_argument("--learn", action="store_true",
+                           help="ensembles learn their members' weights from realized returns, starting from equal weights")
+            p.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help=f"with --learn: bars a vote is judged over (default: {DEFAULT_HORIZON})")
+            p.add_argument("--weights-dir", metavar="DIR",
+                           help=f"with --learn: continue from and save to DIR/<agent>.json ({DEFAULT_WEIGHTS_DIR} is the file the "
+                                "API serves); by default learned weights are not saved")
+        p.add_argument("--no-cache", action="store_true", help="don't read or write the backtest result cache")
+        _add_batch_args(p)
+
+    p = sub.add_parser("backtest", help="backtest agents over a universe; writes equity curves")
+    _add_backtest_args(p, sweep=False)
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser("sweep", help="backtest a grid of agents x costs x cost models x seeds x cash x sizing; writes one summary row per run")
+    _add_backtest_args(p, sweep=True)
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("evaluate", help="compare agent decisions with historical trades")
+    p.add_argument("--trades", "-t", nargs="+", required=True, help="CSV(s) with date, symbol, real_action columns")
+    p.add_argument("--agent", "-a", nargs="+", default=["buffett"], choices=AGENT_NAMES)
+    _add_batch_args(p)
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("warm-cache", help="fill the fundamentals and price caches for a universe")
+    _add_universe_args(p)
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--fundamentals-only", action="store_true")
+    group.add_argument("--prices-only", action="store_true")
+    p.add_argument("--daemon", action="store_true", help="keep running, refreshing entries ahead of expiry (hottest first)")
+    p.add_argument("--interval", type=float, default=60.0, help="seconds between --daemon refresh passes (default: 60)")
+    p.add_argument("--budget", type=float, default=None, help="Finnhub calls per minute the --daemon may spend (default: half the client limit)")
+    _add_batch_args(p, out=False)
+    p.set_defaults(func=cmd_warm_cache)
+
+    p = sub.add_parser("build-panel", help="store a universe's OHLCV as a memory-mapped panel")
+    _add_universe_args(p)
+    p.add_argument("--name", default="default", help="panel name under data/panels (default: default)")
+    p.add_argument("--path", help="panel directory (overrides --name)")
+    p.add_argument("--dtype", choices=["float64", "float32"], help="float32 halves the size (default: float64 daily, float32 intraday)")
+    p.add_argument("--interval", default="1d", help="bar size: 1d, or 1m, 5m, 15m, 30m, 1h for a date-partitioned intraday panel")
+    p.add_argument("--start", help="first date of an intraday panel (YYYY-MM-DD)")
+    p.add_argument("--end", help="last date of an intraday panel (YYYY-MM-DD)")
+    p.add_argument("--partition", default="M", choices=["D", "W", "M"], help="intraday partition size (default: M)")
+    p.add_argument("--offline", action="store_true", help="use local caches only, never the network")
+    p.set_defaults(func=cmd_build_panel)
+
+    p = sub.add_parser("paper", help="paper-trade an agent one day at a time; writes the day's fills")
+    _add_universe_args(p)
+    p.add_argument("--name", default="default", help="account name under data/paper (default: default)")
+    p.add_argument("--path", help="account directory (overrides --name)")
+    p.add_argument("--agent", "-a", default="buffett", choices=AGENT_NAMES, help="agent of a new account")
+    p.add_argument("--cash", type=float, default=100_000.0, help="starting cash of a new account")
+    p.add_argument("--cost-bps", type=float, default=5.0)
+    p.add_argument("--costs", default="flat", choices=COST_MODELS)
+    p.add_argument("--sizing", default=DEFAULT_METHOD, choices=list(METHODS))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--learn", action="store_true",
+                   help="a new ensemble account learns its members' weights, continuing from and saving to --weights-dir")
+    p.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help=f"with --learn: days a vote is judged over (default: {DEFAULT_HORIZON})")
+    p.add_argument("--weights-dir", metavar="DIR", default=DEFAULT_WEIGHTS_DIR,
+                   help=f"with --learn: directory of <agent>.json weight files (default: {DEFAULT_WEIGHTS_DIR}, served by the API)")
+    p.add_argument("--replay", metavar="PANEL", help="ingest the days of a panel store (from --start to --end) instead of today's bar")
+    p.add_argument("--start", help="first replayed date (YYYY-MM-DD)")
+    p.add_argument("--end", help="last replayed date (YYYY-MM-DD)")
+    _add_batch_args(p)
+    p.set_defaults(func=cmd_paper)
+
+    p = sub.add_parser("mvp", help="run the MVP backtests and write results/")
+    p.add_argument("--offline", action="store_true", help="use local caches only, never the network")
+    p.set_defaults(func=cmd_mvp)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.data_source:
+        from agent_lab.data_connectors.sources import set_data_source
+        set_data_source(args.data_source)
+        os.environ["AGENT_LAB_DATA_SOURCE"] = args.data_source  # for worker processes
+    if getattr(args, "offline", False):
+        from agent_lab.data_connectors.offline import set_offline
+        set_offline(True)
+    try:
+        from agent_lab.profiling import profile_mode, profiled, report
+        # worker processes (backtest/sweep with -j > 1) profile their own runs
+        with profiled(f"cli-{args.command}", profile_mode(args)) as prof:
+            code = args.func(args)
+        report(prof)
+        return code
+    except BrokenPipeError:
+        # output piped into e.g. `head`; stop quietly
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.metrics and not sys.stderr.closed:
+            from agent_lab.metrics import log_summary
+            log_summary(command=args.command)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,19 +2,41 @@
 import time
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from agent_lab.data_connectors.finnhub_client import company_profile2, company_basic_financials, stock_insider_transactions
+from agent_lab.data_connectors.offline import is_offline
+from agent_lab.data_connectors.sources import get_data_source
+from agent_lab.data_connectors.warmer import record_access
+from agent_lab.data_connectors.lru import BoundedCache, env_limit
+from agent_lab.data_connectors.normalize import normalize_row
+from agent_lab.data_connectors.insider import insider_store
+from agent_lab import metrics
 
 DISK_CACHE_DIR = "data/cache_fundamentals"
-os.makedirs(DISK_CACHE_DIR, exist_ok=True)
 
 _CACHE_TTL = 24 * 3600  # 1 day in seconds
-_inmem = {}
+_NEGATIVE_TTL = 15 * 60  # failed fetches are not retried for this long
+# bounded LRU of cache entries keyed by (source key, symbol); disk keeps everything
+_inmem = BoundedCache(
+    "fundamentals",
+    max_entries=int(env_limit("AGENT_LAB_FUNDAMENTALS_CACHE_ENTRIES", 20000)),
+    max_bytes=int(env_limit("AGENT_LAB_FUNDAMENTALS_CACHE_MB", 256) * 2**20),
+)
+_lock = threading.Lock()
+_pool = None  # background revalidation, created on first use
+
+# entry states
+FRESH = "fresh"
+STALE = "stale"            # past the TTL; still served while it is refreshed
+REFRESHING = "refreshing"  # stale, with a background fetch under way
+FAILED = "failed"          # last fetch failed and nothing is cached (negative entry)
 
 def _disk_path(symbol: str):
     return os.path.join(DISK_CACHE_DIR, f"{symbol}.json")
 
 def _write_disk(symbol: str, raw: dict):
+    os.makedirs(DISK_CACHE_DIR, exist_ok=True)
     with open(_disk_path(symbol), "w") as f:
         json.dump({"fetched_at": time.time(), "raw": raw}, f)
 
@@ -25,82 +47,202 @@ def _read_disk(symbol: str) -> Optional[dict]:
     with open(p, "r") as f:
         return json.load(f)
 
+def _fetch_raw(symbol: str, source=None) -> dict:
+    """Raw {profile, ratios, insider} payload from the active data source; persisted for the live source."""
+    source = source or get_data_source()
+    with metrics.span("fetch", what="fundamentals"):
+        profile = source.company_profile2(symbol) or {}
+        ratios = source.company_basic_financials(symbol, "all") or {}
+        insider = {}
+        try:
+            insider_resp = source.stock_insider_transactions(symbol) or {}
+            insider = insider_resp.get("data", [])
+        except Exception:
+            insider = []
+
+    if not profile and not (ratios.get("metric") if isinstance(ratios, dict) else None):
+        # unknown or delisted ticker: Finnhub answers with empty payloads
+        raise LookupError(f"No fundamentals for {symbol}")
+    raw = {"profile": profile, "ratios": ratios, "insider": insider}
+    if source.persistent:
+        _write_disk(symbol, raw)
+    return raw
+
 def fetch_fundamentals_from_finnhub(symbol: str) -> dict:
-    """Fetch and normalize fundamentals for one symbol, persist raw JSON."""
-    profile = company_profile2(symbol) or {}
-    ratios = company_basic_financials(symbol, "all") or {}
-    insider = {}
+    """Fetch and normalize fundamentals for one symbol from the active data source, persist raw JSON."""
+    raw = _fetch_raw(symbol)
+    with metrics.span("normalize", what="fundamentals"):
+        return _normalize(symbol, raw)
+
+def _normalize(symbol: str, raw: dict, source=None) -> dict:
+    """
+    Transform a raw {profile, ratios, insider} payload into a normalized row (see
+    normalize.py); its insider transactions go to the source's insider store,
+    which the row's insider totals are read from.
+    """
+    source = source or get_data_source()
+    store = insider_store(source.key)
+    store.update(symbol, raw.get("insider") or [])
+    return normalize_row(symbol, raw, as_of=source.as_of, insider=store)
+
+def _revalidate_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agent-lab-revalidate")
+    return _pool
+
+def _fetch_entry(symbol: str, source, key, previous: Optional[dict] = None) -> dict:
+    """
+    Fetch `symbol` and swap the new entry in. On failure the previous payload (if
+    any) stays in place as STALE, otherwise the symbol is negatively cached as FAILED;
+    either way it is not retried for _NEGATIVE_TTL.
+    """
+    now = time.time()
     try:
-        insider_resp = stock_insider_transactions(symbol) or {}
-        insider = insider_resp.get("data", [])
-    except Exception:
-        insider = []
+        raw = _fetch_raw(symbol, source)
+        with metrics.span("normalize", what="fundamentals"):
+            entry = {"raw": raw, "data": _normalize(symbol, raw, source), "time": now,
+                     "state": FRESH, "checked": now, "error": None}
+    except Exception as e:
+        metrics.inc("cache_fetch_failures_total", cache="fundamentals")
+        if previous and previous.get("data") is not None:
+            entry = {**previous, "state": STALE, "checked": now, "error": str(e)}
+        else:
+            entry = {"raw": None, "data": None, "time": None, "state": FAILED, "checked": now, "error": str(e)}
+    # readers keep using the old entry until this one is swapped in
+    with _lock:
+        _inmem[key] = entry
+    return entry
 
-    raw = {"profile": profile, "ratios": ratios, "insider": insider}
-    _write_disk(symbol, raw)
-    # transform raw into normalized row (simple)
-    metric = ratios.get("metric", {}) if isinstance(ratios, dict) else {}
-    def _to_float(x):
-        try:
-            return float(x) if x is not None else None
-        except Exception:
+def _revalidate(symbol: str, source, key, entry: dict) -> None:
+    """Refresh a stale entry on the background pool unless that is already under way."""
+    with _lock:
+        current = _inmem.get(key, entry)
+        if current["state"] == REFRESHING:
+            return
+        _inmem[key] = {**current, "state": REFRESHING}
+    metrics.inc("cache_revalidations_total", cache="fundamentals")
+    _revalidate_pool().submit(_fetch_entry, symbol, source, key, current)
+
+def _entry(symbol: str, refresh: bool = False) -> Optional[dict]:
+    """
+    Cache entry {"raw", "data", "time", "state", ...} for `symbol`: in-memory ->
+    disk -> remote fetch, where "time" is when the payload was fetched.
+
+    Entries past the TTL are served as they are while one background fetch
+    revalidates them (stale-while-revalidate); failed fetches are cached for
+    _NEGATIVE_TTL so a bad ticker costs one fetch, not one per request. Only a
+    symbol with nothing cached blocks on the remote fetch. `refresh` skips the
+    cache and refetches synchronously (used by the background warmer).
+    """
+    now = time.time()
+    source = get_data_source()
+    offline = is_offline() and source.persistent
+    key = (source.key, symbol)
+    if refresh:
+        return _fetch_entry(symbol, source, key, _inmem.get(key))
+
+    record_access(symbol)
+    cached = _inmem.get(key)
+    if cached is None and source.persistent:
+        disk = _read_disk(symbol)
+        if disk:
+            metrics.inc("cache_requests_total", cache="fundamentals", result="disk_hit")
+            # normalize the raw payload on disk; no remote call needed
+            raw = disk.get("raw", {})
+            with metrics.span("normalize", what="fundamentals"):
+                cached = {"raw": raw, "data": _normalize(symbol, raw, source), "time": disk["fetched_at"],
+                          "state": FRESH, "checked": disk["fetched_at"], "error": None}
+            with _lock:
+                _inmem[key] = cached
+    elif cached is not None:
+        metrics.inc("cache_requests_total", cache="fundamentals", result="memory_hit")
+
+    if cached is None:
+        metrics.inc("cache_requests_total", cache="fundamentals", result="miss")
+        if offline:
             return None
+        return _fetch_entry(symbol, source, key)
 
-    ev = metric.get("enterpriseValue")
-    pe = metric.get("peTTM") or metric.get("forwardPE")
-    row = {
-        "symbol": symbol,
-        "company": profile.get("name"),
-        "sector": profile.get("finnhubIndustry"),
-        "pe": _to_float(pe),
-        "roe": _to_float(metric.get("roeTTM")),
-        "roic": _to_float(metric.get("roiTTM") or metric.get("roicTTM")),
-        "ev_ebitda": None,
-        "debt_to_equity": _to_float(metric.get("totalDebt/totalEquityAnnual") or metric.get("longTermDebt/equityAnnual")),
-        "free_cashflow": _to_float(metric.get("pfcfShareTTM") or metric.get("freeCashFlowTTM")),
-        "revenue_growth_cagr": _to_float(metric.get("revenueGrowth5Y")),
-        "revenue_stability": _to_float(metric.get("revenueGrowthQuarterlyYoy")),
-        "recent_insider_buy": sum([t.get("shares",0) for t in insider if t.get("change",0) > 0]),
-        "recent_insider_sell": sum([t.get("shares",0) for t in insider if t.get("change",0) < 0]),
-    }
-    # EV/EBITDA best-effort
-    try:
-        shares_out = metric.get("sharesOutstanding") or profile.get("shareOutstanding")
-        ebitd_per_share = metric.get("ebitdPerShareTTM")
-        if ev and ebitd_per_share and shares_out:
-            row["ev_ebitda"] = _to_float(float(ev) / (float(ebitd_per_share) * float(shares_out)))
-    except Exception:
-        row["ev_ebitda"] = None
-    return row
+    if cached["state"] == FAILED:
+        if now - cached["checked"] < _NEGATIVE_TTL or offline:
+            metrics.inc("cache_requests_total", cache="fundamentals", result="negative_hit")
+            return None
+        return _fetch_entry(symbol, source, key)
+
+    if not offline and now - cached["time"] >= _CACHE_TTL:
+        metrics.inc("cache_requests_total", cache="fundamentals", result="stale_hit")
+        # a revalidation that failed is not retried for _NEGATIVE_TTL
+        if cached["state"] != REFRESHING and (cached["error"] is None or now - cached["checked"] >= _NEGATIVE_TTL):
+            _revalidate(symbol, source, key, cached)
+        if cached["state"] == FRESH:
+            cached = {**cached, "state": STALE}
+    return cached
 
 def get_fundamentals(symbol: str) -> Optional[dict]:
-    """Use in-memory -> disk -> remote fetch flow with TTL."""
-    now = time.time()
-    # in-memory cache
-    cached = _inmem.get(symbol)
-    if cached and now - cached["time"] < _CACHE_TTL:
-        return cached["data"]
-
-    # disk cache
-    disk = _read_disk(symbol)
-    if disk and now - disk["fetched_at"] < _CACHE_TTL:
-        # transform raw to normalized if needed
-        row = fetch_fundamentals_from_finnhub(symbol) if False else None
-        # attempt to use disk raw if we want to avoid transformation cost:
-        # we'll just call fetch_fundamentals_from_finnhub to normalize using raw file
-        # For simplicity, call remote normalization now only if needed:
-        try:
-            normalized = fetch_fundamentals_from_finnhub(symbol)
-        except Exception:
-            # fallback: create minimal structure
-            normalized = {"symbol": symbol, "company": disk.get("raw", {}).get("profile", {}).get("name")}
-        _inmem[symbol] = {"data": normalized, "time": now}
-        return normalized
+    """
+    Use in-memory -> disk -> remote fetch flow with TTL.
+    Offline, cached entries are served whatever their age and uncached symbols give None.
+    Only the live source uses the disk cache; replay and synthetic sources are read directly.
+    """
+    entry = _entry(symbol)
+    return entry["data"] if entry else None
 
-    # otherwise fetch
-    row = fetch_fundamentals_from_finnhub(symbol)
-    _inmem[symbol] = {"data": row, "time": now}
-    return row
+def get_raw_fundamentals(symbol: str) -> Optional[dict]:
+    """The cached raw {profile, ratios, insider} payload behind get_fundamentals()."""
+    entry = _entry(symbol)
+    return entry["raw"] if entry else None
+
+def refresh_fundamentals(symbol: str) -> Optional[dict]:
+    """
+    Refetch `symbol` now, replacing the cached entry; returns the normalized row.
+    Raises RuntimeError if the fetch failed (the entry is then negatively
+    cached, or keeps its previous payload as STALE).
+    """
+    entry = _entry(symbol, refresh=True)
+    if entry["state"] != FRESH:
+        raise RuntimeError(f"refresh of {symbol} failed: {entry['error']}")
+    return entry["data"]
+
+def fundamentals_state(symbol: str) -> Optional[str]:
+    """State of `symbol`'s in-memory entry (FRESH, STALE, REFRESHING or FAILED), or None."""
+    cached = _inmem.get((get_data_source().key, symbol))
+    if cached is None:
+        return None
+    if cached["state"] == FRESH and time.time() - cached["time"] >= _CACHE_TTL:
+        return STALE
+    return cached["state"]
+
+def fundamentals_failed_recently(symbol: str) -> bool:
+    """True while a failed fetch of `symbol` is inside _NEGATIVE_TTL (FAILED, or STALE after a failed refresh)."""
+    cached = _inmem.get((get_data_source().key, symbol))
+    return bool(cached and cached["error"] is not None and time.time() - cached["checked"] < _NEGATIVE_TTL)
+
+def fundamentals_age(symbol: str) -> Optional[float]:
+    """Seconds since `symbol`'s cached payload was fetched, or None if it is not cached."""
+    source = get_data_source()
+    cached = _inmem.get((source.key, symbol))
+    if cached and cached["time"] is not None:
+        return time.time() - cached["time"]
+    disk = _read_disk(symbol) if source.persistent else None
+    return time.time() - disk["fetched_at"] if disk else None
+
+def insider_windows(symbol: str, as_of=None) -> Optional[dict]:
+    """
+    {days: aggregate} of `symbol`'s insider transactions over insider.WINDOWS
+    (30/90/180 days) up to `as_of` (default: the source's as-of date), with
+    net shares and USD; None when there is no payload for it.
+    """
+    source = get_data_source()
+    store = insider_store(source.key)
+    history = store.history(symbol)
+    if history is None:
+        raw = get_raw_fundamentals(symbol)   # a fresh load feeds the store
+        if raw is None:
+            return None
+        store.update(symbol, raw.get("insider") or [])
+        history = store.history(symbol)
+    return history.windows(as_of if as_of is not None else source.as_of)
 
 def preload_fundamentals(symbols):
     out = {}
@@ -110,6 +252,5 @@ def preload_fundamentals(symbols):
 
 
 def clear_cache():
-    """Clears all cached fundamentals."""
-    global _cache_store
-    _cache_store = {}
\ No newline at end of file
+    """Clears all in-memory cached fundamentals (the disk cache is kept)."""
+    _inmem.clear()
\ No newline at end of file
@@ -0,0 +1,173 @@
+# src/agent_lab/data_connectors/calendar.py
+"""
+Trading calendars, one-pass alignment of per-symbol series and bar resampling.
+
+    dates = trading_calendar("2020-01-01", "2024-12-31")          # NYSE sessions
+    panel = align({"AAPL": aapl_close, "KO": ko_close})           # onto the calendar, once
+    panel.valid        # (dates, symbols) bool: a real bar that day
+    panel.marks()      # last known price, for valuing positions on days without a bar
+    weekly = resample(panel.frame(), "W")                          # last bar of every week
+    daily = resample(minute_bars, "1D", "ohlcv")                   # intraday bars into sessions
+
+Calendars:
+
+  XNYS  weekdays without NYSE holidays (New Year's, MLK, Presidents', Good
+        Friday, Memorial, Juneteenth from 2022, Independence, Labor,
+        Thanksgiving, Christmas) and the unscheduled closures since 2001 in
+        NYSE_CLOSURES. Bars the data has on other dates are dropped.
+  B     every weekday (SyntheticSource's calendar)
+
+The active data source names its calendar (DataSource.calendar).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Union
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday,
+)
+
+DEFAULT_CALENDAR = "XNYS"
+# 9/11, national days of mourning and Hurricane Sandy
+NYSE_CLOSURES = pd.DatetimeIndex([
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14", "2004-06-11", "2007-01-02",
+    "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09",
+])
+RULES = {"W": "W-FRI", "M": "M", "Q": "Q"}   # bar size -> pandas period frequency
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        # a Saturday New Year's Day is not made up on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-06-19", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+def trading_calendar(start, end, calendar: str = DEFAULT_CALENDAR, tz: Optional[str] = None) -> pd.DatetimeIndex:
+    """Session dates from `start` to `end` (inclusive), midnight-stamped, localized to `tz` if given."""
+    start, end = pd.Timestamp(start).tz_localize(None).normalize(), pd.Timestamp(end).tz_localize(None).normalize()
+    days = pd.bdate_range(start, end, name="Date")
+    if calendar == "XNYS":
+        days = days.difference(NYSEHolidayCalendar().holidays(start, end).union(NYSE_CLOSURES)).rename("Date")
+    elif calendar != "B":
+        raise ValueError(f"Unknown calendar {calendar!r}; choose from XNYS, B")
+    return days.tz_localize(tz) if tz else days
+
+def calendar_for(index: pd.DatetimeIndex, calendar: Optional[str] = None) -> pd.DatetimeIndex:
+    """The `calendar` (default: the active data source's) over the span of `index`, in its timezone."""
+    if calendar is None:
+        from agent_lab.data_connectors.sources import get_data_source
+        calendar = getattr(get_data_source(), "calendar", DEFAULT_CALENDAR)
+    if not len(index):
+        return pd.DatetimeIndex([], name="Date", tz=index.tz)
+    tz = str(index.tz) if index.tz is not None else None
+    return trading_calendar(index.min().tz_localize(None), index.max().tz_localize(None), calendar, tz)
+
+@dataclass
+class AlignedPanel:
+    """Series reindexed onto one calendar: raw values (NaN = no bar) and where they are valid."""
+    index: pd.DatetimeIndex
+    columns: List[str]
+    values: np.ndarray     # (dates, symbols), NaN where a symbol has no bar
+    valid: np.ndarray      # (dates, symbols) bool, a finite positive price that day
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, index=self.index, columns=pd.Index(self.columns))
+
+    def marks(self) -> np.ndarray:
+        """Last valid value at or before each date (0 before a symbol's first bar)."""
+        return marks(self.values, self.valid)
+
+def align(series: Union[Mapping[str, pd.Series], pd.DataFrame], calendar: Optional[Union[str, pd.DatetimeIndex]] = None) -> AlignedPanel:
+    """
+    Put per-symbol series (or a frame's columns) on one trading calendar:
+    `calendar` is a DatetimeIndex, a calendar name, or None for the active data
+    source's calendar over the span of the data. Each series is reindexed once;
+    bars on dates outside the calendar are dropped.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = {c: series[c] for c in series.columns}
+    columns = list(series)
+    if isinstance(calendar, pd.DatetimeIndex):
+        index = calendar
+    else:
+        lo = [s.index.min() for s in series.values() if len(s)]
+        hi = [s.index.max() for s in series.values() if len(s)]
+        span = pd.DatetimeIndex([min(lo), max(hi)]) if lo else pd.DatetimeIndex([])
+        index = calendar_for(span, calendar)
+    values = np.full((len(index), len(columns)), np.nan)
+    for j, c in enumerate(columns):
+        s = series[c]
+        pos = index.get_indexer(s.index.normalize())
+        keep = pos >= 0
+        values[pos[keep], j] = s.to_numpy(dtype=np.float64)[keep]
+    valid = np.isfinite(values) & (values > 0)
+    return AlignedPanel(index, columns, values, valid)
+
+def marks(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Forward-fill `values` over invalid entries along the dates axis; 0 before the first valid one."""
+    rows = np.where(valid, np.arange(len(values))[:, None], -1)
+    last = np.maximum.accumulate(rows, axis=0)
+    filled = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, filled, 0.0)
+
+def bar_codes(index: pd.DatetimeIndex, rule: str) -> np.ndarray:
+    """
+    One integer per timestamp, equal within a `rule` bar: W, M, Q, or a fixed
+    frequency (5min, 1h, 1D) for intraday timestamps, in their local time.
+    """
+    local = index.tz_localize(None) if index.tz is not None else index
+    if rule not in RULES:
+        try:
+            return local.floor(rule).asi8
+        except ValueError:      # W-MON and other calendar frequencies
+            pass
+    return local.to_period(RULES.get(rule, rule)).asi8
+
+def bar_starts(index: pd.DatetimeIndex, rule: str) -> np.ndarray:
+    """Positions where a new `rule` bar begins in a sorted index (see bar_codes)."""
+    codes = bar_codes(index, rule)
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+_HOW = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Adj Close": "last", "Volume": "sum"}
+
+def resample(frame: pd.DataFrame, rule: str = "W", how: str = "last") -> pd.DataFrame:
+    """
+    Dates x symbols frame as `rule` bars (W, M, Q, or 1h, 1D, ... for intraday
+    bars), dated on each bar's last timestamp. `how` is last, first, max, min or sum, or "ohlcv" to pick
+    by column name (Open first, High max, Low min, Close last, Volume sum) for
+    a single symbol's bars. NaN days are skipped; a bar with no data is NaN.
+    """
+    if frame.empty:
+        return frame
+    starts = bar_starts(frame.index, rule)
+    ends = np.r_[starts[1:], len(frame)] - 1
+    if how == "ohlcv":
+        return pd.DataFrame(
+            {c: resample(frame[[c]], rule, _HOW.get(c, "last"))[c] for c in frame.columns}, index=frame.index[ends]
+        )
+    values = frame.to_numpy(dtype=np.float64)
+    seen = np.isfinite(values)
+    any_seen = np.add.reduceat(seen, starts, axis=0) > 0
+    if how == "last":
+        out = marks(values, seen)[ends]
+    elif how == "first":
+        out = marks(values[::-1], seen[::-1])[::-1][starts]
+    elif how == "max":
+        out = np.fmax.reduceat(values, starts, axis=0)
+    elif how == "min":
+        out = np.fmin.reduceat(values, starts, axis=0)
+    elif how == "sum":
+        out = np.add.reduceat(np.where(seen, values, 0.0), starts, axis=0)
+    else:
+        raise ValueError(f"Unknown resample method {how!r}")
+    return pd.DataFrame(np.where(any_seen, out, np.nan), index=frame.index[ends], columns=frame.columns)
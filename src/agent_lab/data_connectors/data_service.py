@@ -0,0 +1,99 @@
+# src/agent_lab/data_connectors/data_service.py
+"""
+Process-wide, lazily filled access to prices and fundamentals.
+
+Nothing is fetched until a caller asks for specific symbols. Prices that have
+been loaded are kept across Streamlit reruns and API requests (least recently
+used ones are evicted past AGENT_LAB_SERVICE_PRICE_ENTRIES / _MB) until the
+cache version or the active data source changes, or invalidate() is called;
+a symbol whose prices failed to load is retried after NEGATIVE_TTL.
+Fundamentals are read through the fundamentals cache on every call, so its TTL
+and stale-while-revalidate refreshes show through.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+from agent_lab.data_connectors.lru import BoundedCache, env_limit
+from agent_lab.data_connectors.sources import get_data_source
+
+# Bump (or set AGENT_LAB_CACHE_VERSION) to drop every process-wide cache
+CACHE_VERSION = os.getenv("AGENT_LAB_CACHE_VERSION", "1")
+NEGATIVE_TTL = 15 * 60  # a failed price fetch is not retried for this long, as in the fundamentals cache
+
+class DataService:
+    def __init__(self, version: str = CACHE_VERSION):
+        self.version = version
+        self._prices = BoundedCache(               # (symbol, field) -> series
+            "service_prices",
+            max_entries=int(env_limit("AGENT_LAB_SERVICE_PRICE_ENTRIES", 20000)),
+            max_bytes=int(env_limit("AGENT_LAB_SERVICE_PRICE_MB", 512) * 2**20),
+        )
+        self._failed = BoundedCache(                # (symbol, field) -> True
+            "service_price_failures", max_entries=20000, ttl=NEGATIVE_TTL,
+        )
+        self._source_key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _check_source(self) -> None:
+        # called with the lock held; anything loaded from another source is dropped
+        key = get_data_source().key
+        if key != self._source_key:
+            self._prices.clear()
+            self._failed.clear()
+            self._source_key = key
+
+    def prices(self, symbols: Iterable[str], field: str = "Adj Close") -> pd.DataFrame:
+        """
+        Adj Close panel for `symbols` (or another OHLCV `field`, e.g. "Volume")
+        on the data source's trading calendar, NaN where a symbol has no bar;
+        symbols without price data are left out.
+        """
+        from agent_lab.data_connectors.calendar import align
+        from agent_lab.data_connectors.price_data import get_price_history
+
+        symbols = list(symbols)
+        with self._lock:
+            self._check_source()
+            loaded = {}
+            for s in symbols:
+                series = self._prices.get((s, field))
+                if series is None and not self._failed.get((s, field)):
+                    try:
+                        series = self._prices[s, field] = get_price_history(s, field=field)
+                    except Exception as e:
+                        print("Price fetch failed for", s, e)
+                        self._failed[s, field] = True
+                if series is not None:
+                    loaded[s] = series
+        if not loaded:
+            return pd.DataFrame()
+        return align(loaded).frame()
+
+    def fundamentals(self, symbols: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        {symbol: normalized row, or None if it can't be fetched}. Not memoized
+        here: the fundamentals cache is already in memory, expires entries and
+        remembers failures for a while, and fetches happen without this
+        service's lock.
+        """
+        from agent_lab.data_connectors.cache import get_fundamentals
+
+        return {s: get_fundamentals(s) for s in symbols}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._prices.clear()
+            self._failed.clear()
+
+_service: Optional[DataService] = None
+_service_lock = threading.Lock()
+
+def get_data_service(version: str = CACHE_VERSION) -> DataService:
+    """The process-wide DataService, recreated when `version` changes."""
+    global _service
+    with _service_lock:
+        if _service is None or _service.version != version:
+            _service = DataService(version)
+        return _service
@@ -3,46 +3,69 @@ import os
 import time
 import json
 import random
-import finnhub
+import threading
 from typing import Any
-from requests import HTTPError
+from agent_lab.data_connectors.offline import ensure_online
+from agent_lab import metrics
 
-API_KEY = "d2lhkrpr01qr27gjbi4gd2lhkrpr01qr27gjbi50"
-if not API_KEY:
-    raise RuntimeError("Set FINNHUB_API_KEY env var before running")
+API_KEY = os.getenv("FINNHUB_API_KEY", "d2lhkrpr01qr27gjbi4gd2lhkrpr01qr27gjbi50")
 
-_client = finnhub.Client(api_key=API_KEY)
+_client = None
+
+def get_client():
+    """Finnhub client, built on first use so importing this module stays cheap."""
+    global _client
+    if _client is None:
+        if not API_KEY:
+            raise RuntimeError("Set FINNHUB_API_KEY env var before running")
+        import finnhub
+        _client = finnhub.Client(api_key=API_KEY)
+    return _client
 
 # Configure conservative limits for free plan:
 CALLS_PER_MIN = 30  # set low to be safe on free plan
 _INTERVAL = 60.0 / CALLS_PER_MIN
 _last_call = 0.0
+_rate_lock = threading.Lock()  # callers may fetch from several threads
 
 def _wait_rate_limit():
     global _last_call
-    now = time.time()
-    dt = now - _last_call
-    if dt < _INTERVAL:
-        time.sleep(_INTERVAL - dt + random.random()*0.1)
-    _last_call = time.time()
+    with metrics.span("rate_limit_wait"), _rate_lock:
+        now = time.time()
+        dt = now - _last_call
+        if dt < _INTERVAL:
+            time.sleep(_INTERVAL - dt + random.random()*0.1)
+        _last_call = time.time()
 
 def safe_call(fn, *args, max_attempts=6, **kwargs) -> Any:
+    endpoint = getattr(fn, "__name__", "finnhub")
+    ensure_online(f"{endpoint}{args}")
     for attempt in range(max_attempts):
         try:
             _wait_rate_limit()
-            res = fn(*args, **kwargs)
+            metrics.inc("remote_calls_total", api="finnhub", endpoint=endpoint)
+            with metrics.span("remote_call", api="finnhub", endpoint=endpoint):
+                res = fn(*args, **kwargs)
             return res
         except Exception as e:
+            status = getattr(e, "status_code", None)
+            if status is not None and 400 <= status < 500 and status != 429:
+                # bad symbol / not on this plan: retrying will not help
+                metrics.inc("remote_failures_total", api="finnhub", endpoint=endpoint)
+                raise RuntimeError(f"{fn.__name__} failed: {e}") from e
             # finnhub client may raise generic exceptions on 429; back off
+            metrics.inc("remote_retries_total", api="finnhub", endpoint=endpoint)
             backoff = min(2 ** attempt + random.random(), 60)
-            time.sleep(backoff)
+            with metrics.span("retry_backoff", api="finnhub"):
+                time.sleep(backoff)
+    metrics.inc("remote_failures_total", api="finnhub", endpoint=endpoint)
     raise RuntimeError(f"Failed after {max_attempts} attempts calling {fn.__name__}")
 
 def company_profile2(symbol: str):
-    return safe_call(_client.company_profile2, symbol=symbol)
+    return safe_call(get_client().company_profile2, symbol=symbol)
 
 def company_basic_financials(symbol: str, metric: str = "all"):
-    return safe_call(_client.company_basic_financials, symbol, metric)
+    return safe_call(get_client().company_basic_financials, symbol, metric)
 
 def stock_insider_transactions(symbol: str):
-    return safe_call(_client.stock_insider_transactions, symbol)
+    return safe_call(get_client().stock_insider_transactions, symbol)
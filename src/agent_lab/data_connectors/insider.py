@@ -0,0 +1,268 @@
+# src/agent_lab/data_connectors/insider.py
+"""
+Insider-transaction history per symbol with windowed aggregates.
+
+    store = insider_store()
+    store.update("AAPL", raw["insider"])            # only unseen filings are added
+    store.aggregate("AAPL", as_of="2024-06-30", days=90)
+    # {"buy_shares": ..., "sell_shares": ..., "net_shares": ..., "buy_usd": ..., "sell_usd": ..., "net_usd": ...}
+
+Transactions are ordered by filing date (when the trade became public, so an
+as-of query never sees a trade before it was disclosed) and kept with prefix
+sums of bought / sold shares and dollars. A window (as_of - days, as_of] is two
+binary searches and a subtraction; filings newer than everything stored are
+appended without touching the existing sums. A history keeps its newest
+`max_rows` transactions (AGENT_LAB_INSIDER_MAX_ROWS); older ones are dropped
+and ignored if they come back, so windows reaching before `start` undercount.
+
+The fundamentals cache feeds the store of the active data source as payloads
+are loaded, and normalize.py reads recent_insider_buy / recent_insider_sell
+from it; cache.insider_windows() serves the 30/90/180-day aggregates.
+
+Buys are transactions with a positive `change` (net shares), sells a negative
+one; sells are reported as positive amounts and net = buy - sell.
+"""
+from __future__ import annotations
+import math
+import threading
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence
+import numpy as np
+from agent_lab.data_connectors.lru import BoundedCache, env_limit
+
+if TYPE_CHECKING:
+    # only InsiderStore.frame() needs pandas; the cache's per-symbol path never imports it
+    import pandas as pd
+
+DEFAULT_WINDOW = 90          # days behind recent_insider_buy / recent_insider_sell
+WINDOWS = (30, 90, 180)
+MAX_ROWS = int(env_limit("AGENT_LAB_INSIDER_MAX_ROWS", 5000))   # transactions kept per symbol
+_FIELDS = ("buy_shares", "sell_shares", "buy_usd", "sell_usd")
+
+def as_of_day(as_of=None) -> np.datetime64:
+    """`as_of` (str, date, Timestamp or None for today) as a day."""
+    if as_of is None:
+        as_of = date.today()
+    if isinstance(as_of, datetime):     # Timestamps included
+        as_of = as_of.date()
+    if isinstance(as_of, date):
+        return np.datetime64(as_of, "D")
+    day = _parse_day(str(as_of)[:10])
+    if np.isnat(day):
+        # not ISO: let pandas read it
+        import pandas as pd
+        day = np.datetime64(pd.Timestamp(as_of).date(), "D")
+    return day
+
+def _parse_day(day: Optional[str]) -> np.datetime64:
+    """An ISO "YYYY-MM-DD" string as a day; NaT if it isn't one."""
+    if day and len(day) == 10 and day[4] == day[7] == "-":
+        try:
+            return np.datetime64(day, "D")
+        except ValueError:
+            pass
+    return np.datetime64("NaT", "D")
+
+def _amount(x) -> float:
+    """A number, or 0 for anything missing or non-numeric."""
+    try:
+        value = float(x)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+def transaction_day(t: dict) -> Optional[str]:
+    """Day ("YYYY-MM-DD") a transaction became public: its filing date, else its transaction date."""
+    day = t.get("filingDate") or t.get("transactionDate")
+    return str(day)[:10] if day else None
+
+def window_bounds(as_of=None, days: int = DEFAULT_WINDOW):
+    """ISO day strings (lo, hi): a window holds the days d with lo < d <= hi."""
+    hi = as_of_day(as_of)
+    return str(hi - np.timedelta64(days, "D")), str(hi)
+
+def _key(t: dict) -> tuple:
+    # Finnhub's "id" is per filing, and one filing can hold several rows
+    return (t.get("id"), t.get("name"), t.get("transactionDate"), t.get("filingDate"),
+            t.get("change"), t.get("share"), t.get("transactionPrice"))
+
+def transaction_arrays(transactions: Sequence[dict]):
+    """(days, bought shares, sold shares, bought USD, sold USD) arrays; undated rows are dropped."""
+    days, keep, *values = _arrays(transactions)
+    return (days[keep], *(v[keep] for v in values))
+
+def _arrays(transactions: Sequence[dict]):
+    # transaction_arrays() plus the mask of dated rows, with undated ones still in
+    days = np.array([_parse_day(transaction_day(t)) for t in transactions], dtype="datetime64[D]")
+    change = np.array([_amount(t.get("change")) for t in transactions], dtype=np.float64)
+    price = np.array([_amount(t.get("transactionPrice")) for t in transactions], dtype=np.float64)
+    bought, sold = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+    return days, ~np.isnat(days), bought, sold, bought * price, sold * price
+
+class InsiderHistory:
+    """One symbol's transactions, sorted by day, with prefix sums for window queries."""
+
+    def __init__(self, transactions: Iterable[dict] = (), max_rows: Optional[int] = MAX_ROWS):
+        self.days = np.empty(0, dtype="datetime64[D]")
+        self.max_rows = max_rows
+        self.start: Optional[np.datetime64] = None     # days up to this one were dropped
+        self._cum = {f: np.zeros(1) for f in _FIELDS}   # cum[f][i] - cum[f][0] = sum of the first i rows
+        self._keys: list = []                           # transaction key per row, in row order
+        self._seen: set = set()
+        self.append(transactions)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def append(self, transactions: Iterable[dict]) -> int:
+        """Add dated transactions not seen before; returns how many were new."""
+        new, keys = [], {}
+        for t in transactions:
+            k = _key(t)
+            if k not in self._seen and k not in keys:
+                keys[k] = None
+                new.append(t)
+        if not new:
+            return 0
+        days, keep, *values = _arrays(new)
+        if self.start is not None:
+            keep &= days > self.start
+        keys = [k for k, kept in zip(keys, keep) if kept]
+        days = days[keep]
+        if len(days) == 0:
+            return 0
+        self._seen.update(keys)
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        values = [v[keep][order] for v in values]
+        keys = [keys[i] for i in order]
+        if len(self.days) == 0 or days[0] >= self.days[-1]:
+            # newer filings: extend the prefix sums from where they end
+            self.days = np.concatenate([self.days, days])
+            for f, v in zip(_FIELDS, values):
+                self._cum[f] = np.concatenate([self._cum[f], self._cum[f][-1] + np.cumsum(v)])
+            self._keys += keys
+        else:
+            # a back-filled filing: rebuild from the per-row values
+            old = [np.diff(self._cum[f]) for f in _FIELDS]
+            all_days = np.concatenate([self.days, days])
+            order = np.argsort(all_days, kind="stable")
+            self.days = all_days[order]
+            for f, o, v in zip(_FIELDS, old, values):
+                self._cum[f] = np.concatenate([[0.0], np.cumsum(np.concatenate([o, v])[order])])
+            all_keys = self._keys + keys
+            self._keys = [all_keys[i] for i in order]
+        self._trim()
+        return len(days)
+
+    def _trim(self) -> None:
+        """Drop the oldest days until at most max_rows transactions are left."""
+        excess = len(self.days) - (self.max_rows if self.max_rows is not None else len(self.days))
+        if excess <= 0:
+            return
+        # whole days go, so a dropped filing can't come back next to kept ones of its day
+        self.start = self.days[excess - 1]
+        cut = int(np.searchsorted(self.days, self.start, side="right"))
+        self._seen.difference_update(self._keys[:cut])
+        self._keys = self._keys[cut:]
+        self.days = self.days[cut:]
+        for f in _FIELDS:
+            self._cum[f] = self._cum[f][cut:]   # sums of windows are differences: the offset cancels
+
+    def aggregate(self, as_of=None, days: int = DEFAULT_WINDOW) -> Dict[str, float]:
+        """Totals over the `days` up to and including `as_of` (default: today)."""
+        out = self.aggregate_many([as_of_day(as_of)], days)
+        return {k: float(v[0]) for k, v in out.items()}
+
+    def windows(self, as_of=None, windows: Sequence[int] = WINDOWS) -> Dict[int, Dict[str, float]]:
+        """aggregate() for each window length, e.g. {30: {...}, 90: {...}, 180: {...}}."""
+        return {days: self.aggregate(as_of, days) for days in windows}
+
+    def aggregate_many(self, as_of: Sequence, days: int = DEFAULT_WINDOW) -> Dict[str, np.ndarray]:
+        """aggregate() for many as-of dates at once (e.g. every backtest date)."""
+        end = np.asarray(as_of, dtype="datetime64[D]")
+        hi = np.searchsorted(self.days, end, side="right")
+        lo = np.searchsorted(self.days, end - np.timedelta64(days, "D"), side="right")
+        out = {f: self._cum[f][hi] - self._cum[f][lo] for f in _FIELDS}
+        out["net_shares"] = out["buy_shares"] - out["sell_shares"]
+        out["net_usd"] = out["buy_usd"] - out["sell_usd"]
+        return out
+
+class InsiderStore:
+    """
+    InsiderHistory per symbol, fed by the fundamentals cache as payloads are
+    loaded. A symbol's history is only built when it is first queried; until
+    then its transactions are just kept. At most `max_symbols` of each are kept,
+    least recently used first out (the fundamentals cache feeds them back), and
+    each history holds at most `max_rows` transactions.
+    """
+
+    def __init__(self, max_symbols: Optional[int] = None, max_rows: Optional[int] = MAX_ROWS):
+        if max_symbols is None:
+            max_symbols = int(env_limit("AGENT_LAB_INSIDER_SYMBOLS", 20000))
+        self.max_rows = max_rows
+        # entry counts only: both kinds of entry grow in place after they are stored
+        self._histories = BoundedCache("insider_histories", max_entries=max_symbols, sizeof=lambda _: 0)
+        self._pending = BoundedCache("insider_pending", max_entries=max_symbols, sizeof=lambda _: 0)  # symbol -> {key: tx}
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, transactions: Iterable[dict]) -> None:
+        with self._lock:
+            history = self._histories.get(symbol)
+            if history is not None:
+                history.append(transactions or [])
+            else:
+                pending = self._pending.get(symbol)
+                if pending is None:
+                    pending = self._pending[symbol] = {}
+                for t in transactions or []:
+                    pending.setdefault(_key(t), t)
+
+    def history(self, symbol: str) -> Optional[InsiderHistory]:
+        with self._lock:
+            history = self._histories.get(symbol)
+            pending = self._pending.pop(symbol) if history is None else None
+            if pending is not None:
+                history = self._histories[symbol] = InsiderHistory(pending.values(), self.max_rows)
+            return history
+
+    def aggregate(self, symbol: str, as_of=None, days: int = DEFAULT_WINDOW) -> Optional[Dict[str, float]]:
+        history = self.history(symbol)
+        return history.aggregate(as_of, days) if history is not None else None
+
+    def frame(self, symbols: Sequence[str], as_of=None, days: int = DEFAULT_WINDOW) -> pd.DataFrame:
+        """
+        recent_insider_buy / recent_insider_sell for `symbols` as of one date, in
+        the fundamentals schema; assign() it over a fundamentals frame to score
+        that date point-in-time. Symbols without a history get NA.
+        """
+        import pandas as pd
+        day = as_of_day(as_of)
+        buy, sell = np.full(len(symbols), np.nan), np.full(len(symbols), np.nan)
+        for i, s in enumerate(symbols):
+            history = self.history(s)
+            if history is not None:
+                agg = history.aggregate_many([day], days)
+                buy[i], sell[i] = agg["buy_shares"][0], agg["sell_shares"][0]
+        return pd.DataFrame(
+            {"recent_insider_buy": buy, "recent_insider_sell": sell}, index=pd.Index(symbols, name="symbol")
+        ).round().astype("Int64")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histories.clear()
+            self._pending.clear()
+
+_stores: Dict[str, InsiderStore] = {}
+_stores_lock = threading.Lock()
+
+def insider_store(source_key: Optional[str] = None) -> InsiderStore:
+    """The store fed from one data source (default: the active one)."""
+    if source_key is None:
+        from agent_lab.data_connectors.sources import get_data_source
+        source_key = get_data_source().key
+    with _stores_lock:
+        store = _stores.get(source_key)
+        if store is None:
+            store = _stores[source_key] = InsiderStore()
+        return store
@@ -0,0 +1,151 @@
+# src/agent_lab/data_connectors/lru.py
+"""
+Bounded in-memory cache shared by the fundamentals and price paths.
+
+    prices = BoundedCache("prices", max_entries=2000, max_bytes=256 << 20, ttl=24 * 3600)
+    prices.put(("live", "AAPL"), df)
+    df = prices.get(("live", "AAPL"))
+
+Entries are evicted least-recently-used first once either bound is exceeded,
+and dropped on lookup once older than `ttl` (if set). Sizes are estimated once
+per put() with approx_size(); entries count, bytes and evictions are exported
+as agent_lab_cache_* metrics. Thread-safe.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from agent_lab import metrics
+
+_SAMPLE = 8
+_SCALARS = (str, int, float, bool, type(None))
+_MISSING = object()
+
+def approx_size(obj: Any) -> int:
+    """Rough deep size in bytes of JSON-like values and pandas/numpy objects."""
+    if isinstance(obj, _SCALARS):
+        return sys.getsizeof(obj)
+    if hasattr(obj, "memory_usage") and hasattr(obj, "index"):  # pandas Series / DataFrame
+        usage = obj.memory_usage(deep=True, index=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(obj, "nbytes"):  # numpy arrays
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)) and len(obj) > _SAMPLE:
+        # long record lists (insider transactions): extrapolate from an even sample
+        step = len(obj) / _SAMPLE
+        size += sum(approx_size(obj[int(i * step)]) for i in range(_SAMPLE)) * len(obj) // _SAMPLE
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(v) for v in obj)
+    return size
+
+def env_limit(name: str, default: float) -> float:
+    """Numeric limit from the environment, e.g. AGENT_LAB_PRICE_CACHE_MB=512."""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+class BoundedCache:
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, nbytes, stored_at)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # like get(), minus the recency bump: expired entries are not there
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and not self._expired(item)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            if self._expired(item):
+                self._drop(key)
+                self._export()
+                return default
+            self._data.move_to_end(key)
+            return item[0]
+
+    def __getitem__(self, key: Hashable):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def put(self, key: Hashable, value, nbytes: Optional[int] = None) -> None:
+        nbytes = self.sizeof(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, nbytes, time.time())
+            self.nbytes += nbytes
+            evicted = 0
+            # the newest entry stays even if it alone is over max_bytes
+            while len(self._data) > 1 and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._data)))
+                evicted += 1
+            self._export()
+        if evicted:
+            metrics.inc("cache_evictions_total", evicted, cache=self.name)
+
+    __setitem__ = put
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            self._drop(key)
+            self._export()
+            return item[0]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`; returns how many were dropped."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                self._drop(k)
+            self._export()
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self._export()
+
+    def _expired(self, item: tuple) -> bool:
+        return self.ttl is not None and time.time() - item[2] >= self.ttl
+
+    def _drop(self, key: Hashable) -> None:
+        _, nbytes, _ = self._data.pop(key)
+        self.nbytes -= nbytes
+
+    def _export(self) -> None:
+        metrics.set_gauge("cache_entries", len(self._data), cache=self.name)
+        metrics.set_gauge("cache_bytes", self.nbytes, cache=self.name)
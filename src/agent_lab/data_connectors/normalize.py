@@ -0,0 +1,186 @@
+# src/agent_lab/data_connectors/normalize.py
+"""
+The one place raw Finnhub payloads become fundamentals rows.
+
+A raw payload is {"profile": company_profile2, "ratios": company_basic_financials,
+"insider": [insider transactions]}, as stored by the fundamentals cache.
+normalize_frame() turns a batch of them into a columnar frame in one pass;
+normalize_row() applies the same rules to a single payload (the cache's
+per-symbol path). Both follow FIELDS:
+
+  * a metric is the first non-missing value among its Finnhub keys (0 counts
+    as a value); anything non-numeric is missing
+  * missing numbers are NaN, never 0 and never None; missing strings are None
+  * ev_ebitda = enterpriseValue / (ebitdPerShareTTM * shares outstanding)
+  * recent_insider_buy / recent_insider_sell are the shares bought / sold
+    (positive `change` / minus a negative one) in insider transactions filed in
+    the insider.DEFAULT_WINDOW days up to `as_of` (default today); 0 when there
+    are none, NA when the whole payload is missing. Given an `insider` store
+    (insider.InsiderStore) they come from its prefix sums for the symbols it
+    holds, instead of a scan over the payload's transactions
+
+normalize_frame() output is typed by SCHEMA: company as strings, sector as a
+categorical, metrics as float32 (about 7 significant digits, half the memory;
+agents read these columns without a copy) and insider share counts as nullable
+Int64. frame_records() turns such a frame into JSON-safe {symbol: row} dicts.
+"""
+from __future__ import annotations
+import math
+from typing import TYPE_CHECKING, Dict, Mapping, Optional
+import numpy as np
+from agent_lab.data_connectors.insider import DEFAULT_WINDOW, InsiderStore, transaction_day, window_bounds
+
+if TYPE_CHECKING:
+    # the fundamentals cache's per-symbol path (normalize_row) is pure Python; the frame functions import pandas
+    import pandas as pd
+
+# output column -> Finnhub `metric` keys, in order of preference
+FIELDS: Dict[str, tuple] = {
+    "pe": ("peTTM", "forwardPE", "peExclExtraTTM"),
+    "roe": ("roeTTM",),
+    "roic": ("roiTTM", "roicTTM", "roiAnnual"),
+    "debt_to_equity": ("totalDebt/totalEquityAnnual", "longTermDebt/equityAnnual"),
+    "free_cashflow": ("pfcfShareTTM", "freeCashFlowTTM"),
+    "revenue_growth_cagr": ("revenueGrowth5Y", "revenueGrowth3Y"),
+    "revenue_stability": ("revenueGrowthQuarterlyYoy",),
+}
+_EV_KEYS = ("enterpriseValue", "ebitdPerShareTTM", "sharesOutstanding")
+
+COLUMNS = ["company", "sector", "pe", "roe", "roic", "ev_ebitda", "debt_to_equity",
+           "free_cashflow", "revenue_growth_cagr", "revenue_stability",
+           "recent_insider_buy", "recent_insider_sell"]
+
+SCHEMA: Dict[str, str] = {
+    "company": "string",
+    "sector": "category",
+    "pe": "float32",
+    "roe": "float32",
+    "roic": "float32",
+    "ev_ebitda": "float32",
+    "debt_to_equity": "float32",
+    "free_cashflow": "float32",
+    "revenue_growth_cagr": "float32",
+    "revenue_stability": "float32",
+    "recent_insider_buy": "Int64",
+    "recent_insider_sell": "Int64",
+}
+
+def apply_schema(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cast the SCHEMA columns present in `frame` to their declared dtypes."""
+    return frame.astype({col: dtype for col, dtype in SCHEMA.items() if col in frame.columns})
+
+def _metric(raw: Optional[dict]) -> dict:
+    ratios = (raw or {}).get("ratios") or {}
+    metric = ratios.get("metric") if isinstance(ratios, dict) else None
+    return metric if isinstance(metric, dict) else {}
+
+def _num(x) -> float:
+    try:
+        value = float(x)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if math.isfinite(value) else math.nan
+
+def normalize_row(symbol: str, raw: Optional[dict], as_of=None, insider: Optional[InsiderStore] = None) -> dict:
+    """One payload as a {"symbol", **COLUMNS} row, following the module rules."""
+    profile = (raw or {}).get("profile") or {}
+    metric = _metric(raw)
+    row = {"symbol": symbol, "company": profile.get("name"), "sector": profile.get("finnhubIndustry")}
+    for col, keys in FIELDS.items():
+        value = math.nan
+        for k in keys:
+            value = _num(metric.get(k))
+            if value == value:
+                break
+        row[col] = value
+    shares = _num(metric.get("sharesOutstanding"))
+    if shares != shares:
+        shares = _num(profile.get("shareOutstanding"))
+    denom = _num(metric.get("ebitdPerShareTTM")) * shares
+    row["ev_ebitda"] = _num(metric.get("enterpriseValue")) / denom if denom else math.nan
+    buy = sell = math.nan
+    agg = insider.aggregate(symbol, as_of, DEFAULT_WINDOW) if insider is not None and raw is not None else None
+    if agg is not None:
+        buy, sell = agg["buy_shares"], agg["sell_shares"]
+    elif raw is not None:
+        buy = sell = 0.0
+        lo, hi = window_bounds(as_of, DEFAULT_WINDOW)
+        for t in raw.get("insider") or []:
+            day = transaction_day(t)
+            if day is None or not lo < day <= hi:
+                continue
+            change = _num(t.get("change"))
+            if change > 0:
+                buy += change
+            elif change < 0:
+                sell -= change
+    row["recent_insider_buy"], row["recent_insider_sell"] = buy, sell
+    return {k: row[k] for k in ["symbol", *COLUMNS]}
+
+def normalize_frame(raws: Mapping[str, Optional[dict]], as_of=None,
+                    insider: Optional[InsiderStore] = None) -> pd.DataFrame:
+    """
+    Payloads for many symbols ({symbol: raw or None}) as one frame indexed by
+    symbol with COLUMNS, typed by SCHEMA.
+    """
+    import pandas as pd
+    symbols = list(raws)
+    payloads = [raws[s] for s in symbols]
+    index = pd.Index(symbols, name="symbol")
+    if not symbols:
+        return apply_schema(pd.DataFrame(columns=COLUMNS, index=index))
+
+    keys = sorted({k for ks in FIELDS.values() for k in ks} | set(_EV_KEYS))
+    metrics = pd.DataFrame.from_records([_metric(raw) for raw in payloads], columns=keys, index=index)
+    metrics = metrics.apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    metrics = metrics.where(np.isfinite(metrics))
+    profiles = [(raw or {}).get("profile") or {} for raw in payloads]
+
+    out = pd.DataFrame(index=index)
+    out["company"] = pd.Series([p.get("name") for p in profiles], index=index, dtype=object)
+    out["sector"] = pd.Series([p.get("finnhubIndustry") for p in profiles], index=index, dtype=object)
+    for col, ks in FIELDS.items():
+        # first non-missing key, left to right
+        out[col] = metrics[list(ks)].bfill(axis=1).iloc[:, 0]
+    shares = metrics["sharesOutstanding"].fillna(
+        pd.to_numeric(pd.Series([p.get("shareOutstanding") for p in profiles], index=index), errors="coerce"))
+    denom = (metrics["ebitdPerShareTTM"] * shares).replace(0.0, np.nan)
+    out["ev_ebitda"] = metrics["enterpriseValue"] / denom
+
+    missing = np.array([raw is None for raw in payloads])
+    buy, sell = np.full(len(symbols), np.nan), np.full(len(symbols), np.nan)
+    scan = ~missing
+    if insider is not None:
+        for i in np.flatnonzero(scan):
+            agg = insider.aggregate(symbols[i], as_of, DEFAULT_WINDOW)
+            if agg is not None:
+                buy[i], sell[i] = agg["buy_shares"], agg["sell_shares"]
+                scan[i] = False
+    if scan.any():
+        # insider transactions not in the store flattened once: per-transaction symbol position, day and change
+        lengths = np.array([len(raw.get("insider") or []) if s else 0 for raw, s in zip(payloads, scan)])
+        trades = [t for raw, s in zip(payloads, scan) if s for t in (raw.get("insider") or [])]
+        owner = np.repeat(np.arange(len(symbols)), lengths)
+        day = np.array([transaction_day(t) or "" for t in trades], dtype="U10")
+        change = pd.to_numeric(pd.Series([t.get("change") for t in trades], dtype=object), errors="coerce").to_numpy(np.float64)
+        lo, hi = window_bounds(as_of, DEFAULT_WINDOW)
+        recent = (day > lo) & (day <= hi)
+        for totals, mask, sign in ((buy, recent & (change > 0), 1.0), (sell, recent & (change < 0), -1.0)):
+            summed = np.bincount(owner[mask], weights=sign * change[mask], minlength=len(symbols))
+            totals[scan] = summed[scan]
+    out["recent_insider_buy"] = np.rint(buy)
+    out["recent_insider_sell"] = np.rint(sell)
+    return apply_schema(out[COLUMNS])
+
+def frame_records(frame: pd.DataFrame) -> Dict[str, dict]:
+    """{symbol: row} from a (normalized) frame, with plain Python values and None for missing ones."""
+    import pandas as pd
+    cols = {}
+    for col in frame.columns:
+        values = frame[col]
+        if values.dtype == np.float32:
+            # shortest float32 repr, so 39.2864 stays 39.2864 rather than 39.28639984130859
+            values = values.astype(str).astype(np.float64)
+        cols[col] = values.astype(object).where(values.notna(), None)
+    clean = pd.DataFrame(cols, index=frame.index)
+    return dict(zip(clean.index, clean.to_dict("records")))
@@ -0,0 +1,22 @@
+# src/agent_lab/data_connectors/offline.py
+"""
+Offline switch for the data connectors. When on, caches are served regardless
+of age and nothing goes to the network; data that was never cached is missing.
+Set with set_offline() or AGENT_LAB_OFFLINE=1 (inherited by worker processes).
+"""
+import os
+
+_ENV = "AGENT_LAB_OFFLINE"
+
+class OfflineError(RuntimeError):
+    """Raised instead of making a network call while offline."""
+
+def is_offline() -> bool:
+    return os.getenv(_ENV, "").lower() not in ("", "0", "false", "no")
+
+def set_offline(flag: bool = True) -> None:
+    os.environ[_ENV] = "1" if flag else "0"
+
+def ensure_online(what: str) -> None:
+    if is_offline():
+        raise OfflineError(f"offline mode: refusing to fetch {what}")
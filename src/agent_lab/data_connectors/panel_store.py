@@ -0,0 +1,350 @@
+# src/agent_lab/data_connectors/panel_store.py
+"""
+OHLCV for a whole universe as one memory-mapped dates x symbols x fields array.
+
+    store = PanelStore.build("data/panels/sp500", symbols)    # from the price cache / data source
+    store = PanelStore("data/panels/sp500")                   # opens in milliseconds
+    close = store.field("Adj Close")                          # dates x symbols DataFrame
+    volume = store.array("Volume", start="2020-01-01")        # ndarray view, no copy
+    aapl = store.frame("AAPL")                                # one symbol's OHLCV
+
+A store is a directory holding values.npy (the float array, opened with
+np.load(mmap_mode="r"), so every process reading it shares the OS page cache
+instead of its own copy), dates.npy (int64 ns) and meta.json (symbols, fields,
+timezone). Missing bars are NaN. Stores are written to a temporary directory
+and swapped in whole, so readers never see a half-written panel.
+
+Intraday bars are too many for one array: PartitionedPanel keeps one store per
+day, week or month and hands them out one at a time (backtesting.streaming).
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from typing import Callable, Iterable, Iterator, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+DEFAULT_PANEL_DIR = "data/panels"
+FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+PARTITIONS = ("D", "W", "M")
+_BLOCK = 256    # symbols written per pass over the dates axis
+_VERSION = 1
+
+def _naive_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """int64 ns of an index, tz-aware ones as UTC."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8
+
+class PanelStore:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.symbols: List[str] = meta["symbols"]
+        self.fields: List[str] = meta["fields"]
+        self.tz: Optional[str] = meta.get("tz")
+        self.values = np.load(os.path.join(path, "values.npy"), mmap_mode="r")
+        ns = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+        dates = pd.DatetimeIndex(np.asarray(ns).view("M8[ns]"), name="Date")
+        self.dates = dates.tz_localize("UTC").tz_convert(self.tz) if self.tz else dates
+        self._col = {s: i for i, s in enumerate(self.symbols)}
+        self._field = {f: i for i, f in enumerate(self.fields)}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._col
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def rows(self, start=None, end=None) -> slice:
+        """Date positions from `start` to `end`, both inclusive."""
+        lo = 0 if start is None else self.dates.searchsorted(self._ts(start), side="left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(self._ts(end), side="right")
+        return slice(lo, hi)
+
+    def _ts(self, value) -> pd.Timestamp:
+        ts = pd.Timestamp(value)
+        return ts.tz_localize(self.tz) if self.tz and ts.tzinfo is None else ts
+
+    def columns(self, symbols: Optional[Iterable[str]] = None):
+        """Symbol positions (a slice for all of them); unknown symbols raise KeyError."""
+        if symbols is None:
+            return slice(None)
+        return np.array([self._col[s] for s in symbols], dtype=np.intp)
+
+    def array(self, field: str, symbols: Optional[Iterable[str]] = None, start=None, end=None) -> np.ndarray:
+        """
+        dates x symbols values of one field. With all symbols this is a view of
+        the memory map (read-only, nothing copied until used); a symbol subset
+        is gathered into a new array.
+        """
+        return self.values[self.rows(start, end), self.columns(symbols), self._field[field]]
+
+    def field(self, field: str, symbols: Optional[Iterable[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """One field as a dates x symbols DataFrame, like DataService.prices()."""
+        symbols = None if symbols is None else list(symbols)
+        values = np.array(self.array(field, symbols, start, end))
+        index = self.dates[self.rows(start, end)]
+        return pd.DataFrame(values, index=index, columns=pd.Index(self.symbols if symbols is None else symbols))
+
+    def frame(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """One symbol's bars with every stored field, like price_data.get_price_frame()."""
+        rows = self.rows(start, end)
+        values = np.array(self.values[rows, self._col[symbol], :])
+        df = pd.DataFrame(values, index=self.dates[rows], columns=self.fields)
+        return df.dropna(how="all")
+
+    # --- writing ---------------------------------------------------------------
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        frames: Mapping[str, pd.DataFrame],
+        fields: Sequence[str] = FIELDS,
+        dates: Optional[pd.DatetimeIndex] = None,
+        dtype=np.float64,
+    ) -> "PanelStore":
+        """
+        Store {symbol: OHLCV frame}. `frames` may be lazy (e.g. a mapping that
+        loads on access): without `dates`, each frame is read once to collect the
+        union of dates and once more to fill the array, so only `_BLOCK` frames
+        are ever held at a time.
+        """
+        symbols = list(frames)
+        if dates is None:
+            union = None
+            for s in symbols:
+                idx = frames[s].index
+                if len(idx):
+                    union = idx if union is None else union.union(idx)
+            dates = union if union is not None else pd.DatetimeIndex([])
+        dates = pd.DatetimeIndex(dates).sort_values().unique().rename("Date")
+        tz = str(dates.tz) if dates.tz is not None else None
+
+        tmp = f"{path.rstrip(os.sep)}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        values = np.lib.format.open_memmap(
+            os.path.join(tmp, "values.npy"), mode="w+", dtype=dtype, shape=(len(dates), len(symbols), len(fields)),
+        )
+        for start in range(0, len(symbols), _BLOCK):
+            chunk = symbols[start:start + _BLOCK]
+            block = np.full((len(dates), len(chunk), len(fields)), np.nan, dtype=dtype)
+            for j, s in enumerate(chunk):
+                df = frames[s].reindex(columns=list(fields))
+                if df.empty:
+                    continue
+                pos = dates.get_indexer(df.index)
+                keep = pos >= 0
+                block[pos[keep], j, :] = df.to_numpy(dtype=np.float64)[keep]
+            values[:, start:start + len(chunk), :] = block
+        values.flush()
+        del values
+        np.save(os.path.join(tmp, "dates.npy"), _naive_ns(dates))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"version": _VERSION, "symbols": symbols, "fields": list(fields), "tz": tz}, f)
+
+        # swap the finished store in; open memory maps of the old one stay valid
+        old = f"{path.rstrip(os.sep)}.{os.getpid()}.old"
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return cls(path)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        symbols: Iterable[str],
+        loader: Optional[Callable[[str], pd.DataFrame]] = None,
+        fields: Sequence[str] = FIELDS,
+        dtype=np.float64,
+    ) -> "PanelStore":
+        """
+        Store `symbols` as loaded by `loader` (default: price_data.get_price_frame,
+        i.e. the price cache or the active data source). Symbols that fail to
+        load are left out.
+        """
+        if loader is None:
+            from agent_lab.data_connectors.price_data import get_price_frame as loader
+        loaded, dates = [], None
+        for s in symbols:
+            try:
+                index = loader(s).index
+            except Exception as e:
+                print("Price fetch failed for", s, e)
+                continue
+            if len(index):
+                loaded.append(s)
+                dates = index if dates is None else dates.union(index)
+        return cls.write(path, _Frames(loaded, loader), fields, dates=dates, dtype=dtype)
+
+class _Frames(Mapping):
+    """{symbol: frame} that calls `loader` on every access instead of holding frames."""
+
+    def __init__(self, symbols: List[str], loader: Callable[[str], pd.DataFrame]):
+        self._symbols = symbols
+        self._loader = loader
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        return self._loader(symbol)
+
+    def __iter__(self):
+        return iter(self._symbols)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+class PartitionedPanel:
+    """
+    Intraday bars as one PanelStore per date partition (a day, week or month of
+    sessions) under <path>/parts/<first day>, all over the same symbols and
+    fields. Chunks are opened one at a time, so a backtest streaming through
+    years of minute bars only ever maps one partition.
+
+        panel = PartitionedPanel.build("data/panels/sp500-5m", symbols, "2024-01-01", "2024-06-30", interval="5m")
+        for store in panel.chunks(start="2024-03-01"):
+            close = store.field("Close")          # one partition's bars x symbols
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.symbols: List[str] = meta["symbols"]
+        self.fields: List[str] = meta["fields"]
+        self.interval: str = meta["interval"]
+        self.partition: str = meta["partition"]
+        self.parts: List[str] = meta["parts"]
+        self.tz: Optional[str] = meta.get("tz")
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.symbols
+
+    def part(self, key: str) -> PanelStore:
+        return PanelStore(os.path.join(self.path, "parts", key))
+
+    def chunks(self, start=None, end=None) -> Iterator[PanelStore]:
+        """Partitions overlapping `start`..`end` (dates, both inclusive), oldest first."""
+        firsts = pd.DatetimeIndex(self.parts)
+        lo = 0 if start is None else max(firsts.searchsorted(_day(start), side="right") - 1, 0)
+        hi = len(firsts) if end is None else firsts.searchsorted(_day(end), side="right")
+        for key in self.parts[lo:hi]:
+            yield self.part(key)
+
+    def field(self, field: str, symbols: Optional[Iterable[str]] = None, start=None, end=None) -> Iterator[pd.DataFrame]:
+        """One field, partition by partition, as bars x symbols DataFrames."""
+        symbols = None if symbols is None else list(symbols)
+        for store in self.chunks(start, end):
+            chunk = store.field(field, symbols, start, _end_of_day(end))
+            if len(chunk):
+                yield chunk
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        symbols: Iterable[str],
+        start,
+        end,
+        interval: str = "5m",
+        partition: str = "M",
+        loader: Optional[Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame]] = None,
+        fields: Sequence[str] = FIELDS,
+        dtype=np.float32,
+    ) -> "PartitionedPanel":
+        """
+        Store `interval` bars of `symbols` for the partitions (D, W or M)
+        covering `start` to `end`, one partition at a time; only one partition's bars are held in memory.
+        `loader(symbol, first_day, last_day)` returns a symbol's bars (default:
+        the active data source's price_history); symbols that fail to load, or
+        have no bars in a partition, are NaN there.
+        Partitions already in an existing panel at `path` are replaced, others kept.
+        """
+        from agent_lab.data_connectors.calendar import RULES, bar_starts, calendar_for
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown partition {partition!r}; choose from {', '.join(PARTITIONS)}")
+        symbols = list(symbols)
+        if loader is None:
+            loader = _source_loader(interval)
+        # whole partitions, so rebuilding part of a range never leaves a partial one behind
+        freq = RULES.get(partition, partition)
+        lo, hi = _day(start).to_period(freq).start_time, _day(end).to_period(freq).end_time.normalize()
+        days = calendar_for(pd.DatetimeIndex([lo, hi]))
+        starts = bar_starts(days, partition)
+        ends = np.r_[starts[1:], len(days)] - 1
+        parts, tz = [], None
+        if os.path.exists(os.path.join(path, "meta.json")):
+            old = cls(path)
+            if old.symbols != symbols or old.interval != interval or list(old.fields) != list(fields):
+                raise ValueError(f"{path} holds a different panel; build into an empty directory")
+            parts, tz = list(old.parts), old.tz
+        os.makedirs(os.path.join(path, "parts"), exist_ok=True)
+        for a, b in zip(starts, ends):
+            first, last = days[a], days[b]
+            key = first.strftime("%Y-%m-%d")
+            frames = {s: _load_window(loader, s, first, last, fields, dtype) for s in symbols}
+            store = PanelStore.write(os.path.join(path, "parts", key), frames, fields, dtype=dtype)
+            del frames
+            tz = tz or store.tz
+            parts = sorted(set(parts) | {key})
+            # the index is rewritten after every partition, so an interrupted build stays readable
+            _write_json(path, {
+                "version": _VERSION, "symbols": symbols, "fields": list(fields), "tz": tz,
+                "interval": interval, "partition": partition, "parts": parts,
+            })
+        return cls(path)
+
+def _day(value) -> pd.Timestamp:
+    """The calendar date of `value`, midnight and timezone-naive."""
+    return pd.Timestamp(value).tz_localize(None).normalize()
+
+def _end_of_day(value):
+    """A date-only upper bound as the last instant of that day."""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns") if ts == ts.normalize() else ts
+
+def _source_loader(interval: str) -> Callable[[str, pd.Timestamp, pd.Timestamp], pd.DataFrame]:
+    def load(symbol, first, last):
+        from agent_lab.data_connectors.sources import get_data_source
+        # one day past `last`: yfinance treats `end` as exclusive
+        return get_data_source().price_history(symbol, start=first, end=last + pd.Timedelta(days=1), interval=interval)
+    return load
+
+def _load_window(loader, symbol: str, first: pd.Timestamp, last: pd.Timestamp, fields, dtype) -> pd.DataFrame:
+    """One symbol's bars dated first..last; empty if the load fails."""
+    try:
+        df = loader(symbol, first, last)
+    except Exception as e:
+        print("Price fetch failed for", symbol, e)
+        return pd.DataFrame(columns=list(fields), index=pd.DatetimeIndex([]))
+    index = pd.DatetimeIndex(df.index)
+    days = (index.tz_localize(None) if index.tz is not None else index).normalize()
+    return df.loc[(days >= first) & (days <= last)].reindex(columns=list(fields)).astype(dtype)
+
+def _write_json(path: str, meta: dict) -> None:
+    tmp = os.path.join(path, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+def is_partitioned(path: str) -> bool:
+    """Whether `path` holds a PartitionedPanel rather than a single PanelStore."""
+    return os.path.isdir(os.path.join(path, "parts"))
+
+def panel_path(name: str) -> str:
+    return os.path.join(DEFAULT_PANEL_DIR, name)
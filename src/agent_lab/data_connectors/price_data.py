@@ -1,45 +1,105 @@
 # src/agent_lab/data_connectors/price_data.py
 import os
+import time
 import pandas as pd
-import yfinance as yf
 import pickle
 from datetime import datetime, timedelta
+from typing import Optional
+from agent_lab.data_connectors.offline import is_offline
+from agent_lab.data_connectors.sources import get_data_source
+from agent_lab.data_connectors.warmer import record_access
+from agent_lab.data_connectors.lru import BoundedCache, env_limit
+from agent_lab import metrics
 
 CACHE_DIR = "data/cache_prices"
-os.makedirs(CACHE_DIR, exist_ok=True)
+PRICE_TTL = 24 * 3600  # 1 day in seconds
+
+# (source key, symbol) -> (full cached frame, fetched at); bounded, evicted LRU-first
+_inmem = BoundedCache(
+    "prices",
+    max_entries=int(env_limit("AGENT_LAB_PRICE_CACHE_ENTRIES", 5000)),
+    max_bytes=int(env_limit("AGENT_LAB_PRICE_CACHE_MB", 512) * 2**20),
+    sizeof=lambda item: int(item[0].memory_usage(deep=True).sum()),
+)
 
 def _cache_path(symbol):
     return os.path.join(CACHE_DIR, f"{symbol}.pkl")
 
-def get_price_history(symbol: str, start=None, end=None):
+def clear_price_cache():
+    """Drops in-memory price frames (the pickles on disk are kept)."""
+    _inmem.clear()
+
+def price_cache_age(symbol: str) -> Optional[float]:
+    """Seconds since `symbol`'s price pickle was written, or None if there is none."""
+    try:
+        return time.time() - os.path.getmtime(_cache_path(symbol))
+    except OSError:
+        return None
+
+def refresh_price_history(symbol: str):
+    """Download `symbol` now and replace its cached pickle (used by the background warmer)."""
+    return get_price_history(symbol, refresh=True)
+
+def get_price_history(symbol: str, start=None, end=None, refresh: bool = False, field: str = "Adj Close"):
     """
-    Returns a pandas Series of Adjusted Close indexed by date.
-    Caches per-symbol to disk to avoid re-downloads.
+    Returns a pandas Series of Adjusted Close (or another OHLCV `field`, e.g.
+    "Volume") indexed by date; see get_price_frame().
     """
+    return get_price_frame(symbol, start, end, refresh)[field]
+
+def get_price_frame(symbol: str, start=None, end=None, refresh: bool = False):
+    """
+    Returns the OHLCV DataFrame (Open, High, Low, Close, Adj Close, Volume, ...)
+    indexed by date.
+    Caches per-symbol to disk to avoid re-downloads (any age is accepted offline).
+    Non-live data sources are read directly, over their full history by default.
+    """
+    if not refresh:
+        record_access(symbol)
+    source = get_data_source()
+    if not source.persistent:
+        with metrics.span("fetch", what="prices"):
+            df = source.price_history(symbol, start=start, end=end)
+        if df.empty:
+            raise RuntimeError(f"No price data for {symbol}")
+        return df
+
     if start is None:
         start = (datetime.now() - timedelta(days=365*3)).strftime("%Y-%m-%d")
     if end is None:
         end = datetime.now().strftime("%Y-%m-%d")
 
     pfile = _cache_path(symbol)
+    key = (source.key, symbol)
+    if not refresh:
+        cached = _inmem.get(key)
+        if cached is not None and (time.time() - cached[1] < PRICE_TTL or is_offline()):
+            metrics.inc("cache_requests_total", cache="prices", result="memory_hit")
+            df = cached[0]
+            return df.loc[(df.index >= start) & (df.index <= end)]
+
     # If cached and reasonably fresh (1 day), reuse
-    if os.path.exists(pfile):
-        mtime = datetime.fromtimestamp(os.path.getmtime(pfile))
-        if (datetime.now() - mtime).days < 1:
+    age = None if refresh else price_cache_age(symbol)
+    if age is not None:
+        if age < PRICE_TTL or is_offline():
+            metrics.inc("cache_requests_total", cache="prices", result="disk_hit")
             with open(pfile, "rb") as f:
                 df = pickle.load(f)
+            _inmem.put(key, (df, time.time() - age))
             # ensure requested window available
-            df = df.loc[(df.index >= start) & (df.index <= end)]
-            return df["Adj Close"]
+            return df.loc[(df.index >= start) & (df.index <= end)]
 
-    # download
-    ticker = yf.Ticker(symbol)
-    df = ticker.history(start=start, end=end, auto_adjust=False)
+    # download (price_history fills in 'Adj Close' when missing)
+    metrics.inc("cache_requests_total", cache="prices", result="miss")
+    with metrics.span("fetch", what="prices"):
+        df = source.price_history(symbol, start=start, end=end)
     if df.empty:
         raise RuntimeError(f"No price data for {symbol}")
-    # ensure 'Adj Close' exists
-    if "Adj Close" not in df.columns and "Close" in df.columns:
-        df["Adj Close"] = df["Close"]
-    with open(pfile, "wb") as f:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # write then rename, so concurrent readers see the old file or the new one
+    tmp = f"{pfile}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
         pickle.dump(df, f)
-    return df["Adj Close"]
+    os.replace(tmp, pfile)
+    _inmem.put(key, (df, time.time()))
+    return df
@@ -0,0 +1,526 @@
+# src/agent_lab/data_connectors/sources.py
+"""
+Pluggable data sources behind the Finnhub and yfinance connectors.
+
+Every connector (cache, finnhub_data, price_data, yf_market_data) asks the
+active source for raw responses instead of calling the vendors directly:
+
+    LiveSource       Finnhub (rate limited) and yfinance, the default
+    RecordingSource  wraps another source and saves every response it returns
+    ReplaySource     serves recorded responses only; never touches the network
+    SyntheticSource  deterministic fake universe (e.g. 5,000 symbols x 20 years)
+
+Recordings use the same layout as the on-disk caches (<dir>/<SYMBOL>.json with
+{"fetched_at", "raw": {"profile", "ratios", "insider"}}, <dir>/<SYMBOL>.pkl with
+the yfinance OHLCV frame), so ReplaySource() replays data/cache_fundamentals and
+data/cache_prices as they are.
+
+Pick a source with set_data_source(), the use_data_source() context manager or
+AGENT_LAB_DATA_SOURCE (a spec understood by data_source_from_spec()).
+"""
+from __future__ import annotations
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_FUNDAMENTALS_DIR = "data/cache_fundamentals"
+DEFAULT_PRICES_DIR = "data/cache_prices"
+DEFAULT_RECORD_DIR = "data/recordings"
+
+class MissingRecording(LookupError):
+    """A replay source was asked for something that was never recorded."""
+
+def _period_start(period: str, end: "pd.Timestamp") -> Optional["pd.Timestamp"]:
+    """Start date for a yfinance-style period ('5d', '6mo', '2y', 'ytd', 'max')."""
+    import pandas as pd
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not m:
+        raise ValueError(f"Unsupported period: {period!r}")
+    n, unit = int(m.group(1)), m.group(2)
+    offset = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n),
+              "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return end - offset
+
+def _window(df: "pd.DataFrame", start=None, end=None, period: Optional[str] = None) -> "pd.DataFrame":
+    import pandas as pd
+    if df.empty:
+        return df
+    tz = getattr(df.index, "tz", None)
+
+    def _ts(x):
+        ts = pd.Timestamp(x)
+        return ts.tz_localize(tz) if tz is not None and ts.tzinfo is None else ts
+
+    if period is not None and start is None:
+        start = _period_start(period, _ts(end) if end is not None else df.index[-1])
+    if start is not None:
+        df = df.loc[df.index >= _ts(start)]
+    if end is not None:
+        df = df.loc[df.index <= _ts(end)]
+    return df
+
+class DataSource(ABC):
+    """
+    Raw vendor responses for one symbol at a time. Subclasses implement the
+    five vendor methods; one that leaves any out can't be instantiated. `key` identifies the source
+    (and its parameters) so caches never mix data from different sources;
+    `persistent` says whether the connectors may keep its data in their disk caches;
+    `as_of` is the date its data describes (None: today), which windows "recent"
+    figures such as insider buying; `calendar` names the trading calendar its
+    bars follow (see data_connectors.calendar).
+    """
+    key = "base"
+    persistent = False
+    as_of = None
+    calendar = "XNYS"
+
+    # Finnhub
+    @abstractmethod
+    def company_profile2(self, symbol: str) -> dict:
+        ...
+
+    @abstractmethod
+    def company_basic_financials(self, symbol: str, metric: str = "all") -> dict:
+        ...
+
+    @abstractmethod
+    def stock_insider_transactions(self, symbol: str) -> dict:
+        ...
+
+    # yfinance
+    @abstractmethod
+    def price_history(self, symbol: str, start=None, end=None, period: Optional[str] = None,
+                      interval: str = "1d") -> "pd.DataFrame":
+        """OHLCV frame as returned by yfinance Ticker.history(auto_adjust=False)."""
+
+    @abstractmethod
+    def ticker_info(self, symbol: str) -> dict:
+        ...
+
+    def close_prices(self, symbols: List[str], period: str = "2y", interval: str = "1d") -> "pd.DataFrame":
+        """Adjusted closes, one column per symbol (symbols without data are left out)."""
+        import pandas as pd
+        cols = {}
+        for s in symbols:
+            try:
+                df = self.price_history(s, period=period, interval=interval)
+            except LookupError:
+                continue
+            if not df.empty:
+                cols[s] = df["Adj Close"] if "Adj Close" in df.columns else df["Close"]
+        return pd.DataFrame(cols)
+
+    def universe(self) -> List[str]:
+        """Symbols this source knows about, when it can enumerate them."""
+        return []
+
+class LiveSource(DataSource):
+    key = "live"
+    persistent = True
+
+    def company_profile2(self, symbol: str) -> dict:
+        from agent_lab.data_connectors import finnhub_client
+        return finnhub_client.company_profile2(symbol) or {}
+
+    def company_basic_financials(self, symbol: str, metric: str = "all") -> dict:
+        from agent_lab.data_connectors import finnhub_client
+        return finnhub_client.company_basic_financials(symbol, metric) or {}
+
+    def stock_insider_transactions(self, symbol: str) -> dict:
+        from agent_lab.data_connectors import finnhub_client
+        return finnhub_client.stock_insider_transactions(symbol) or {}
+
+    def price_history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        from agent_lab.data_connectors.offline import ensure_online
+        ensure_online(f"prices for {symbol}")
+        import yfinance as yf
+        from agent_lab import metrics
+        kwargs = {"start": start, "end": end} if start is not None or end is not None else {"period": period or "max"}
+        metrics.inc("remote_calls_total", api="yfinance", endpoint="history")
+        with metrics.span("remote_call", api="yfinance", endpoint="history"):
+            df = yf.Ticker(symbol).history(interval=interval, auto_adjust=False, **kwargs)
+        if "Adj Close" not in df.columns and "Close" in df.columns:
+            df["Adj Close"] = df["Close"]
+        return df
+
+    def ticker_info(self, symbol: str) -> dict:
+        from agent_lab.data_connectors.offline import ensure_online
+        ensure_online(f"info for {symbol}")
+        import yfinance as yf
+        from agent_lab import metrics
+        metrics.inc("remote_calls_total", api="yfinance", endpoint="info")
+        with metrics.span("remote_call", api="yfinance", endpoint="info"):
+            return yf.Ticker(symbol).info
+
+    def close_prices(self, symbols, period="2y", interval="1d"):
+        # one batched download instead of a request per symbol
+        from agent_lab.data_connectors.offline import ensure_online
+        ensure_online(f"prices for {len(symbols)} symbols")
+        import pandas as pd
+        import yfinance as yf
+        from agent_lab import metrics
+        metrics.inc("remote_calls_total", api="yfinance", endpoint="download")
+        with metrics.span("remote_call", api="yfinance", endpoint="download"):
+            df = yf.download(symbols, period=period, interval=interval, auto_adjust=True, progress=False)["Close"]
+        if isinstance(df, pd.Series):
+            df = df.to_frame()
+        return df
+
+class ReplaySource(DataSource):
+    """Serves recorded responses; anything not recorded raises MissingRecording."""
+
+    def __init__(self, fundamentals_dir: str = DEFAULT_FUNDAMENTALS_DIR, prices_dir: str = DEFAULT_PRICES_DIR,
+                 info_dir: Optional[str] = None):
+        self.fundamentals_dir = fundamentals_dir
+        self.prices_dir = prices_dir
+        self.info_dir = info_dir
+        self.key = f"replay:{os.path.abspath(fundamentals_dir)}:{os.path.abspath(prices_dir)}"
+        self._raw: Dict[str, dict] = {}
+        self._prices: Dict[str, "pd.DataFrame"] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_root(cls, root: str) -> "ReplaySource":
+        """Replay a RecordingSource directory (<root>/fundamentals, /prices, /info)."""
+        return cls(os.path.join(root, "fundamentals"), os.path.join(root, "prices"), os.path.join(root, "info"))
+
+    def _raw_for(self, symbol: str) -> dict:
+        with self._lock:
+            if symbol not in self._raw:
+                path = os.path.join(self.fundamentals_dir, f"{symbol}.json")
+                if not os.path.exists(path):
+                    raise MissingRecording(f"no recorded fundamentals for {symbol} in {self.fundamentals_dir}")
+                with open(path) as f:
+                    self._raw[symbol] = json.load(f).get("raw", {})
+            return self._raw[symbol]
+
+    def company_profile2(self, symbol):
+        return self._raw_for(symbol).get("profile") or {}
+
+    def company_basic_financials(self, symbol, metric="all"):
+        return self._raw_for(symbol).get("ratios") or {}
+
+    def stock_insider_transactions(self, symbol):
+        return {"data": self._raw_for(symbol).get("insider") or [], "symbol": symbol}
+
+    def price_history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        with self._lock:
+            if symbol not in self._prices:
+                path = os.path.join(self.prices_dir, f"{symbol}.pkl")
+                if not os.path.exists(path):
+                    raise MissingRecording(f"no recorded prices for {symbol} in {self.prices_dir}")
+                with open(path, "rb") as f:
+                    self._prices[symbol] = pickle.load(f)
+            df = self._prices[symbol]
+        return _window(df, start, end, period)
+
+    def ticker_info(self, symbol):
+        path = os.path.join(self.info_dir, f"{symbol}.json") if self.info_dir else None
+        if not path or not os.path.exists(path):
+            raise MissingRecording(f"no recorded ticker info for {symbol}")
+        with open(path) as f:
+            return json.load(f)
+
+    def universe(self):
+        if not os.path.isdir(self.fundamentals_dir):
+            return []
+        return sorted(n[:-5] for n in os.listdir(self.fundamentals_dir) if n.endswith(".json"))
+
+class RecordingSource(DataSource):
+    """Passes calls through to `inner` and records each response under `root` for ReplaySource.from_root()."""
+
+    def __init__(self, inner: Optional[DataSource] = None, root: str = DEFAULT_RECORD_DIR):
+        self.inner = inner or LiveSource()
+        self.root = root
+        self.key = self.inner.key
+        self.persistent = self.inner.persistent
+        self.calendar = self.inner.calendar
+        self.as_of = self.inner.as_of
+        self._lock = threading.Lock()
+
+    def _record_raw(self, symbol: str, part: str, value) -> None:
+        d = os.path.join(self.root, "fundamentals")
+        path = os.path.join(d, f"{symbol}.json")
+        with self._lock:
+            os.makedirs(d, exist_ok=True)
+            doc = {"fetched_at": time.time(), "raw": {}}
+            if os.path.exists(path):
+                with open(path) as f:
+                    doc = json.load(f)
+            doc["raw"][part] = value
+            doc["fetched_at"] = time.time()
+            with open(path, "w") as f:
+                json.dump(doc, f)
+
+    def company_profile2(self, symbol):
+        res = self.inner.company_profile2(symbol)
+        self._record_raw(symbol, "profile", res)
+        return res
+
+    def company_basic_financials(self, symbol, metric="all"):
+        res = self.inner.company_basic_financials(symbol, metric)
+        self._record_raw(symbol, "ratios", res)
+        return res
+
+    def stock_insider_transactions(self, symbol):
+        res = self.inner.stock_insider_transactions(symbol)
+        self._record_raw(symbol, "insider", (res or {}).get("data", []))
+        return res
+
+    def price_history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        df = self.inner.price_history(symbol, start=start, end=end, period=period, interval=interval)
+        d = os.path.join(self.root, "prices")
+        path = os.path.join(d, f"{symbol}.pkl")
+        with self._lock:
+            os.makedirs(d, exist_ok=True)
+            merged = df
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    merged = df.combine_first(pickle.load(f))
+            with open(path, "wb") as f:
+                pickle.dump(merged, f)
+        return df
+
+    def ticker_info(self, symbol):
+        res = self.inner.ticker_info(symbol)
+        d = os.path.join(self.root, "info")
+        with self._lock:
+            os.makedirs(d, exist_ok=True)
+            with open(os.path.join(d, f"{symbol}.json"), "w") as f:
+                json.dump(res, f, default=str)
+        return res
+
+    def universe(self):
+        return self.inner.universe()
+
+# synthetic intraday bars: yfinance interval -> minutes, over a 09:30-16:00 New York session
+INTRADAY_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "1h": 60}
+INTRADAY_DEFAULT_DAYS = 60
+SESSION_OPEN_MINUTE = 9 * 60 + 30
+SESSION_MINUTES = 390
+SESSION_TZ = "America/New_York"
+
+# Finnhub industry names used for synthetic profiles
+SYNTHETIC_SECTORS = (
+    "Technology", "Semiconductors", "Banking", "Insurance", "Pharmaceuticals", "Biotechnology",
+    "Retail", "Energy", "Utilities", "Media", "Automobiles", "Industrial Conglomerates",
+)
+
+class SyntheticSource(DataSource):
+    """
+    Deterministic fake market: `n_symbols` tickers (SYN0000, SYN0001, ...) with
+    Finnhub-shaped fundamentals and insider trades, and `years` of daily OHLCV
+    ending at `end` (geometric Brownian motion with per-symbol drift and vol),
+    plus intraday bars inside those days (price_history(interval="5m"), ...).
+    Every response depends only on (seed, symbol), so any subset of the universe
+    can be generated in any order.
+    """
+
+    def __init__(self, n_symbols: int = 5000, years: int = 20, seed: int = 0, end: str = "2024-12-31",
+                 insider_per_symbol: int = 40):
+        import pandas as pd
+        self.n_symbols = n_symbols
+        self.years = years
+        self.seed = seed
+        self.end = pd.Timestamp(end)
+        self.as_of = self.end
+        self.calendar = "B"     # bdate_range: every weekday is a session
+        self.insider_per_symbol = insider_per_symbol
+        self.dates = pd.bdate_range(end=self.end, periods=252 * years, name="Date")
+        self._date_str = np.asarray(self.dates.strftime("%Y-%m-%d"), dtype=object)
+        self.key = f"synthetic:{n_symbols}x{years}:seed{seed}:{self.end.date()}"
+        self._width = max(4, len(str(n_symbols - 1)))
+
+    def universe(self):
+        return [f"SYN{i:0{self._width}d}" for i in range(self.n_symbols)]
+
+    def _rng(self, kind: str, symbol: str) -> np.random.Generator:
+        if not symbol.startswith("SYN") or not symbol[3:].isdigit() or int(symbol[3:]) >= self.n_symbols:
+            raise MissingRecording(f"{symbol} is not in the synthetic universe")
+        from agent_lab.seeding import make_rng
+        return make_rng(self.seed, kind, symbol)
+
+    def company_profile2(self, symbol):
+        rng = self._rng("profile", symbol)
+        shares = float(rng.lognormal(6.0, 1.2))  # millions, like Finnhub
+        return {
+            "country": "US", "currency": "USD", "exchange": "SYNTHETIC",
+            "finnhubIndustry": SYNTHETIC_SECTORS[rng.integers(len(SYNTHETIC_SECTORS))],
+            "ipo": str(np.datetime64(self._date_str[0]) - np.timedelta64(int(rng.integers(0, 10_000)), "D")),
+            "marketCapitalization": shares * float(rng.lognormal(3.5, 1.0)),
+            "name": f"Synthetic {symbol[3:]} Corp", "shareOutstanding": shares, "ticker": symbol,
+        }
+
+    def company_basic_financials(self, symbol, metric="all"):
+        rng = self._rng("ratios", symbol)
+        shares = self.company_profile2(symbol)["shareOutstanding"]
+        ebitd_per_share = float(rng.lognormal(1.0, 0.8))
+        m = {
+            "peTTM": float(rng.lognormal(3.0, 0.5)) if rng.random() > 0.05 else None,
+            "forwardPE": float(rng.lognormal(2.9, 0.5)),
+            "roeTTM": float(rng.normal(15, 12)),
+            "roiTTM": float(rng.normal(10, 8)),
+            "totalDebt/totalEquityAnnual": float(rng.lognormal(-0.7, 0.8)),
+            "pfcfShareTTM": float(rng.normal(20, 15)),
+            "revenueGrowth5Y": float(rng.normal(8, 10)),
+            "revenueGrowthQuarterlyYoy": float(rng.normal(6, 12)),
+            "ebitdPerShareTTM": ebitd_per_share,
+            "enterpriseValue": ebitd_per_share * shares * float(rng.lognormal(2.5, 0.4)),
+            "beta": float(rng.normal(1.0, 0.3)),
+        }
+        return {"metric": m, "metricType": "all", "series": {}, "symbol": symbol}
+
+    def stock_insider_transactions(self, symbol):
+        rng = self._rng("insider", symbol)
+        n = int(rng.poisson(self.insider_per_symbol))
+        days = np.sort(rng.integers(0, len(self.dates), n))
+        change = np.round(rng.normal(-200, 2000, n)).astype(int)
+        share = np.abs(change) + rng.integers(0, 50_000, n)
+        price = rng.lognormal(4.0, 0.6, n)
+        dates = self._date_str[days[::-1]]
+        data = [
+            {"change": c, "filingDate": d, "name": f"Insider {k}", "share": s, "symbol": symbol,
+             "transactionCode": "P" if c > 0 else "S", "transactionDate": d, "transactionPrice": p}
+            for d, c, s, p, k in zip(
+                dates, change.tolist(), share.tolist(), np.round(price, 2).tolist(), rng.integers(0, 8, n).tolist()
+            )
+        ]
+        return {"data": data, "symbol": symbol}
+
+    def price_history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        if interval != "1d":
+            return self._intraday(symbol, start, end, period, interval)
+        return _window(self._daily(symbol), start, end, period)
+
+    def _daily(self, symbol) -> "pd.DataFrame":
+        import pandas as pd
+        rng = self._rng("prices", symbol)
+        n = len(self.dates)
+        mu, sigma = rng.normal(0.07, 0.08), rng.uniform(0.15, 0.6)
+        rets = rng.normal((mu - 0.5 * sigma**2) / 252, sigma / np.sqrt(252), n)
+        close = float(rng.lognormal(3.5, 1.0)) * np.exp(np.cumsum(rets))
+        spread = np.abs(rng.normal(0, sigma / np.sqrt(252), (3, n)))
+        open_ = close * np.exp(rng.normal(0, sigma / np.sqrt(252) / 2, n))
+        df = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + spread[0]),
+            "Low": np.minimum(open_, close) * (1 - spread[1]),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": np.round(rng.lognormal(13, 1.0) * np.exp(spread[2] * 20)),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=self.dates)
+        return df
+
+    def _intraday(self, symbol, start, end, period, interval) -> "pd.DataFrame":
+        """
+        `interval` bars of whole sessions from `start` to `end` (default: the last
+        INTRADAY_DEFAULT_DAYS), New York time. Each session is a Brownian bridge
+        from the daily Open to the daily Close, drawn from its own (symbol, day)
+        stream, so a day's bars never depend on the window asked for.
+        """
+        import pandas as pd
+        if interval not in INTRADAY_MINUTES:
+            raise ValueError(f"Unknown interval {interval!r}; choose from 1d, {', '.join(INTRADAY_MINUTES)}")
+        step = INTRADAY_MINUTES[interval]
+        k = -(-SESSION_MINUTES // step)
+        daily = self._daily(symbol)
+
+        def _day(x):
+            return None if x is None else pd.Timestamp(x).tz_localize(None).normalize()
+
+        days = _window(daily, _day(start), _day(end), period)
+        if start is None and end is None and period is None:
+            days = days.iloc[-INTRADAY_DEFAULT_DAYS:]
+        n = len(days)
+        sigma = np.diff(np.log(daily["Close"].to_numpy())).std() / np.sqrt(k)
+        z = np.stack([
+            self._rng(f"intraday:{interval}:{d}", symbol).normal(0.0, 1.0, (3, k)) for d in days.index.strftime("%Y-%m-%d")
+        ]) if n else np.zeros((0, 3, k))
+        lo, hi = np.log(days["Open"].to_numpy()), np.log(days["Close"].to_numpy())
+        walk = np.cumsum(z[:, 0] * sigma, axis=1)
+        frac = np.arange(1, k + 1) / k
+        close = np.exp(lo[:, None] + frac * (hi - lo)[:, None] + walk - frac * walk[:, -1:])
+        open_ = np.concatenate([np.exp(lo)[:, None], close[:, :-1]], axis=1)
+        # U-shaped volume: busy open and close, quiet lunch
+        weights = (1.0 + 2.0 * np.linspace(-1.0, 1.0, k) ** 2) * np.exp(0.3 * z[:, 2])
+        weights /= weights.sum(axis=1, keepdims=True)
+        minutes = np.tile(SESSION_OPEN_MINUTE + step * np.arange(k), n)
+        index = (days.index.repeat(k) + pd.to_timedelta(minutes, unit="m")).tz_localize(SESSION_TZ).rename("Datetime")
+        return pd.DataFrame({
+            "Open": open_.ravel(),
+            "High": (np.maximum(open_, close) * np.exp(np.abs(z[:, 1]) * sigma / 2)).ravel(),
+            "Low": (np.minimum(open_, close) * np.exp(-np.abs(z[:, 2]) * sigma / 2)).ravel(),
+            "Close": close.ravel(),
+            "Adj Close": close.ravel(),
+            "Volume": np.round(days["Volume"].to_numpy()[:, None] * weights).ravel(),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=index)
+
+    def ticker_info(self, symbol):
+        p, m = self.company_profile2(symbol), self.company_basic_financials(symbol)["metric"]
+        return {
+            "longName": p["name"], "shortName": p["name"], "sector": p["finnhubIndustry"],
+            "trailingPE": m["peTTM"], "returnOnEquity": m["roeTTM"] / 100,
+            "debtToEquity": m["totalDebt/totalEquityAnnual"] * 100,
+            "freeCashflow": m["pfcfShareTTM"] * p["shareOutstanding"] * 1e6,
+        }
+
+def data_source_from_spec(spec: str) -> DataSource:
+    """
+    Build a source from a short spec:
+    'live', 'record[:DIR]', 'replay' (the on-disk caches), 'replay:DIR'
+    (a recording) or 'synthetic[:N_SYMBOLS[:YEARS[:SEED]]]'.
+    """
+    kind, _, arg = (spec or "live").partition(":")
+    if kind == "live":
+        return LiveSource()
+    if kind == "record":
+        return RecordingSource(LiveSource(), arg or DEFAULT_RECORD_DIR)
+    if kind == "replay":
+        return ReplaySource.from_root(arg) if arg else ReplaySource()
+    if kind == "synthetic":
+        parts = [int(p) for p in arg.split(":") if p] if arg else []
+        return SyntheticSource(*parts)
+    raise ValueError(f"Unknown data source spec: {spec!r}")
+
+_source: Optional[DataSource] = None
+
+def get_data_source() -> DataSource:
+    """The active source; defaults to AGENT_LAB_DATA_SOURCE or 'live'."""
+    global _source
+    if _source is None:
+        _source = data_source_from_spec(os.getenv("AGENT_LAB_DATA_SOURCE", "live"))
+    return _source
+
+def set_data_source(source) -> DataSource:
+    """Make `source` (a DataSource or a spec string) the active source and return it."""
+    global _source
+    _source = data_source_from_spec(source) if isinstance(source, str) else source
+    return _source
+
+@contextmanager
+def use_data_source(source):
+    """Temporarily switch the active source."""
+    global _source
+    previous = _source
+    try:
+        yield set_data_source(source)
+    finally:
+        _source = previous
@@ -0,0 +1,32 @@
+# src/agent_lab/data_connectors/universe.py
+"""
+Universe files: the symbol lists the CLI batch commands and the cache warmer
+(AGENT_LAB_UNIVERSE) read.
+
+    symbols = load_universe("universe.csv")
+"""
+from __future__ import annotations
+from typing import List
+
+HEADER_NAMES = ("symbol", "ticker")   # a first line naming one of these columns is a header
+
+def load_universe(path: str) -> List[str]:
+    """
+    Symbols from a file: one per line (blank lines and # comments ignored), or a
+    CSV with a 'symbol' (or 'ticker') column. A first line naming one of those
+    columns is a header, with or without other columns; without one, a CSV's
+    first column is read.
+    """
+    with open(path) as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    lines = [line for line in lines if line]
+    col = 0
+    if lines:
+        header = [h.strip().strip('"').lower() for h in lines[0].split(",")]
+        named = [name for name in HEADER_NAMES if name in header]
+        if named:
+            col = header.index(named[0])
+            lines = lines[1:]
+    lines = [line.split(",")[col].strip() if "," in line else line for line in lines]
+    seen = dict.fromkeys(s.strip('"').upper() for s in lines if s)
+    return list(seen)
@@ -0,0 +1,238 @@
+# src/agent_lab/data_connectors/warmer.py
+"""
+Background refresh of the fundamentals and price caches.
+
+Every cache read calls record_access(), so the warmer knows which symbols users
+actually ask for. A CacheWarmer pass refreshes entries that have used up
+`refresh_ahead` of their TTL (and fills missing ones) before they expire,
+hottest symbols first, spending at most `calls_per_min` Finnhub calls. Readers
+keep getting the old entry until the refreshed one is swapped in
+(stale-while-revalidate), so user requests always hit a warm cache.
+
+    warmer = CacheWarmer(universe=["AAPL", "MSFT"])
+    warmer.start()              # asyncio task inside a running loop (the API apps)
+    warmer.run_forever()        # or block, as `agent-lab warm-cache --daemon` does
+"""
+from __future__ import annotations
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from agent_lab import metrics
+from agent_lab.data_connectors.lru import env_limit
+
+ACCESS_HALF_LIFE = 6 * 3600     # seconds for an access to count half as much
+DEFAULT_INTERVAL = 60.0         # seconds between refresh passes
+DEFAULT_REFRESH_AHEAD = 0.8     # refresh once this fraction of the TTL has passed
+FUNDAMENTALS_CALLS = 3          # profile + basic financials + insider transactions
+PRUNE_BELOW = 0.01              # decayed access scores below this are forgotten (~40h after one access)
+MAX_TRACKED = int(env_limit("AGENT_LAB_TRACKED_SYMBOLS", 50000))
+
+class AccessTracker:
+    """
+    Exponentially decayed access counts per symbol, for at most `max_symbols`
+    symbols: past that, cold ones are pruned and then the coldest dropped.
+    """
+
+    def __init__(self, half_life: float = ACCESS_HALF_LIFE, prune_below: float = PRUNE_BELOW,
+                 max_symbols: int = MAX_TRACKED):
+        self.decay = math.log(2) / half_life
+        self.prune_below = prune_below
+        self.max_symbols = max_symbols
+        self._scores: Dict[str, tuple] = {}   # symbol -> (score, as of time)
+        self._lock = threading.Lock()
+
+    def record(self, symbol: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            score, t = self._scores.get(symbol, (0.0, now))
+            self._scores[symbol] = (score * math.exp(-self.decay * (now - t)) + 1.0, now)
+            over = len(self._scores) > self.max_symbols
+        if over:
+            self._shrink(now)
+
+    def score(self, symbol: str, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        score, t = self._scores.get(symbol, (0.0, now))
+        return score * math.exp(-self.decay * (now - t))
+
+    def symbols(self, now: Optional[float] = None) -> List[str]:
+        """Tracked symbols; ones whose score has decayed below `prune_below` are dropped."""
+        self.prune(now)
+        with self._lock:
+            return list(self._scores)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget symbols whose decayed score is below `prune_below`; returns how many."""
+        now = time.time() if now is None else now
+        with self._lock:
+            cold = [s for s, (score, t) in self._scores.items()
+                    if score * math.exp(-self.decay * (now - t)) < self.prune_below]
+            for s in cold:
+                del self._scores[s]
+        return len(cold)
+
+    def _shrink(self, now: float) -> None:
+        # down to 90% of the cap, so this runs once per max_symbols / 10 new symbols at most
+        self.prune(now)
+        with self._lock:
+            excess = len(self._scores) - int(self.max_symbols * 0.9)
+            if excess > 0:
+                coldest = sorted(self._scores, key=lambda s: self._scores[s][0] * math.exp(-self.decay * (now - self._scores[s][1])))
+                for s in coldest[:excess]:
+                    del self._scores[s]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+
+_tracker = AccessTracker()
+
+def record_access(symbol: str) -> None:
+    """Called by the cache readers on every lookup."""
+    _tracker.record(symbol)
+
+def access_tracker() -> AccessTracker:
+    return _tracker
+
+class TokenBucket:
+    """Allows `rate_per_min` calls per minute on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self.tokens = self.capacity
+        self._t = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._t) * self.rate)
+        self._t = now
+
+    def take(self, n: float) -> bool:
+        self._refill()
+        if self.tokens < n:
+            return False
+        self.tokens -= n
+        return True
+
+def enabled() -> bool:
+    """Apps start a warmer unless AGENT_LAB_WARM_CACHE=0."""
+    return os.getenv("AGENT_LAB_WARM_CACHE", "1").lower() not in ("0", "false", "off", "no")
+
+def _env_universe() -> List[str]:
+    path = os.getenv("AGENT_LAB_UNIVERSE")
+    if not path:
+        return []
+    from agent_lab.data_connectors.universe import load_universe
+    return load_universe(path)
+
+class CacheWarmer:
+    def __init__(
+        self,
+        universe: Optional[Sequence[str]] = None,
+        refresh_ahead: float = DEFAULT_REFRESH_AHEAD,
+        interval: float = DEFAULT_INTERVAL,
+        calls_per_min: Optional[float] = None,
+        fundamentals: bool = True,
+        prices: bool = True,
+        tracker: Optional[AccessTracker] = None,
+    ):
+        from agent_lab.data_connectors.finnhub_client import CALLS_PER_MIN
+        self.universe = list(universe) if universe is not None else _env_universe()
+        self.refresh_ahead = refresh_ahead
+        self.interval = interval
+        # leave the other half of the Finnhub budget to user requests by default
+        self.bucket = TokenBucket(calls_per_min if calls_per_min is not None else CALLS_PER_MIN / 2)
+        self.fundamentals = fundamentals
+        self.prices = prices
+        self.tracker = tracker or _tracker
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def symbols(self) -> List[str]:
+        return list(dict.fromkeys([*self.universe, *self.tracker.symbols()]))
+
+    def due(self, age_fn, ttl: float) -> List[str]:
+        """Symbols whose entry is missing or past refresh_ahead * ttl, hottest and then oldest first."""
+        now = time.time()
+        due = []
+        for sym in self.symbols():
+            age = age_fn(sym)
+            if age is None or age >= self.refresh_ahead * ttl:
+                due.append((-self.tracker.score(sym, now), -(age if age is not None else math.inf), sym))
+        return [sym for *_, sym in sorted(due)]
+
+    def run_once(self) -> Dict[str, int]:
+        """One refresh pass; returns how many entries of each kind were refreshed."""
+        from agent_lab.data_connectors.offline import is_offline
+        from agent_lab.data_connectors.sources import get_data_source
+        done = {"fundamentals": 0, "prices": 0}
+        # only the live source has a disk cache to keep warm
+        if is_offline() or not get_data_source().persistent:
+            return done
+        if self.fundamentals:
+            from agent_lab.data_connectors import cache
+            # symbols whose last fetch failed wait out the negative-cache delay instead of using budget
+            due = [s for s in self.due(cache.fundamentals_age, cache._CACHE_TTL)
+                   if not cache.fundamentals_failed_recently(s)]
+            for sym in due:
+                if self._stop.is_set() or not self.bucket.take(FUNDAMENTALS_CALLS):
+                    break
+                try:
+                    with metrics.span("warm", what="fundamentals"):
+                        cache.refresh_fundamentals(sym)
+                    done["fundamentals"] += 1
+                except Exception as e:
+                    metrics.inc("warm_failures_total", what="fundamentals")
+                    print(f"[warmer] fundamentals {sym} failed: {e}", file=sys.stderr)
+        if self.prices:
+            # yfinance is not part of the Finnhub budget
+            from agent_lab.data_connectors import price_data
+            for sym in self.due(price_data.price_cache_age, price_data.PRICE_TTL):
+                if self._stop.is_set():
+                    break
+                try:
+                    with metrics.span("warm", what="prices"):
+                        price_data.refresh_price_history(sym)
+                    done["prices"] += 1
+                except Exception as e:
+                    metrics.inc("warm_failures_total", what="prices")
+                    print(f"[warmer] prices {sym} failed: {e}", file=sys.stderr)
+        for what, n in done.items():
+            if n:
+                metrics.inc("warm_refreshes_total", n, what=what)
+        return done
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Refresh every `interval` seconds until stop() (or `stop_event`) is set."""
+        if stop_event is not None:
+            self._stop = stop_event
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    async def run_async(self) -> None:
+        """Same as run_forever(), with each pass in a worker thread."""
+        while not self._stop.is_set():
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        """Schedule run_async() on the running event loop."""
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self.run_async())
+        return self._task
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
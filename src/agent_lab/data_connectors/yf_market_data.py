@@ -1,19 +1,18 @@
 from __future__ import annotations
 from typing import List, Dict
 import pandas as pd
-import yfinance as yf
+from agent_lab.data_connectors.sources import get_data_source
 
 def fetch_prices(symbols: List[str], period: str = "2y", interval: str = "1d") -> pd.DataFrame:
-    df = yf.download(symbols, period=period, interval=interval, auto_adjust=True, progress=False)["Close"]
-    if isinstance(df, pd.Series):
-        df = df.to_frame()
+    df = get_data_source().close_prices(list(symbols), period=period, interval=interval)
     return df.dropna(how="all")
 
 def fetch_fundamentals(symbols: List[str]) -> pd.DataFrame:
+    source = get_data_source()
     rows = []
     for s in symbols:
         try:
-            info = yf.Ticker(s).info
+            info = source.ticker_info(s)
             rows.append({
                 "symbol": s,
                 "Company": info.get("longName") or info.get("shortName") or s,
@@ -0,0 +1,297 @@
+# src/agent_lab/ensemble/learning.py
+"""
+Ensemble weights learned online from how each member's votes turned out.
+
+    learner = OnlineWeights(["buffett", "ackman"])
+    learner.update(votes, returns, sectors)      # votes: (symbols, agents) action * confidence
+    learner.weights()                            # {"buffett": 1.31, "ackman": 0.69}
+    learner.weights("Banking")                   # for a symbol in Banking
+    OversightAgent(members, learner=learner)     # each symbol's votes weighted for its sector
+
+A member's reward on a symbol is its vote times the symbol's forward return:
+positive when it bought what went up or sold what went down. An update averages
+the rewards per agent, over all symbols and over each sector's symbols, and
+adds them to running scores, one number per agent and per (sector, agent):
+
+  ewma   score = decay * score + reward, decay = 0.5 ** (1 / halflife updates) (default)
+  hedge  multiplicative weights: score += reward, nothing is forgotten
+
+A symbol's weights are exp(eta * score), scaled to average 1 over the agents,
+so an untrained learner gives every member the old default of 1.0 and the
+ensemble's buy/sell thresholds keep their meaning. The score is the sector's
+own, shrunk toward the overall one while the sector has few votes on record:
+count / (count + shrink) of the way. An update is one vectorized pass over the
+votes plus O(1) per score; reading weights is O(agents) per symbol.
+
+Learners save to JSON. One made with `path` and autoreload=True (as the API
+does) picks up a newer file whenever weights are read, so a backtest or paper
+trading run that saves there updates the live service without a restart.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from agent_lab.agents.base import DecisionBatch
+
+if TYPE_CHECKING:
+    # the CLI's parser and the API's ensemble import this module; neither should pay for pandas
+    import pandas as pd
+
+METHODS = ("ewma", "hedge")
+DEFAULT_METHOD = "ewma"
+DEFAULT_ETA = 2.0
+DEFAULT_HALFLIFE = 63          # updates (trading days, when updated daily)
+DEFAULT_SHRINK = 500.0         # symbol votes before a sector's record counts as much as the overall one
+DEFAULT_HORIZON = 21           # dates between a vote and the return it is judged by
+DEFAULT_WEIGHTS_DIR = "data/ensemble"
+_VERSION = 1
+
+def weights_path(ensemble: str, root: str = DEFAULT_WEIGHTS_DIR) -> str:
+    """Where an ensemble's learned weights are kept: <root>/<ensemble>.json."""
+    return os.path.join(root, f"{ensemble}.json")
+
+class OnlineWeights:
+    def __init__(
+        self,
+        agents: Sequence[str],
+        method: str = DEFAULT_METHOD,
+        eta: float = DEFAULT_ETA,
+        halflife: float = DEFAULT_HALFLIFE,
+        shrink: float = DEFAULT_SHRINK,
+        path: Optional[str] = None,
+        autoreload: bool = False,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"Unknown weighting method {method!r}; choose from {', '.join(METHODS)}")
+        self.agents: List[str] = list(agents)
+        self.method = method
+        self.eta = eta
+        self.halflife = halflife
+        self.shrink = shrink
+        self.path = path
+        self.autoreload = autoreload
+        self.score = np.zeros(len(self.agents))
+        self.sectors: List[str] = []
+        self.sector_score = np.zeros((0, len(self.agents)))
+        self.sector_count = np.zeros(0)
+        self.updates = 0
+        self._mtime = None
+        # the API scores on a thread pool while a reload swaps the arrays
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self._reload()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # --- learning --------------------------------------------------------------
+
+    def update(self, votes: np.ndarray, returns: np.ndarray, sectors: Optional[Sequence] = None) -> None:
+        """
+        One round of feedback. `votes` is (symbols, agents) in self.agents order,
+        action code * confidence (0 for no vote); `returns` the symbols' realized
+        forward returns (NaN: unknown, skipped); `sectors` their sector names.
+        """
+        with self._lock:
+            self._update(np.asarray(votes, dtype=np.float64), np.asarray(returns, dtype=np.float64), sectors)
+
+    def _update(self, votes: np.ndarray, returns: np.ndarray, sectors: Optional[Sequence]) -> None:
+        votes = votes.reshape(-1, len(self.agents))
+        known = np.isfinite(returns)
+        if not known.any():
+            return
+        reward = np.where(known[:, None], votes * np.where(known, returns, 0.0)[:, None], 0.0)
+        decay = 0.5 ** (1.0 / self.halflife) if self.method == "ewma" else 1.0
+        self.score = decay * self.score + reward.sum(axis=0) / known.sum()
+        if sectors is not None:
+            codes = self._sector_codes(sectors, add=True)
+            ok = known & (codes >= 0)
+            counts = np.bincount(codes[ok], minlength=len(self.sectors))
+            sums = np.column_stack([
+                np.bincount(codes[ok], reward[ok, j], minlength=len(self.sectors)) for j in range(len(self.agents))
+            ])
+            seen = counts > 0
+            self.sector_score[seen] = decay * self.sector_score[seen] + sums[seen] / counts[seen, None]
+            self.sector_count = decay * self.sector_count + counts
+        self.updates += 1
+
+    def _sector_codes(self, sectors: Sequence, add: bool = False) -> np.ndarray:
+        """Positions in self.sectors, -1 for a missing (or, unless `add`, unseen) sector."""
+        labels = np.asarray(sectors, dtype=object)
+        codes = _positions(self.sectors, labels)
+        if add and (codes < 0).any():
+            new = sorted({s for s in labels[codes < 0] if isinstance(s, str)})
+            if new:
+                self.sectors.extend(new)
+                self.sector_score = np.vstack([self.sector_score, np.zeros((len(new), len(self.agents)))])
+                self.sector_count = np.r_[self.sector_count, np.zeros(len(new))]
+                codes = _positions(self.sectors, labels)
+        return codes
+
+    # --- reading -----------------------------------------------------------------
+
+    def table(self) -> np.ndarray:
+        """(sectors + 1, agents) weights: one row per sector in self.sectors, then the overall row."""
+        with self._lock:
+            self._check_reload()
+            return self._table()
+
+    def _table(self) -> np.ndarray:
+        trust = (self.sector_count / (self.sector_count + self.shrink))[:, None]
+        logits = np.vstack([self.score + trust * (self.sector_score - self.score), self.score])
+        w = np.exp(self.eta * (logits - logits.max(axis=1, keepdims=True)))
+        return w / w.mean(axis=1, keepdims=True)
+
+    def matrix(self, sectors: Optional[Sequence] = None, n: int = 1) -> np.ndarray:
+        """
+        (symbols, agents) weights for symbols in `sectors` (None: `n` rows of
+        the overall weights); each row averages 1.
+        """
+        with self._lock:
+            self._check_reload()
+            table = self._table()
+            if sectors is None:
+                return np.repeat(table[-1:], n, axis=0)
+            # an unknown sector's code, -1, picks the overall row
+            return table[self._sector_codes(sectors)]
+
+    def weights(self, sector: Optional[str] = None) -> Dict[str, float]:
+        """{agent: weight}, for a symbol in `sector` if given."""
+        row = self.matrix(None if sector is None else [sector])[0]
+        return dict(zip(self.agents, map(float, row)))
+
+    def columns(self, names: Iterable[str]) -> np.ndarray:
+        """Positions of agent `names` in self.agents; -1 for agents the learner doesn't know."""
+        return _positions(self.agents, names)
+
+    # --- persistence -------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return self._to_dict()
+
+    def _to_dict(self) -> dict:
+        return {
+            "version": _VERSION, "agents": self.agents, "method": self.method, "eta": self.eta,
+            "halflife": self.halflife, "shrink": self.shrink, "updates": self.updates,
+            "score": self.score.tolist(), "sectors": self.sectors,
+            "sector_score": self.sector_score.tolist(), "sector_count": self.sector_count.tolist(),
+        }
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Write the learner to `path` (default: the one it was made with), atomically."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("OnlineWeights.save() needs a path")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, autoreload: bool = False) -> "OnlineWeights":
+        with open(path) as f:
+            meta = json.load(f)
+        return cls(
+            meta["agents"], meta["method"], meta["eta"], meta["halflife"], meta["shrink"],
+            path=path, autoreload=autoreload,
+        )
+
+    def _reload(self) -> None:
+        with open(self.path) as f:
+            meta = json.load(f)
+        self._mtime = os.path.getmtime(self.path)
+        score = dict(zip(meta["agents"], meta["score"]))
+        sector_score = np.asarray(meta["sector_score"], dtype=np.float64).reshape(-1, len(meta["agents"]))
+        # agents this learner has but the file doesn't start from 0
+        cols = _positions(meta["agents"], self.agents)
+        self.score = np.array([score.get(a, 0.0) for a in self.agents])
+        self.sectors = list(meta["sectors"])
+        self.sector_score = np.where(cols >= 0, sector_score[:, np.maximum(cols, 0)], 0.0)
+        self.sector_count = np.asarray(meta["sector_count"], dtype=np.float64)
+        self.method, self.eta, self.halflife, self.shrink = meta["method"], meta["eta"], meta["halflife"], meta["shrink"]
+        self.updates = meta["updates"]
+
+    def _check_reload(self) -> None:
+        if not self.autoreload or self.path is None:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._reload()
+
+def _positions(names: Sequence[str], labels: Iterable) -> np.ndarray:
+    """Position of each label in `names`, -1 where it isn't one of them."""
+    index = {name: i for i, name in enumerate(names)}
+    return np.array([index.get(label, -1) if isinstance(label, str) else -1 for label in labels], dtype=np.intp)
+
+def member_votes(batches: Dict[str, DecisionBatch], agents: Sequence[str], symbols) -> np.ndarray:
+    """(symbols, agents) action code * confidence from each member's batch; 0 where it has no vote."""
+    votes = np.zeros((len(symbols), len(agents)))
+    for j, name in enumerate(agents):
+        if name in batches:
+            present, actions, confidence, _ = batches[name].align(symbols)
+            votes[:, j] = np.where(present, actions * confidence, 0.0)
+    return votes
+
+class LearningDecider:
+    """
+    BacktestEngine daily_decider for an OversightAgent that learns its weights
+    as the backtest runs. The members' votes on each date are settled against
+    prices `horizon` dates later, once the backtest gets there, so every date
+    is decided with weights learned from returns it could have known.
+
+        decider = LearningDecider(oversight, lambda dt: member_batches, prices, sectors=funds["sector"])
+        equity = BacktestEngine(prices).run(decider)
+        oversight.learner.save(weights_path("oversight"))
+
+    `members(dt)` returns {agent name: DecisionBatch} for the date.
+    """
+
+    def __init__(
+        self,
+        oversight,
+        members: Callable[[pd.Timestamp], Dict[str, DecisionBatch]],
+        prices: pd.DataFrame,
+        horizon: int = DEFAULT_HORIZON,
+        sectors: Optional[pd.Series] = None,
+    ):
+        if oversight.learner is None:
+            oversight.learner = OnlineWeights([a.name for a in oversight.agents])
+        self.oversight = oversight
+        self.learner: OnlineWeights = oversight.learner
+        self.members = members
+        self.horizon = horizon
+        self.index = prices.index
+        self.symbols = list(prices.columns)
+        self.values = prices.to_numpy(dtype=np.float64)
+        self.sectors = sectors
+        self._sector_values = None if sectors is None else sectors.reindex(self.symbols).to_numpy(dtype=object)
+        self._pending = deque()     # (date position, votes) not yet settled
+        self._last = (None, None)   # (batches, their votes): members often return the same batches daily
+
+    def __call__(self, dt: pd.Timestamp) -> DecisionBatch:
+        i = self.index.get_loc(dt)
+        while self._pending and self._pending[0][0] + self.horizon <= i:
+            t0, votes = self._pending.popleft()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                returns = self.values[t0 + self.horizon] / self.values[t0] - 1.0
+            self.learner.update(votes, returns, self._sector_values)
+        batches = self.members(dt)
+        if batches is not self._last[0]:
+            self._last = (batches, member_votes(batches, self.learner.agents, self.symbols))
+        self._pending.append((i, self._last[1]))
+        return self.oversight.combine_batch(batches, sectors=self.sectors)
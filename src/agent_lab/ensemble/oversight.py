@@ -1,17 +1,32 @@
 from __future__ import annotations
-from typing import List, Dict
-from agent_lab.agents.base import Decision, Action
+from typing import TYPE_CHECKING, List, Dict, Mapping, Optional
+import numpy as np
+from agent_lab.agents.base import Decision, DecisionBatch, Action, reason_code, decide_many
+from agent_lab import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from agent_lab.ensemble.learning import OnlineWeights
+
+def _vote_reason(agent_name: str, action: Action) -> int:
+    # e.g. "buffett:BUY(0.65)", with the confidence as the value
+    return reason_code(f"{agent_name}:{action.name}({{:.2f}})")
 
 class OversightAgent:
+    name = "oversight"
+
     def __init__(
         self,
         agents: List = None,
         weights: Dict[str, float] | None = None,
         buy_thresh: float = 0.2,
         sell_thresh: float = -0.2,
+        learner: Optional[OnlineWeights] = None,
     ):
         self.agents = agents or []
+        # static weights; a learner's per-agent, per-sector weights multiply them
         self.weights = weights or {}
+        self.learner = learner
         self.buy_thresh = buy_thresh
         self.sell_thresh = sell_thresh
 
@@ -28,18 +43,40 @@ class OversightAgent:
                 d = a.decide(symbol)  # fallback
             all_decs.setdefault(symbol, []).append((a.name, d))
 
-        return self.combine(all_decs)[symbol]
+        sector = (data or {}).get("sector")
+        return self.combine(all_decs, sectors={symbol: sector} if sector is not None else None)[symbol]
+
+    def decide_batch(self, frame: pd.DataFrame) -> DecisionBatch:
+        """Run every agent's batch path over `frame` and combine the votes."""
+        symbols = list(frame.index)
+        sectors = frame["sector"] if "sector" in frame.columns else None
+        return self.combine_batch({a.name: decide_many(a, symbols, frame) for a in self.agents}, sectors=sectors)
+
+    def _learned(self, agent_names, sectors, n: int) -> Optional[np.ndarray]:
+        """(n, len(agent_names)) learned weights, 1.0 for agents the learner doesn't know; None without a learner."""
+        if self.learner is None:
+            return None
+        cols = self.learner.columns(agent_names)
+        w = self.learner.matrix(sectors, n=n)[:, np.maximum(cols, 0)]
+        return np.where(cols >= 0, w, 1.0)
 
-    def combine(self, all_decisions: Dict[str, List[tuple[str, Decision]]]) -> Dict[str, Decision]:
+    @metrics.timed("combine")
+    def combine(
+        self, all_decisions: Dict[str, List[tuple[str, Decision]]], sectors: Optional[Mapping[str, str]] = None
+    ) -> Dict[str, Decision]:
         final: Dict[str, Decision] = {}
         for sym, decs in all_decisions.items():
             agg = 0.0
             notes = []
-            for agent_name, d in decs:
+            names = [agent_name for agent_name, _ in decs]
+            sector = (sectors or {}).get(sym)
+            learned = self._learned(names, None if sector is None else [sector], 1)
+            for j, (agent_name, d) in enumerate(decs):
                 w = float(self.weights.get(agent_name, 1.0))
-                vote = 1.0 if d.action == Action.BUY else (-1.0 if d.action == Action.SELL else 0.0)
-                agg += w * vote * float(d.confidence)
-                notes.append(f"{agent_name}:{d.action.name}({d.confidence:.2f})")
+                if learned is not None:
+                    w *= float(learned[0, j])
+                agg += w * d.action.code * float(d.confidence)
+                notes.append((_vote_reason(agent_name, d.action), float(d.confidence)))
 
             if agg > self.buy_thresh:
                 action = Action.BUY
@@ -53,6 +90,45 @@ class OversightAgent:
                 action=action,
                 confidence=min(1.0, abs(agg)),
                 score=agg,
-                rationale="; ".join(notes),
+                reasons=tuple(notes),
             )
         return final
+
+    @metrics.timed("combine")
+    def combine_batch(
+        self, batches: Dict[str, DecisionBatch], sectors: Optional[Mapping[str, str]] = None
+    ) -> DecisionBatch:
+        """
+        Vectorized combine(): one DecisionBatch per agent name in, one combined
+        batch out, over the union of symbols (first-seen order). `sectors`
+        (symbol -> sector, e.g. the fundamentals' sector column) picks the
+        learner's per-sector weights.
+        """
+        import pandas as pd
+        symbols = pd.Index(
+            np.concatenate([b.symbols for b in batches.values()]) if batches else [], dtype=object
+        ).unique()
+        n, k = len(symbols), len(batches)
+        agg = np.zeros(n)
+        codes = np.full((n, k), -1, dtype=np.int16)
+        args = np.full((n, k), np.nan)
+        symbol_sectors = None
+        if sectors is not None:
+            sectors = sectors if isinstance(sectors, pd.Series) else pd.Series(sectors)
+            symbol_sectors = (sectors if sectors.index.equals(symbols) else sectors.reindex(symbols)).to_numpy(dtype=object)
+        learned = self._learned(list(batches), symbol_sectors, n)
+        for j, (agent_name, batch) in enumerate(batches.items()):
+            present, actions, confidence, _ = batch.align(symbols)
+            w = float(self.weights.get(agent_name, 1.0))
+            if learned is not None:
+                w = w * learned[:, j]
+            agg += w * actions * confidence
+            # reason code lookup by action code (-1, 0, 1) -> index 0..2
+            by_action = np.array([_vote_reason(agent_name, Action.from_code(c)) for c in (-1, 0, 1)])
+            codes[:, j] = np.where(present, by_action[actions + 1], -1)
+            args[:, j] = np.where(present, confidence, np.nan)
+
+        actions = np.select(
+            [agg > self.buy_thresh, agg < self.sell_thresh], [Action.BUY.code, Action.SELL.code], Action.HOLD.code
+        )
+        return DecisionBatch(symbols, actions, np.minimum(1.0, np.abs(agg)), agg, codes, args)
@@ -0,0 +1,151 @@
+# src/agent_lab/metrics.py
+"""
+In-process instrumentation for the hot paths.
+
+    with span("fetch", source="finnhub"):      # time a stage
+        ...
+    inc("cache_requests_total", cache="prices", result="hit")
+    set_gauge("cache_bytes", 1234, cache="prices")
+
+Spans accumulate count / total / max seconds per (stage, labels); counters are
+plain totals and gauges the last value set. render_prometheus() gives the
+Prometheus text format served at /metrics, summary() a dict for structured logs
+(the CLI's --metrics flag).
+Everything is process-local and thread-safe.
+"""
+from __future__ import annotations
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Tuple
+
+PREFIX = "agent_lab"
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_Key, float] = {}
+_spans: Dict[_Key, list] = {}  # key -> [count, total_seconds, max_seconds]
+_gauges: Dict[_Key, float] = {}
+
+def _key(name: str, labels: dict) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    """Add `value` to counter `name` (a *_total name by convention)."""
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0.0) + value
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set gauge `name` (a current level such as bytes in use) to `value`."""
+    k = _key(name, labels)
+    with _lock:
+        _gauges[k] = float(value)
+
+def observe(stage: str, seconds: float, **labels) -> None:
+    """Record one timed occurrence of `stage`."""
+    k = _key(stage, labels)
+    with _lock:
+        s = _spans.get(k)
+        if s is None:
+            _spans[k] = [1, seconds, seconds]
+        else:
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+
+@contextmanager
+def span(stage: str, **labels):
+    """Time the enclosed block as `stage` (recorded even if it raises)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - t0, **labels)
+
+def timed(stage: str, **labels):
+    """Decorator form of span()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _spans.clear()
+        _gauges.clear()
+
+def _fmt_labels(labels: Tuple[Tuple[str, str], ...], extra: dict | None = None) -> str:
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+def render_prometheus() -> str:
+    """All counters, gauges and spans in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        spans = {k: list(v) for k, v in _spans.items()}
+
+    lines = []
+    for kind, values in (("counter", counters), ("gauge", gauges)):
+        by_name: Dict[str, list] = {}
+        for (name, labels), value in values.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for name in sorted(by_name):
+            metric = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in sorted(by_name[name]):
+                lines.append(f"{metric}{_fmt_labels(labels)} {value:g}")
+
+    if spans:
+        metric = f"{PREFIX}_stage_seconds"
+        lines.append(f"# HELP {metric} Time spent per hot-path stage.")
+        lines.append(f"# TYPE {metric} summary")
+        for (stage, labels), (count, total, _) in sorted(spans.items()):
+            lab = _fmt_labels((("stage", stage),) + labels)
+            lines.append(f"{metric}_count{lab} {count}")
+            lines.append(f"{metric}_sum{lab} {total:.6f}")
+        lines.append(f"# TYPE {metric}_max gauge")
+        for (stage, labels), (_, _, mx) in sorted(spans.items()):
+            lines.append(f"{metric}_max{_fmt_labels((('stage', stage),) + labels)} {mx:.6f}")
+    return "\n".join(lines) + "\n"
+
+def _label_str(name: str, labels) -> str:
+    return name + ("[" + ",".join(f"{k}={v}" for k, v in labels) + "]" if labels else "")
+
+def summary() -> dict:
+    """{"stages": {stage[labels]: {count, total_s, mean_ms, max_ms}}, "counters": {...}, "gauges": {...}}"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        spans = {k: list(v) for k, v in _spans.items()}
+    return {
+        "stages": {
+            _label_str(stage, labels): {
+                "count": count,
+                "total_s": round(total, 6),
+                "mean_ms": round(1000 * total / count, 3),
+                "max_ms": round(1000 * mx, 3),
+            }
+            for (stage, labels), (count, total, mx) in sorted(spans.items(), key=lambda kv: -kv[1][1])
+        },
+        "counters": {_label_str(name, labels): v for (name, labels), v in sorted(counters.items())},
+        "gauges": {_label_str(name, labels): v for (name, labels), v in sorted(gauges.items())},
+    }
+
+def log_summary(stream=None, **context) -> None:
+    """Write summary() (plus `context`, e.g. the command) as one JSON line, to stderr by default."""
+    record = {"event": "metrics", **context, **summary()}
+    print(json.dumps(record), file=stream or sys.stderr)
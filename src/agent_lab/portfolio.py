@@ -0,0 +1,217 @@
+# src/agent_lab/portfolio.py
+"""
+Portfolio construction: target weights from agent decisions, for many dates at once.
+
+    w = target_weights("score", signal, eligible, cap=0.1)              # (dates, symbols)
+    w = target_weights("risk_parity", signal, eligible, risk=risk_model(prices))
+
+`signal` is confidence * score per date and symbol and `eligible` marks what
+may be held (BUY decisions on priced symbols); everything else gets weight 0.
+Weights are fractions of portfolio value, each at most `cap`, and add up to
+min(1, cap * eligible count), so cash is only left over when the cap forces it.
+
+  legacy         confidence * score / sum, then clipped at `cap`; the clipped
+                 excess stays in cash (the engine's original rule)
+  equal          1/n over the eligible symbols
+  score          confidence * score, projected onto the capped simplex
+  inverse_vol    1 / trailing volatility
+  risk_parity    equal risk contributions
+  mean_variance  Σ⁻¹ (confidence * score), long-only
+
+The last two use a single-index covariance (market beta plus idiosyncratic
+variance, from risk_model()), which Sherman-Morrison makes O(symbols) per date.
+Every method works on whole (dates, symbols) arrays: no per-date loop.
+"""
+from __future__ import annotations
+import warnings
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    # the CLI's parser reads METHODS; allocation() imports pandas when it needs it
+    import pandas as pd
+
+DEFAULT_METHOD = "score"
+DEFAULT_CAP = 0.1           # max weight per position
+DEFAULT_LOOKBACK = 63       # trading days behind the risk model
+_MIN_PERIODS = 20
+_BISECT_STEPS = 50
+_RP_STEPS = 20
+
+@dataclass
+class RiskModel:
+    """Trailing single-index risk per date: Σ = market_var * beta betaᵀ + diag(idio_var)."""
+    vol: np.ndarray          # (dates, symbols) total volatility
+    beta: np.ndarray         # (dates, symbols)
+    idio_var: np.ndarray     # (dates, symbols)
+    market_var: np.ndarray   # (dates,)
+
+    def rows(self, idx) -> "RiskModel":
+        return RiskModel(self.vol[idx], self.beta[idx], self.idio_var[idx], self.market_var[idx])
+
+def risk_model(prices: pd.DataFrame, lookback: int = DEFAULT_LOOKBACK) -> RiskModel:
+    """
+    RiskModel for every date of a dates x symbols price panel, from daily returns
+    up to and including that date. The market is the equal-weighted average
+    return. Symbols without `_MIN_PERIODS` returns yet get the date's median
+    volatility and no market exposure.
+    """
+    rets = prices.astype(np.float64).pct_change(fill_method=None)
+    market = rets.mean(axis=1)
+    roll = dict(window=lookback, min_periods=min(_MIN_PERIODS, lookback))
+    var = rets.rolling(**roll).var().to_numpy()
+    market_var = market.rolling(**roll).var().to_numpy()
+    mean_r = rets.rolling(**roll).mean()
+    mean_m = market.rolling(**roll).mean()
+    n = rets.notna().rolling(**roll).sum()
+    cov = (rets.mul(market, axis=0).rolling(**roll).mean() - mean_r.mul(mean_m, axis=0)) * n / (n - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = cov.to_numpy() / market_var[:, None]
+
+    known = np.isfinite(var) & (var > 0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # dates where nothing has history yet
+        median = np.nanmedian(np.where(known, var, np.nan), axis=1, keepdims=True)
+    median = np.where(np.isnan(median), 1.0, median)
+    var = np.where(known, var, median)
+    beta = np.where(known & np.isfinite(beta), beta, 0.0)
+    market_var = np.nan_to_num(market_var)
+    # keep at least a tenth of each name's variance idiosyncratic, so Σ stays well conditioned
+    idio = np.maximum(var - beta**2 * market_var[:, None], 0.1 * var)
+    return RiskModel(np.sqrt(var), beta, idio, market_var)
+
+def project_capped_simplex(v: np.ndarray, eligible: np.ndarray, total: np.ndarray, cap: float) -> np.ndarray:
+    """
+    Euclidean projection of each row of `v` onto {w : 0 <= w <= cap, sum w = total},
+    over the eligible entries (the rest are 0). That is w = clip(v - tau, 0, cap)
+    with tau found per row by bisection, then solved exactly on the free entries.
+    """
+    v = np.where(eligible, v, -np.inf)
+    has = eligible.any(axis=1)
+    lo = np.where(has, np.where(eligible, v, np.inf).min(axis=1, initial=np.inf) - cap, 0.0)
+    hi = np.where(has, v.max(axis=1, initial=-np.inf), 0.0)
+    for _ in range(_BISECT_STEPS):
+        tau = 0.5 * (lo + hi)
+        over = np.clip(v - tau[:, None], 0.0, cap).sum(axis=1) > total
+        lo = np.where(over, tau, lo)
+        hi = np.where(over, hi, tau)
+    w = np.clip(v - hi[:, None], 0.0, cap)
+    # exact tau over the entries strictly between the bounds
+    free = (w > 0) & (w < cap)
+    n_free = free.sum(axis=1)
+    capped = (w >= cap).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = (np.where(free, v, 0.0).sum(axis=1) + cap * capped - total) / n_free
+    tau = np.where(n_free > 0, tau, hi)
+    return np.where(has[:, None], np.clip(v - tau[:, None], 0.0, cap), 0.0)
+
+def _proportional(v: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+    """Rows of v >= 0 scaled to sum to 1 over the eligible entries; 1/n where they are all 0."""
+    v = np.where(eligible, np.maximum(v, 0.0), 0.0)
+    s = v.sum(axis=1, keepdims=True)
+    n = eligible.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(s > 0, v / s, np.where(eligible, 1.0 / n, 0.0))
+
+def _risk_times(risk: RiskModel, w: np.ndarray) -> np.ndarray:
+    """Σ w per row, for the single-index Σ."""
+    return risk.beta * (risk.market_var * (risk.beta * w).sum(axis=1))[:, None] + risk.idio_var * w
+
+def _legacy(signal, eligible, cap, risk):
+    v = np.where(eligible, np.maximum(signal, 0.0), 0.0)
+    s = v.sum(axis=1, keepdims=True)
+    return np.minimum(v / np.where(s > 0, s, 1.0), cap)
+
+def _equal(signal, eligible, cap, risk):
+    return eligible.astype(np.float64)
+
+def _score(signal, eligible, cap, risk):
+    return _proportional(signal, eligible)
+
+def _inverse_vol(signal, eligible, cap, risk):
+    return 1.0 / risk.vol
+
+def _risk_parity(signal, eligible, cap, risk):
+    # Newton on min ½ xᵀΣx - Σ b log x (equal budgets b), whose minimizer has equal
+    # risk contributions x_i (Σx)_i; the Hessian Σ + diag(b / x²) is diagonal plus
+    # rank one, so each step is O(symbols) by Sherman-Morrison
+    n = np.maximum(eligible.sum(axis=1, keepdims=True), 1)
+    b = eligible / n
+    beta = np.where(eligible, risk.beta, 0.0)
+    mv = risk.market_var[:, None]
+    x = _proportional(1.0 / risk.vol, eligible)
+    x /= np.sqrt(np.maximum((x * _risk_times(risk, x)).sum(axis=1, keepdims=True), 1e-300))
+    x = np.where(eligible, x, 1.0)
+    for _ in range(_RP_STEPS):
+        grad = np.where(eligible, _risk_times(risk, np.where(eligible, x, 0.0)) - b / x, 0.0)
+        d = risk.idio_var + b / x**2
+        step = grad / d - beta / d * (mv * (beta * grad / d).sum(axis=1, keepdims=True)
+                                      / (1.0 + mv * (beta**2 / d).sum(axis=1, keepdims=True)))
+        # damped so x stays positive
+        with np.errstate(invalid="ignore", divide="ignore"):
+            limit = np.where(step > 0, 0.9 * x / step, np.inf).min(axis=1, keepdims=True)
+        x = x - np.minimum(1.0, limit) * step
+    return np.where(eligible, x, 0.0)
+
+def _mean_variance(signal, eligible, cap, risk):
+    # Σ⁻¹ mu over the eligible block, by Sherman-Morrison on the single-index Σ
+    mu = np.where(eligible, np.maximum(signal, 0.0), 0.0)
+    beta = np.where(eligible, risk.beta, 0.0)
+    d_mu, d_beta = mu / risk.idio_var, beta / risk.idio_var
+    k = risk.market_var * (beta * d_mu).sum(axis=1) / (1.0 + risk.market_var * (beta * d_beta).sum(axis=1))
+    return np.maximum(d_mu - d_beta * k[:, None], 0.0)
+
+METHODS: Dict[str, Callable] = {
+    "legacy": _legacy,
+    "equal": _equal,
+    "score": _score,
+    "inverse_vol": _inverse_vol,
+    "risk_parity": _risk_parity,
+    "mean_variance": _mean_variance,
+}
+NEEDS_RISK = {"inverse_vol", "risk_parity", "mean_variance"}
+
+def target_weights(
+    method: str,
+    signal: np.ndarray,
+    eligible: np.ndarray,
+    cap: float = DEFAULT_CAP,
+    risk: Optional[RiskModel] = None,
+) -> np.ndarray:
+    """(dates, symbols) weights by `method` (see module docstring); 1-D inputs give one row."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown portfolio method {method!r}; choose from {sorted(METHODS)}")
+    if method in NEEDS_RISK and risk is None:
+        raise ValueError(f"Portfolio method {method!r} needs a risk model")
+    signal = np.asarray(signal, dtype=np.float64)
+    single = signal.ndim == 1
+    signal, eligible = np.atleast_2d(signal), np.atleast_2d(np.asarray(eligible, dtype=bool))
+    if risk is not None and single:
+        risk = risk.rows(slice(-1, None))
+    raw = METHODS[method](signal, eligible, cap, risk)
+    if method == "legacy":
+        w = raw
+    else:
+        total = np.minimum(1.0, cap * eligible.sum(axis=1))
+        w = project_capped_simplex(_proportional(raw, eligible), eligible, total, cap)
+    return w[0] if single else w
+
+def allocation(decisions, method: str = DEFAULT_METHOD, cap: float = DEFAULT_CAP,
+               prices: Optional[pd.DataFrame] = None) -> pd.Series:
+    """
+    Weights for one set of decisions (a DecisionBatch or {symbol: Decision}),
+    indexed by symbol; only BUY decisions get weight. The risk-based methods
+    need `prices` (dates x symbols) for their risk model.
+    """
+    import pandas as pd
+    from agent_lab.agents.base import Action, DecisionBatch
+    batch = DecisionBatch.coerce(decisions)
+    symbols = list(map(str, batch.symbols))
+    risk = None
+    if method in NEEDS_RISK:
+        if prices is None:
+            raise ValueError(f"Portfolio method {method!r} needs prices")
+        risk = risk_model(prices.reindex(columns=symbols))
+    w = target_weights(method, batch.confidence * batch.score, batch.actions == Action.BUY.code, cap, risk)
+    return pd.Series(w, index=pd.Index(symbols, name="symbol"), name="weight")
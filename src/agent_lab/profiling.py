@@ -0,0 +1,268 @@
+# src/agent_lab/profiling.py
+"""
+Opt-in profiling of a single run.
+
+    with profiled("backtest") as prof:        # or profiled("backtest", mode="sample")
+        engine.run(...)
+    print(prof.path, prof.summary)
+
+mode="cprofile" writes a .prof file (pstats / snakeviz) and keeps a text summary
+of the top functions by cumulative time; mode="sample" samples the calling
+thread's stack every few milliseconds and writes collapsed stacks (.folded) that
+flamegraph.pl and speedscope read directly. When disabled, profiled() yields
+None and costs nothing.
+
+API requests are profiled where their work runs: work a request hands to a
+thread pool (ScoringService's scoring jobs) goes through run_profiled(), which
+profiles the job in its worker thread and attaches the result to the request
+(see install_request_profiling).
+
+Files go to AGENT_LAB_PROFILE_DIR (default results/profiles).
+"""
+from __future__ import annotations
+import argparse
+import contextvars
+import io
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+PROFILE_DIR = os.getenv("AGENT_LAB_PROFILE_DIR", "results/profiles")
+MODES = ("cprofile", "sample")
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+_seq = itertools.count()
+
+@dataclass
+class Profile:
+    name: str
+    mode: str
+    path: Optional[str] = None
+    summary: str = ""
+    seconds: float = 0.0
+    folded: Counter = field(default_factory=Counter)
+
+def normalize_mode(value) -> Optional[str]:
+    """Map flag values (True, '1', 'cprofile', 'sample', None/False/'0') to a mode or None."""
+    if value in (None, False, "", "0", "false", "off", "no"):
+        return None
+    if value in (True, "1", "true", "on", "yes"):
+        return "cprofile"
+    if value not in MODES:
+        raise ValueError(f"Unknown profile mode {value!r}; expected one of {MODES}")
+    return value
+
+def _out_path(name: str, ext: str, out_dir: Optional[str]) -> str:
+    out_dir = out_dir or PROFILE_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(out_dir, f"{safe}-{stamp}-{os.getpid()}-{next(_seq)}.{ext}")
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread; counts collapsed stacks."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._sample, name="agent-lab-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+def folded_text(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+def _folded_summary(stacks: Counter, limit: int) -> str:
+    """Top leaf frames by sample count (self time)."""
+    total = sum(stacks.values()) or 1
+    leaves: Counter = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    lines = [f"{total} samples"]
+    lines += [f"{100 * c / total:6.1f}%  {leaf}" for leaf, c in leaves.most_common(limit)]
+    return "\n".join(lines)
+
+@contextmanager
+def profiled(name: str, mode="cprofile", out_dir: Optional[str] = None, limit: int = 30,
+             interval: float = DEFAULT_SAMPLE_INTERVAL):
+    """
+    Profile the enclosed block (see module docstring). `mode` may also be any
+    flag value accepted by normalize_mode(); a falsy one disables profiling.
+    """
+    mode = normalize_mode(mode)
+    if mode is None:
+        yield None
+        return
+
+    prof = Profile(name=name, mode=mode)
+    t0 = time.perf_counter()
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield prof
+        finally:
+            profiler.disable()
+            prof.seconds = time.perf_counter() - t0
+            prof.path = _out_path(name, "prof", out_dir)
+            profiler.dump_stats(prof.path)
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(limit)
+            prof.summary = buf.getvalue()
+    else:
+        sampler = StackSampler(interval=interval).start()
+        try:
+            yield prof
+        finally:
+            _write_folded(prof, sampler.stop(), time.perf_counter() - t0, out_dir, limit)
+
+def _write_folded(prof: Profile, stacks: Counter, seconds: float, out_dir: Optional[str], limit: int) -> None:
+    prof.folded = stacks
+    prof.seconds = seconds
+    prof.path = _out_path(prof.name, "folded", out_dir)
+    with open(prof.path, "w") as f:
+        f.write(folded_text(stacks))
+    prof.summary = _folded_summary(stacks, limit)
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", action="store_true", help=f"profile this run and write the result to {PROFILE_DIR}")
+    parser.add_argument("--profile-mode", choices=MODES, default="cprofile", help="profiler used by --profile")
+
+def profile_mode(args: argparse.Namespace) -> Optional[str]:
+    """The mode requested by add_profile_argument()'s flags, or None."""
+    return args.profile_mode if getattr(args, "profile", False) else None
+
+def report(prof: Optional[Profile], stream=None) -> None:
+    if prof is not None:
+        print(f"[profile] {prof.name}: {prof.seconds:.2f}s, written to {prof.path}", file=stream or sys.stderr)
+
+def run_script(main: Callable[[], object], name: str, argv=None):
+    """`python -m agent_lab.scripts.X [--profile [--profile-mode sample]]`: run main(), optionally profiled."""
+    parser = argparse.ArgumentParser(prog=name)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    with profiled(name, profile_mode(args)) as prof:
+        result = main()
+    report(prof)
+    return result
+
+@dataclass
+class RequestProfiles:
+    """Profiles of the thread-pool work one API request asked for (see install_request_profiling)."""
+    mode: str
+    profiles: List[Profile] = field(default_factory=list)
+
+_request_profiles: contextvars.ContextVar[Optional[RequestProfiles]] = contextvars.ContextVar(
+    "agent_lab_request_profiles", default=None
+)
+
+def request_profiles() -> Optional[RequestProfiles]:
+    """The collector of the API request being handled, if it asked to be profiled; capture it before handing work off."""
+    return _request_profiles.get()
+
+def run_profiled(requests: Sequence[RequestProfiles], name: str, fn: Callable, *args):
+    """
+    fn(*args), profiled in the calling (worker) thread when any of `requests`
+    asked for it; each of them gets the profile. Without requests it just runs.
+    """
+    if not requests:
+        return fn(*args)
+    with profiled(name, requests[0].mode) as prof:
+        result = fn(*args)
+    for r in requests:
+        r.profiles.append(prof)
+    return result
+
+def install_request_profiling(app, enabled: Optional[bool] = None) -> None:
+    """
+    Let API callers profile one request with an `X-Profile: cprofile|sample`
+    header or a `?profile=...` query flag. The response names the files in
+    X-Profile-File (comma-separated), downloadable from GET /profiles/{file}.
+    Only active when `enabled` or AGENT_LAB_PROFILING=1, since profiles expose
+    code internals.
+
+    What is profiled is the thread-pool work the request hands off through
+    run_profiled(), in the worker thread that does it: the scoring jobs, where
+    an API request spends its time. Wrapping the request's `await` instead
+    would time every other coroutine on the event loop and miss the pool. A
+    request that hands nothing off is, in sample mode only, sampled on the
+    event loop thread (which includes whatever else the loop ran meanwhile);
+    in cprofile mode it gets no profile.
+    """
+    if enabled is None:
+        enabled = normalize_mode(os.getenv("AGENT_LAB_PROFILING")) is not None
+    if not enabled:
+        return
+    from fastapi import HTTPException
+    from fastapi.responses import FileResponse
+    busy = threading.Lock()  # one profiled request at a time; others run unprofiled
+
+    @app.middleware("http")
+    async def _profile_request(request, call_next):
+        flag = request.headers.get("x-profile") or request.query_params.get("profile")
+        if not flag or not busy.acquire(blocking=False):
+            return await call_next(request)
+        try:
+            mode = normalize_mode(flag)
+        except ValueError:
+            mode = None
+        if mode is None:
+            busy.release()
+            return await call_next(request)
+        name = "api" + request.url.path.replace("/", "-")
+        collector = RequestProfiles(mode)
+        token = _request_profiles.set(collector)
+        sampler = StackSampler().start() if mode == "sample" else None
+        t0 = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _request_profiles.reset(token)
+            stacks = sampler.stop() if sampler is not None else None
+            busy.release()
+        profiles = collector.profiles
+        if not profiles and stacks:
+            loop_profile = Profile(name=name, mode=mode)
+            _write_folded(loop_profile, stacks, time.perf_counter() - t0, None, 30)
+            profiles = [loop_profile]
+        if profiles:
+            response.headers["X-Profile-File"] = ",".join(os.path.basename(p.path) for p in profiles)
+            response.headers["X-Profile-Seconds"] = f"{sum(p.seconds for p in profiles):.3f}"
+        return response
+
+    @app.get("/profiles/{filename}")
+    async def download_profile(filename: str):
+        path = os.path.join(PROFILE_DIR, os.path.basename(filename))
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="profile not found")
+        return FileResponse(path, filename=os.path.basename(path))
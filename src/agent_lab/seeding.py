@@ -0,0 +1,46 @@
+# src/agent_lab/seeding.py
+"""
+Deterministic randomness. Anything random in agents or the engine draws from
+here, keyed by an explicit seed, so a decision is a pure function of
+(agent config, inputs, seed) and results can be cached by content hash.
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import zlib
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+
+DEFAULT_SEED = 0
+
+def _key_int(key) -> int:
+    return zlib.crc32(str(key).encode())
+
+def make_rng(seed: int = DEFAULT_SEED, *keys) -> np.random.Generator:
+    """Generator for `seed`, optionally split into an independent stream per key (e.g. agent name)."""
+    return np.random.default_rng(np.random.SeedSequence([int(seed), *map(_key_int, keys)]))
+
+@lru_cache(maxsize=65536)
+def unit_hash(seed: int, key: str) -> float:
+    """Stable uniform draw in [0, 1) for (seed, key), independent of call order."""
+    digest = hashlib.blake2b(f"{seed}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2**64
+
+def unit_hash_array(seed: int, keys: Iterable[str]) -> np.ndarray:
+    return np.fromiter((unit_hash(seed, str(k)) for k in keys), dtype=np.float64)
+
+def with_seed(agent, seed: int):
+    """
+    Copy of `agent` drawing from `seed`. Ensembles are reseeded member by member;
+    agents without randomness are returned unchanged.
+    """
+    members = getattr(agent, "agents", None)
+    if not hasattr(agent, "seed") and not members:
+        return agent
+    clone = copy.copy(agent)
+    if hasattr(agent, "seed"):
+        clone.seed = seed
+    if members:
+        clone.agents = [with_seed(a, seed) for a in members]
+    return clone
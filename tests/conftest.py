@@ -0,0 +1,68 @@
+# tests/conftest.py
+"""Shared fixtures: a small SyntheticSource market, so every test runs offline and deterministically."""
+import numpy as np
+import pandas as pd
+import pytest
+from agent_lab.agents.base import DecisionBatch
+from agent_lab.data_connectors.normalize import normalize_frame
+from agent_lab.data_connectors.sources import SyntheticSource
+
+@pytest.fixture(scope="session")
+def source() -> SyntheticSource:
+    return SyntheticSource(n_symbols=20, years=1)
+
+@pytest.fixture(scope="session")
+def prices(source) -> pd.DataFrame:
+    """Adj Close panel, dates x symbols, without gaps."""
+    return pd.DataFrame({s: source.price_history(s)["Adj Close"] for s in source.universe()})
+
+@pytest.fixture(scope="session")
+def fundamentals(source) -> pd.DataFrame:
+    raws = {
+        s: {
+            "profile": source.company_profile2(s),
+            "ratios": source.company_basic_financials(s),
+            "insider": source.stock_insider_transactions(s)["data"],
+        }
+        for s in source.universe()
+    }
+    return normalize_frame(raws, as_of=source.as_of)
+
+def random_decider(symbols, seed: int = 0, p=(0.2, 0.3, 0.5)):
+    """A daily_decider with different SELL / HOLD / BUY decisions (probabilities `p`) every date, fixed by the date."""
+    symbols = list(symbols)
+
+    def decide(dt) -> DecisionBatch:
+        rng = np.random.default_rng([seed, pd.Timestamp(dt).value])
+        n = len(symbols)
+        return DecisionBatch(symbols, rng.choice([-1, 0, 1], n, p=p), rng.uniform(0.3, 1.0, n),
+                             rng.uniform(0.0, 4.0, n))
+    return decide
+
+class LiveLikeSource(SyntheticSource):
+    """
+    A synthetic market the connectors treat like the live source (disk caches,
+    the warmer), counting fundamentals fetches; symbols in `failing` raise.
+    """
+    persistent = True
+
+    def __init__(self, name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.key = f"live-like:{name}"
+        self.failing = set()
+        self.fetches = {}
+
+    def company_basic_financials(self, symbol, metric="all"):
+        self.fetches[symbol] = self.fetches.get(symbol, 0) + 1
+        if symbol in self.failing:
+            raise ConnectionError(f"{symbol} unavailable")
+        return super().company_basic_financials(symbol, metric)
+
+@pytest.fixture
+def live_like(request, tmp_path, monkeypatch):
+    """A LiveLikeSource as the active data source, with the disk caches under tmp_path."""
+    from agent_lab.data_connectors.sources import use_data_source
+    monkeypatch.chdir(tmp_path)
+    source = LiveLikeSource(request.node.name, n_symbols=5, years=1)
+    with use_data_source(source):
+        yield source
@@ -0,0 +1,43 @@
+# tests/test_api.py
+import pytest
+from fastapi.testclient import TestClient
+from agent_lab.data_connectors.normalize import COLUMNS
+from agent_lab.data_connectors.sources import SyntheticSource, use_data_source
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("AGENT_LAB_WARM_CACHE", "0")
+    monkeypatch.chdir(tmp_path)     # /generate writes its CSVs to the working directory
+    from agent_lab.api import main
+
+    async def rationale(metrics, action):
+        return f"{action} on {len(metrics)} metrics"
+
+    monkeypatch.setattr(main, "generate_gemini_rationale", rationale)
+    with use_data_source(SyntheticSource(n_symbols=5, years=1)), TestClient(main.app) as client:
+        yield client
+
+def test_generate_rows(client):
+    universe = ["SYN0000", "SYN0001", "NOPE"]
+    body = client.post("/generate", json={"agent": "buffett", "universe": universe}).json()
+    rows = body["selected_results"]
+    assert [r["symbol"] for r in rows] == universe
+    assert [r["symbol"] for r in body["oversight_results"]] == universe
+
+    # the frontend's ResultsTable reads "Company"; the other schema columns keep their names
+    expected = ["symbol", "Company", *COLUMNS[1:], "action", "confidence", "score", "rationale"]
+    for row in rows[:2]:
+        assert list(row) == expected
+        assert row["Company"]
+    # a ticker without data is held, with no fundamentals columns
+    assert list(rows[2]) == ["symbol", "action", "confidence", "score", "rationale"]
+    assert rows[2]["action"] == "HOLD"
+
+def test_metrics_endpoint_reports_request_stages(client):
+    client.post("/generate", json={"agent": "ackman", "universe": ["SYN0002"], "include_oversight": False})
+    res = client.get("/metrics")
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = res.text.splitlines()
+    for stage in ('stage="fetch",what="fundamentals"', 'stage="rationale"', 'stage="serialize",what="csv"'):
+        assert any(line.startswith(f"agent_lab_stage_seconds_count{{{stage}}}") for line in lines), stage
+    assert "# TYPE agent_lab_cache_requests_total counter" in lines
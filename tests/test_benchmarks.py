@@ -0,0 +1,41 @@
+# tests/test_benchmarks.py
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def test_every_benchmark_runs_at_its_smallest_scale(tmp_path):
+    # each time_* / peakmem_* once, at the first value of every parameter: catches benchmarks that no longer run
+    code = textwrap.dedent("""
+        import importlib, inspect, pkgutil, sys
+        import benchmarks
+        ran = []
+        for info in pkgutil.iter_modules(benchmarks.__path__):
+            if not info.name.startswith("bench_"):
+                continue
+            module = importlib.import_module(f"benchmarks.{info.name}")
+            for _, cls in inspect.getmembers(module, inspect.isclass):
+                if cls.__module__ != module.__name__:
+                    continue
+                params = list(getattr(cls, "params", []))
+                if params and not isinstance(params[0], (list, tuple)):
+                    params = [params]
+                args = [p[0] for p in params]
+                for name in sorted(n for n in dir(cls) if n.startswith(("time_", "peakmem_"))):
+                    bench = cls()
+                    getattr(bench, "setup", lambda *a: None)(*args)
+                    try:
+                        getattr(bench, name)(*args)
+                    finally:
+                        getattr(bench, "teardown", lambda *a: None)(*args)
+                    ran.append(f"{cls.__name__}.{name}")
+        print(len(ran))
+    """)
+    env = {**os.environ, "AGENT_LAB_WARM_CACHE": "0", "PYTHONPATH": str(ROOT)}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=tmp_path, env=env)
+    assert out.returncode == 0, out.stderr
+    assert int(out.stdout.split()[-1]) >= 10
+    assert os.listdir(tmp_path) == []
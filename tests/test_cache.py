@@ -0,0 +1,96 @@
+# tests/test_cache.py
+import threading
+import time
+import types
+import pytest
+from agent_lab.data_connectors import cache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """The fundamentals cache's clock, moved by hand."""
+    now = [time.time()]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+@pytest.fixture
+def gate(live_like, monkeypatch):
+    """Holds fundamentals fetches until set; returns (release event, list of threads that fetched)."""
+    release, threads = threading.Event(), []
+    fetch = live_like.company_basic_financials
+
+    def held(symbol, metric="all"):
+        threads.append(threading.current_thread().name)
+        assert release.wait(5)
+        return fetch(symbol, metric)
+    monkeypatch.setattr(live_like, "company_basic_financials", held)
+    return release, threads
+
+def _wait_until(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+def test_stale_entries_are_served_while_one_background_fetch_revalidates(live_like, clock, gate):
+    release, threads = gate
+    sym = live_like.universe()[0]
+    release.set()
+    row = cache.get_fundamentals(sym)
+    assert cache.fundamentals_state(sym) == cache.FRESH and live_like.fetches == {sym: 1}
+
+    release.clear()
+    clock[0] += cache._CACHE_TTL + 1
+    assert cache.fundamentals_state(sym) == cache.STALE
+    # every reader gets the stale row right away; only one fetch is started, off the caller's thread
+    assert [cache.get_fundamentals(sym) for _ in range(5)] == [row] * 5
+    _wait_until(lambda: len(threads) == 2)
+    assert cache.fundamentals_state(sym) == cache.REFRESHING
+    assert threads[-1].startswith("agent-lab-revalidate")
+    release.set()
+    _wait_until(lambda: cache.fundamentals_state(sym) == cache.FRESH)
+    assert live_like.fetches == {sym: 2}
+    assert cache.fundamentals_age(sym) == 0.0 and cache.get_fundamentals(sym) == row
+
+def test_failed_revalidation_keeps_the_old_row_until_the_negative_ttl(live_like, clock):
+    sym = live_like.universe()[0]
+    row = cache.get_fundamentals(sym)
+    live_like.failing.add(sym)
+    clock[0] += cache._CACHE_TTL + 1
+    assert cache.get_fundamentals(sym) == row
+    _wait_until(lambda: cache.fundamentals_failed_recently(sym))
+    assert cache.fundamentals_state(sym) == cache.STALE and live_like.fetches == {sym: 2}
+
+    for _ in range(3):
+        assert cache.get_fundamentals(sym) == row
+    assert live_like.fetches == {sym: 2}
+    live_like.failing.clear()
+    clock[0] += cache._NEGATIVE_TTL
+    assert cache.get_fundamentals(sym) == row
+    _wait_until(lambda: cache.fundamentals_state(sym) == cache.FRESH)
+    assert live_like.fetches == {sym: 3}
+
+def test_failed_symbols_are_negatively_cached(live_like, clock):
+    sym = live_like.universe()[1]
+    live_like.failing.add(sym)
+    assert cache.get_fundamentals(sym) is None
+    assert cache.fundamentals_state(sym) == cache.FAILED
+    assert cache.get_fundamentals(sym) is None and cache.get_raw_fundamentals(sym) is None
+    assert live_like.fetches == {sym: 1}
+    with pytest.raises(RuntimeError, match="unavailable"):
+        cache.refresh_fundamentals(sym)
+    assert live_like.fetches == {sym: 2}
+
+    live_like.failing.clear()
+    clock[0] += cache._NEGATIVE_TTL
+    assert cache.get_fundamentals(sym)["symbol"] == sym
+    assert cache.fundamentals_state(sym) == cache.FRESH and live_like.fetches == {sym: 3}
+
+def test_offline_serves_any_age_and_never_fetches(live_like, clock, monkeypatch):
+    cached, missing = live_like.universe()[:2]
+    row = cache.get_fundamentals(cached)
+    cache.clear_cache()     # a new process: the entry is on disk only
+    monkeypatch.setenv("AGENT_LAB_OFFLINE", "1")
+    clock[0] += 10 * cache._CACHE_TTL
+    assert cache.get_fundamentals(cached) == row
+    assert cache.get_fundamentals(missing) is None
+    assert live_like.fetches == {cached: 1}
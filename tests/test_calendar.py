@@ -0,0 +1,52 @@
+# tests/test_calendar.py
+import numpy as np
+import pandas as pd
+import pytest
+from agent_lab.data_connectors.calendar import align, marks, resample, trading_calendar
+
+@pytest.mark.parametrize("year, sessions", [
+    (2001, 248),    # 9/11 closures
+    (2012, 250),    # Hurricane Sandy
+    (2018, 251),    # national day of mourning, December 5
+    (2021, 252),
+    (2022, 251),    # first Juneteenth holiday
+    (2023, 250),
+    (2024, 252),
+    (2025, 250),    # national day of mourning, January 9
+])
+def test_nyse_sessions_per_year(year, sessions):
+    assert len(trading_calendar(f"{year}-01-01", f"{year}-12-31")) == sessions
+
+@pytest.mark.parametrize("day, open_", [
+    ("2021-06-18", True),     # Juneteenth only from 2022
+    ("2022-06-20", False),    # Juneteenth on a Sunday, observed Monday
+    ("2021-12-31", True),     # New Year's Day on a Saturday is not made up on Friday
+    ("2021-12-24", False),    # Christmas on a Saturday, observed Friday
+    ("2023-01-02", False),    # New Year's Day on a Sunday, observed Monday
+    ("2024-03-29", False),    # Good Friday
+    ("2023-11-24", True),     # the day after Thanksgiving (an early close)
+    ("2026-07-03", False),    # Independence Day on a Saturday, observed Friday
+])
+def test_nyse_holidays(day, open_):
+    days = trading_calendar("2021-01-01", "2026-12-31")
+    assert (pd.Timestamp(day) in days) == open_
+
+def test_weekday_calendar_and_unknown_names():
+    assert len(trading_calendar("2024-01-01", "2024-12-31", calendar="B")) == 262
+    with pytest.raises(ValueError, match="Unknown calendar"):
+        trading_calendar("2024-01-01", "2024-12-31", calendar="XLON")
+
+def test_align_drops_off_calendar_bars_and_marks_gaps():
+    days = trading_calendar("2024-07-01", "2024-07-10")      # July 4 is a holiday
+    a = pd.Series([1.0, 2.0, 3.0, 4.0], index=pd.to_datetime(["2024-07-01", "2024-07-03", "2024-07-04", "2024-07-08"]))
+    panel = align({"A": a}, calendar=days)
+    assert list(panel.index) == list(days)
+    assert panel.valid[:, 0].tolist() == [True, False, True, False, True, False, False]
+    np.testing.assert_array_equal(marks(panel.values, panel.valid)[:, 0], [1, 1, 2, 2, 4, 4, 4])
+
+def test_weekly_bars_take_the_last_session():
+    days = trading_calendar("2024-07-01", "2024-07-19")
+    frame = pd.DataFrame({"A": np.arange(len(days), dtype=float)}, index=days)
+    weekly = resample(frame, "W")
+    # the week of July 4 ends on Friday the 5th; the others on the 12th and 19th
+    assert weekly["A"].tolist() == [3.0, 8.0, 13.0]
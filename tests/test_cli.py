@@ -0,0 +1,69 @@
+# tests/test_cli.py
+import subprocess
+import sys
+import textwrap
+import pytest
+
+@pytest.mark.parametrize("agent", ["buffett", "oversight"])
+def test_decide_never_imports_pandas(tmp_path, agent):
+    code = textwrap.dedent(f"""
+        import sys
+        from agent_lab.cli import main
+        assert main(["decide", "AAPL", "--agent", "{agent}", "--offline"]) == 0
+        print("pandas" in sys.modules)
+    """)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=tmp_path)
+    assert out.stdout.splitlines()[-1] == "False"
+    assert out.stdout.startswith("AAPL\tHOLD")
+
+def _cli(cwd, *argv):
+    return subprocess.run([sys.executable, "-m", "agent_lab", "--data-source", "synthetic:6:1", *argv],
+                          capture_output=True, text=True, cwd=cwd)
+
+def test_screen_writes_one_row_per_agent_and_symbol(tmp_path):
+    import pandas as pd
+    from agent_lab.agents.base import decide_many
+    from agent_lab.agents.registry import get_agent
+    from agent_lab.data_connectors.normalize import normalize_frame
+    from agent_lab.data_connectors.sources import SyntheticSource
+
+    (tmp_path / "universe.txt").write_text("symbol\nSYN0001\nSYN0003\n")
+    assert _cli(tmp_path, "screen", "-a", "buffett", "cathie", "-u", "universe.txt", "-s", "syn0000", "syn0001",
+                "--chunk-size", "2", "-o", "screen.csv").returncode == 0
+    df = pd.read_csv(tmp_path / "screen.csv")
+    symbols = ["SYN0000", "SYN0001", "SYN0003"]
+    assert list(df.columns) == ["symbol", "agent", "action", "confidence", "score", "rationale"]
+    assert sorted(zip(df["agent"], df["symbol"])) == sorted((a, s) for a in ("buffett", "cathie") for s in symbols)
+
+    source = SyntheticSource(6, 1)
+    funds = normalize_frame({s: {"profile": source.company_profile2(s), "ratios": source.company_basic_financials(s),
+                                 "insider": source.stock_insider_transactions(s)["data"]} for s in symbols},
+                            as_of=source.as_of)
+    expected = decide_many(get_agent("buffett"), symbols, funds).to_frame().reset_index()
+    got = df[df["agent"] == "buffett"].set_index("symbol").loc[symbols]
+    assert got["action"].tolist() == expected["action"].astype(str).tolist()
+    assert got["score"].tolist() == expected["score"].tolist()
+
+def test_backtest_and_sweep_write_csv(tmp_path):
+    import pandas as pd
+
+    assert _cli(tmp_path, "backtest", "-a", "buffett", "ackman", "-o", "bt.csv").returncode == 0
+    assert _cli(tmp_path, "backtest", "-a", "buffett", "ackman", "-o", "again.csv", "-j", "2").returncode == 0
+    assert _cli(tmp_path, "backtest", "-a", "buffett", "ackman", "-o", "fresh.csv", "--no-cache").returncode == 0
+    # parallel workers write each agent's curve as it completes
+    read = lambda name: pd.read_csv(tmp_path / name).sort_values(["agent", "date"], ignore_index=True)
+    bt = read("bt.csv")
+    assert list(bt.columns) == ["date", "agent", "equity"] and set(bt["agent"]) == {"buffett", "ackman"}
+    pd.testing.assert_frame_equal(read("again.csv"), bt)
+    pd.testing.assert_frame_equal(read("fresh.csv"), bt)
+
+    assert _cli(tmp_path, "sweep", "-a", "buffett", "--cost-bps", "5", "20", "--seeds", "0", "1",
+                "-o", "sweep.csv").returncode == 0
+    sweep = pd.read_csv(tmp_path / "sweep.csv")
+    assert len(sweep) == 4 and sweep[["cost_bps", "seed"]].drop_duplicates().shape[0] == 4
+    final = bt[bt["agent"] == "buffett"]["equity"].iloc[-1]
+    assert sweep.loc[sweep["cost_bps"] == 5, "final_equity"].tolist() == pytest.approx([final, final])
+
+def test_backtest_learn_rejects_plain_agents(tmp_path):
+    out = _cli(tmp_path, "backtest", "-a", "buffett", "--learn")
+    assert out.returncode != 0 and "--learn needs ensemble agents" in out.stderr
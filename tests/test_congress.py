@@ -0,0 +1,62 @@
+# tests/test_congress.py
+"""CongressAgent's columnar scoring against the per-symbol rules it replaced."""
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from agent_lab.agents.base import Action
+from agent_lab.agents.congress import CongressAgent
+
+def _get(row: pd.Series, col: str, default: float) -> float:
+    # the original `float(x or default)`, with NaN counted as missing too
+    value = row.get(col)
+    return default if pd.isna(value) or not value else float(value)
+
+def old_decide(agent: CongressAgent, row: pd.Series):
+    buy_amt = _get(row, "recent_congress_buy_usd", 0.0)
+    sell_amt = _get(row, "recent_congress_sell_usd", 0.0)
+    days = _get(row, "days_since_disclosure", 90.0)
+    conf = 0.5 ** (days / max(agent.half_life, 1e-9))
+    if buy_amt >= agent.buy_thresh and buy_amt > sell_amt:
+        return Action.BUY, 1, min(1.0, conf), f"Congress BUY ${buy_amt:,.0f}"
+    if sell_amt >= agent.sell_thresh and sell_amt > buy_amt:
+        return Action.SELL, -1, min(1.0, conf), f"Congress SELL ${sell_amt:,.0f}"
+    return Action.HOLD, 0, min(1.0, conf * 0.5), "No strong disclosure"
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    n = 300
+    frame = pd.DataFrame({
+        "recent_congress_buy_usd": rng.choice([0.0, 5_000.0, 10_000.0, 50_000.0, np.nan], n),
+        "recent_congress_sell_usd": rng.choice([0.0, 9_999.0, 10_000.0, 50_000.0, np.nan], n),
+        # whole days (the decay table), fractional ones, ages past the table, zeros and gaps (90 days)
+        "days_since_disclosure": rng.choice([0.0, 1.0, 7.0, 12.5, 45.0, 4000.0, np.nan], n),
+    }, index=[f"S{i:03d}" for i in range(n)])
+    return frame
+
+@pytest.mark.parametrize("half_life", [30.0, 7.5])
+def test_decisions_match_per_symbol_rules(features, half_life):
+    agent = CongressAgent(decay_half_life_days=half_life)
+    universe = ["NOPE", *features.index[::-1]]
+    decisions, table = agent.decide(date(2024, 6, 30), universe, features)
+    assert [d.symbol for d in decisions] == list(table.index) == list(features.index[::-1])
+    for d in decisions:
+        action, score, conf, rationale = old_decide(agent, features.loc[d.symbol])
+        assert (d.action, d.score, d.rationale) == (action, score, rationale)
+        assert d.confidence == pytest.approx(conf, rel=1e-12)
+        assert table.at[d.symbol, "justification"] == rationale
+
+def test_missing_columns_use_the_defaults():
+    frame = pd.DataFrame({"recent_congress_buy_usd": [20_000.0]}, index=["AAA"])
+    (d,), table = CongressAgent().decide(date(2024, 6, 30), ["AAA"], frame)
+    assert d.action == Action.BUY and d.confidence == pytest.approx(0.5 ** 3)
+    assert table.at["AAA", "days_since"] == 90.0
+
+def test_panel_scoring_without_justifications(features):
+    panel = pd.concat({pd.Timestamp("2024-06-28"): features, pd.Timestamp("2024-06-30"): features},
+                      names=["asof", "symbol"])
+    table = CongressAgent().score_frame(panel, justify=False)
+    assert table.index.equals(panel.index) and "justification" not in table.columns
+    one_day = CongressAgent().score_frame(features)
+    np.testing.assert_array_equal(table["confidence"].to_numpy()[:len(features)], one_day["confidence"].to_numpy())
@@ -0,0 +1,57 @@
+# tests/test_data_service.py
+from types import SimpleNamespace
+import pytest
+from agent_lab.data_connectors import lru
+from agent_lab.data_connectors.data_service import NEGATIVE_TTL, DataService
+from agent_lab.data_connectors.sources import SyntheticSource, use_data_source
+
+class FlakySource(SyntheticSource):
+    """Synthetic prices, except that the first `failures` fetches of each symbol fail."""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.calls = {}
+
+    def price_history(self, symbol, **kwargs):
+        self.calls[symbol] = self.calls.get(symbol, 0) + 1
+        if self.calls[symbol] <= self.failures:
+            raise ConnectionError("transient")
+        return super().price_history(symbol, **kwargs)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(lru, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_prices_are_loaded_once(clock):
+    source = FlakySource(failures=0, n_symbols=3, years=1)
+    service = DataService()
+    with use_data_source(source):
+        first = service.prices(source.universe())
+        second = service.prices(source.universe())
+    assert list(first.columns) == source.universe() and first.equals(second)
+    assert source.calls == dict.fromkeys(source.universe(), 1)
+
+def test_failed_prices_are_retried_after_the_negative_ttl(clock):
+    source = FlakySource(failures=1, n_symbols=2, years=1)
+    symbols = source.universe()
+    service = DataService()
+    with use_data_source(source):
+        assert service.prices(symbols).empty
+        clock[0] += NEGATIVE_TTL - 1
+        assert service.prices(symbols).empty          # still remembered as failed: not fetched again
+        assert source.calls == dict.fromkeys(symbols, 1)
+        clock[0] += 1
+        assert list(service.prices(symbols).columns) == symbols
+    assert source.calls == dict.fromkeys(symbols, 2)
+
+def test_a_new_source_drops_loaded_prices(clock):
+    a, b = FlakySource(failures=0, n_symbols=2, years=1), FlakySource(failures=0, n_symbols=2, years=1, seed=1)
+    service = DataService()
+    with use_data_source(a):
+        pa = service.prices(a.universe())
+    with use_data_source(b):
+        pb = service.prices(b.universe())
+    assert not pa.equals(pb) and b.calls == dict.fromkeys(b.universe(), 1)
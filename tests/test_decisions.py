@@ -0,0 +1,57 @@
+# tests/test_decisions.py
+import numpy as np
+import pytest
+from agent_lab.agents.base import Action, Decision, DecisionBatch, decide_many, reason_code
+from agent_lab.agents.registry import get_agent
+from agent_lab.data_connectors.normalize import normalize_row
+
+def test_decision_is_slotted_and_formats_reasons_lazily():
+    roe = reason_code("ROE {:.2f}")
+    assert reason_code("ROE {:.2f}") == roe
+    d = Decision("AAA", Action.BUY, 0.5, 3.0, ((roe, 0.1834), (reason_code("Revenue stable"), None)))
+    assert not hasattr(d, "__dict__")
+    with pytest.raises(AttributeError):
+        d.score = 1.0
+    assert d.rationale == "ROE 0.18 | Revenue stable"
+    assert Decision("AAA", Action.HOLD, 0.2, 0, "no {data}").rationale == "no {data}"
+    assert d.to_dict() == {"symbol": "AAA", "action": "BUY", "confidence": 0.5, "score": 3.0,
+                           "rationale": "ROE 0.18 | Revenue stable"}
+
+def test_batch_round_trip_align_and_concat():
+    roe = reason_code("ROE {:.2f}")
+    decisions = [
+        Decision("AAA", Action.BUY, 0.65, 3.0, ((roe, 0.2),)),
+        Decision("BBB", Action.SELL, 0.2, 1.0, "no data"),
+        Decision("CCC", Action.HOLD, 0.45, 2.0, ()),
+    ]
+    batch = DecisionBatch.coerce({d.symbol: d for d in decisions})
+    assert [(b.symbol, b.action, b.confidence, b.score, b.rationale) for b in batch] == \
+           [(d.symbol, d.action, d.confidence, d.score, d.rationale) for d in decisions]
+    assert batch.actions.tolist() == [1, -1, 0] and batch.get("BBB").rationale == "no data"
+    assert batch.get("ZZZ") is None
+
+    present, actions, confidence, score = batch.align(["CCC", "ZZZ", "AAA"])
+    assert present.tolist() == [True, False, True]
+    assert actions.tolist() == [0, 0, 1] and confidence.tolist() == [0.45, 0.0, 0.65] and score.tolist() == [2.0, 0.0, 3.0]
+
+    wide = DecisionBatch.from_decisions([Decision("DDD", Action.BUY, 1.0, 5.0, ((roe, 0.3), (roe, 0.4)))])
+    both = DecisionBatch.concat([batch, wide])
+    assert both.reason_codes.shape == (4, 2)
+    assert [d.rationale for d in both] == ["ROE 0.20", "no data", "", "ROE 0.30 | ROE 0.40"]
+    frame = both.take(np.array([3, 0])).to_frame(rationale=True)
+    assert frame.index.tolist() == ["DDD", "AAA"] and frame["action"].tolist() == ["BUY", "BUY"]
+
+@pytest.mark.parametrize("name", ["buffett", "ackman", "cathie", "oversight"])
+def test_batch_path_matches_per_symbol_decisions(source, fundamentals, name):
+    agent = get_agent(name)
+    symbols = [*fundamentals.index, "NOPE"]
+    batch = decide_many(agent, symbols, fundamentals)
+    raws = {s: {"profile": source.company_profile2(s), "ratios": source.company_basic_financials(s),
+                "insider": source.stock_insider_transactions(s)["data"]} for s in fundamentals.index}
+    for d in batch:
+        if d.symbol == "NOPE":
+            assert (d.action, d.confidence, d.rationale) == (Action.HOLD, 0.2, "no data")
+            continue
+        one = agent.decide(d.symbol, data=normalize_row(d.symbol, raws[d.symbol], as_of=source.as_of))
+        assert (d.action, d.score, d.rationale) == (one.action, one.score, one.rationale), d.symbol
+        assert d.confidence == pytest.approx(one.confidence)
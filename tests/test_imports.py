@@ -0,0 +1,40 @@
+# tests/test_imports.py
+import os
+import subprocess
+import sys
+import textwrap
+
+MODULES = [
+    "agent_lab", "agent_lab.cli", "agent_lab.agents.registry",
+    "agent_lab.data_connectors.cache", "agent_lab.data_connectors.price_data",
+    "agent_lab.data_connectors.finnhub_client", "agent_lab.data_connectors.finnhub_data",
+    "agent_lab.scripts.backtest_agents", "agent_lab.api.main",
+]
+HEAVY = ["finnhub", "yfinance", "matplotlib", "streamlit", "google.generativeai"]
+
+def test_imports_have_no_side_effects(tmp_path):
+    code = textwrap.dedent(f"""
+        import importlib, sys
+        for name in {MODULES!r}:
+            importlib.import_module(name)
+        print(sorted(m for m in {HEAVY!r} if m in sys.modules))
+    """)
+    env = {k: v for k, v in os.environ.items() if k not in ("FINNHUB_API_KEY", "GOOGLE_API_KEY")}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=tmp_path, env=env)
+    assert out.stdout.splitlines()[-1] == "[]"
+    assert os.listdir(tmp_path) == []
+
+def test_submodules_load_on_first_access():
+    code = textwrap.dedent("""
+        import sys, agent_lab
+        print("agent_lab.backtesting" in sys.modules)
+        agent_lab.backtesting
+        print("agent_lab.backtesting" in sys.modules)
+        try:
+            agent_lab.nope
+        except AttributeError:
+            print("missing")
+    """)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "True", "missing"]
@@ -0,0 +1,98 @@
+# tests/test_insider.py
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+from agent_lab.data_connectors.insider import InsiderHistory, InsiderStore, as_of_day
+
+def _transactions(n, seed=0, start="2023-01-01", span=500):
+    rng = np.random.default_rng(seed)
+    days = np.datetime64(start) + rng.integers(0, span, n)
+    return [{"id": f"f{i}", "name": f"Insider {i % 7}", "filingDate": str(d),
+             "transactionDate": str(d - np.timedelta64(int(rng.integers(0, 5)), "D")),
+             "change": int(rng.normal(0, 1000)), "transactionPrice": float(np.round(rng.uniform(5, 50), 2))}
+            for i, d in enumerate(days)]
+
+def _scan(transactions, as_of, days):
+    """Window totals by brute force: filings in (as_of - days, as_of]."""
+    hi = np.datetime64(as_of, "D")
+    lo = hi - np.timedelta64(days, "D")
+    out = dict.fromkeys(["buy_shares", "sell_shares", "buy_usd", "sell_usd"], 0.0)
+    for t in transactions:
+        if lo < np.datetime64(t["filingDate"], "D") <= hi:
+            c, p = t["change"], t["transactionPrice"]
+            side = "buy" if c > 0 else "sell"
+            out[f"{side}_shares"] += abs(c)
+            out[f"{side}_usd"] += abs(c) * p
+    out["net_shares"] = out["buy_shares"] - out["sell_shares"]
+    out["net_usd"] = out["buy_usd"] - out["sell_usd"]
+    return out
+
+DATES = [str(d) for d in np.datetime64("2023-01-01") + np.arange(-10, 520, 37)]
+
+def _check(history, transactions, days=(30, 90, 180)):
+    for window in days:
+        many = history.aggregate_many(DATES, window)
+        for i, as_of in enumerate(DATES):
+            want = _scan(transactions, as_of, window)
+            for k, v in want.items():
+                assert many[k][i] == pytest.approx(v, abs=1e-6), (as_of, window, k)
+
+def test_windows_match_a_scan_whatever_the_arrival_order():
+    txs = _transactions(300)
+    _check(InsiderHistory(txs, max_rows=None), txs)
+    # appended in chunks, back-filled out of order, with repeats
+    history = InsiderHistory(max_rows=None)
+    order = np.random.default_rng(1).permutation(len(txs))
+    for chunk in np.array_split(order, 7):
+        assert history.append([txs[i] for i in chunk]) == len(chunk)
+        assert history.append([txs[i] for i in chunk[:5]]) == 0
+    assert len(history) == len(txs)
+    _check(history, txs)
+    assert history.windows(DATES[5]) == {d: history.aggregate(DATES[5], d) for d in (30, 90, 180)}
+
+def test_rows_are_keyed_per_filing_line_and_dated_by_filing():
+    t = {"id": "x", "name": "A", "filingDate": "2024-06-10", "transactionDate": "2024-01-01",
+         "change": 10, "transactionPrice": 2.0}
+    history = InsiderHistory([t, dict(t), {**t, "change": 5}, {**t, "filingDate": None, "transactionDate": None}])
+    assert len(history) == 2        # the exact duplicate and the undated row are dropped
+    assert history.aggregate("2024-06-10", 30)["buy_shares"] == 15
+    assert history.aggregate("2024-06-09", 365)["buy_shares"] == 0     # not public yet
+    undisclosed = InsiderHistory([{**t, "filingDate": None}])
+    assert undisclosed.aggregate("2024-01-01", 1)["buy_usd"] == 20.0   # falls back to the transaction date
+
+def test_trimmed_histories_keep_the_newest_whole_days():
+    txs = _transactions(400, seed=2)
+    history = InsiderHistory(txs, max_rows=150)
+    assert len(history) <= 150 and history.start is not None
+    kept = [t for t in txs if np.datetime64(t["filingDate"]) > history.start]
+    assert len(kept) == len(history)
+    # windows after the cut are exact; filings from before it don't come back
+    assert history.append([t for t in txs if t not in kept]) == 0
+    for as_of in DATES:
+        if np.datetime64(as_of) - np.timedelta64(90, "D") >= history.start:
+            assert history.aggregate(as_of, 90) == pytest.approx(_scan(txs, as_of, 90))
+
+def test_store_builds_histories_lazily_and_bounds_symbols():
+    store = InsiderStore(max_symbols=2)
+    a, b = _transactions(50, seed=3), _transactions(50, seed=4)
+    store.update("A", a[:25])
+    store.update("A", a)            # still pending: merged, not counted twice
+    assert store.aggregate("A", DATES[8], 90) == pytest.approx(_scan(a, DATES[8], 90))
+    store.update("A", a[:10])       # an existing history dedupes too
+    assert len(store.history("A")) == len(a)
+    store.update("B", b)
+    store.update("C", [])
+    assert store.history("A") is not None and store.aggregate("NOPE") is None
+
+    frame = store.frame(["A", "B", "NOPE"], as_of=DATES[8])
+    assert frame["recent_insider_buy"].dtype == "Int64" and frame.index.name == "symbol"
+    assert frame.at["B", "recent_insider_sell"] == round(_scan(b, DATES[8], 90)["sell_shares"])
+    assert frame.at["NOPE", "recent_insider_buy"] is pd.NA
+    store.clear()
+    assert store.history("A") is None
+
+@pytest.mark.parametrize("value", ["2024-06-30", "2024-06-30T15:00:00", "20240630", "June 30, 2024",
+                                   date(2024, 6, 30), datetime(2024, 6, 30, 23, 59), pd.Timestamp("2024-06-30 09:30")])
+def test_as_of_day(value):
+    assert as_of_day(value) == np.datetime64("2024-06-30")
@@ -0,0 +1,78 @@
+# tests/test_lru.py
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from agent_lab import metrics
+from agent_lab.data_connectors import lru
+from agent_lab.data_connectors.lru import BoundedCache, approx_size, env_limit
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(lru, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def _stats(name):
+    s = metrics.summary()
+    return (s["gauges"][f"cache_entries[cache={name}]"], s["gauges"][f"cache_bytes[cache={name}]"],
+            s["counters"].get(f"cache_evictions_total[cache={name}]", 0.0))
+
+def test_least_recently_used_entries_go_first():
+    metrics.reset()
+    c = BoundedCache("t-entries", max_entries=3)
+    for k in "abc":
+        c.put(k, k.upper(), nbytes=10)
+    assert c.get("a") == "A"      # a is now the most recent
+    c.put("d", "D", nbytes=10)
+    assert list(c._data) == ["c", "a", "d"] and "b" not in c
+    assert len(c) == 3 and c.nbytes == 30 and _stats("t-entries") == (3, 30, 1)
+    with pytest.raises(KeyError):
+        c["b"]
+
+def test_byte_accounting_follows_every_change():
+    metrics.reset()
+    c = BoundedCache("t-bytes", max_bytes=100)
+    c.put("a", 1, nbytes=40)
+    c.put("b", 2, nbytes=40)
+    c.put("a", 3, nbytes=10)      # replaced in place, not counted twice
+    assert c.nbytes == 50 and c["a"] == 3
+    c.put("c", 4, nbytes=60)      # 110 > 100: b, the least recent, goes
+    assert list(c._data) == ["a", "c"] and c.nbytes == 70
+    c.put("huge", 5, nbytes=500)  # the newest entry stays even alone over the bound
+    assert list(c._data) == ["huge"] and c.nbytes == 500
+    assert _stats("t-bytes") == (1, 500, 3)
+    assert c.pop("huge") == 5 and c.pop("huge", "gone") == "gone" and c.nbytes == 0
+    for k in range(4):
+        c.put(("src", k), k, nbytes=1)
+    assert c.invalidate(lambda key: key[1] % 2 == 0) == 2 and c.nbytes == 2
+    c.clear()
+    assert len(c) == 0 and c.nbytes == 0 and _stats("t-bytes")[:2] == (0, 0)
+    sized = BoundedCache("t-sized", sizeof=lambda v: 7)
+    sized["x"] = "anything"
+    assert sized.nbytes == 7
+
+def test_entries_expire_after_the_ttl(clock):
+    c = BoundedCache("t-ttl", ttl=60)
+    c.put("a", "A", nbytes=5)
+    clock[0] += 59
+    c.put("b", "B", nbytes=5)
+    assert "a" in c and c.get("a") == "A"
+    clock[0] += 1
+    assert "a" not in c and "b" in c
+    assert c.nbytes == 10           # membership tests leave entries alone
+    assert c.get("a", "miss") == "miss" and c.nbytes == 5 and len(c) == 1
+
+def test_approx_size():
+    frame = pd.DataFrame({"x": np.zeros(1000)})
+    assert approx_size(frame) >= 8000 and approx_size(np.zeros(100)) == 800
+    records = [{"change": i, "name": f"Insider {i}", "transactionDate": "2024-01-02"} for i in range(400)]
+    exact = sum(approx_size(r) for r in records)
+    assert abs(approx_size(records) - approx_size([]) - 400 * 8 - exact) / exact < 0.05
+    assert approx_size({"a": [1, 2]}) > approx_size({})
+
+def test_env_limit(monkeypatch):
+    monkeypatch.setenv("AGENT_LAB_TEST_MB", "12.5")
+    assert env_limit("AGENT_LAB_TEST_MB", 1) == 12.5
+    monkeypatch.delenv("AGENT_LAB_TEST_MB")
+    assert env_limit("AGENT_LAB_TEST_MB", 1) == 1
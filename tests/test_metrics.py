@@ -0,0 +1,63 @@
+# tests/test_metrics.py
+import io
+import json
+import pytest
+from agent_lab import metrics
+from agent_lab.data_connectors import cache
+from agent_lab.data_connectors.sources import SyntheticSource, use_data_source
+
+@pytest.fixture(autouse=True)
+def fresh():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_counters_gauges_and_spans():
+    metrics.inc("calls_total", api="x")
+    metrics.inc("calls_total", 2, api="x")
+    metrics.set_gauge("bytes", 10, cache="p")
+    metrics.set_gauge("bytes", 7, cache="p")
+    with pytest.raises(ValueError):
+        with metrics.span("work", kind="a"):
+            raise ValueError
+    metrics.observe("work", 0.5, kind="a")
+
+    @metrics.timed("wrapped")
+    def f(x):
+        return x + 1
+    assert f(1) == 2
+
+    s = metrics.summary()
+    assert s["counters"] == {"calls_total[api=x]": 3.0}
+    assert s["gauges"] == {"bytes[cache=p]": 7.0}
+    assert s["stages"]["work[kind=a]"]["count"] == 2 and s["stages"]["work[kind=a]"]["max_ms"] == 500.0
+    assert s["stages"]["wrapped"]["count"] == 1
+
+    out = io.StringIO()
+    metrics.log_summary(out, command="screen")
+    record = json.loads(out.getvalue())
+    assert record["event"] == "metrics" and record["command"] == "screen" and record["counters"] == s["counters"]
+
+def test_prometheus_text():
+    metrics.inc("calls_total", api='say "hi"\n')
+    metrics.set_gauge("bytes", 1.5e9)
+    metrics.observe("fetch", 0.25, what="prices")
+    lines = metrics.render_prometheus().splitlines()
+    assert "# TYPE agent_lab_calls_total counter" in lines
+    assert 'agent_lab_calls_total{api="say \\"hi\\"\\n"} 1' in lines
+    assert "agent_lab_bytes 1.5e+09" in lines
+    assert 'agent_lab_stage_seconds_count{stage="fetch",what="prices"} 1' in lines
+    assert 'agent_lab_stage_seconds_sum{stage="fetch",what="prices"} 0.250000' in lines
+    assert 'agent_lab_stage_seconds_max{stage="fetch",what="prices"} 0.250000' in lines
+
+def test_fundamentals_cache_accounting():
+    cache.clear_cache()
+    with use_data_source(SyntheticSource(3, 1)):
+        for _ in range(3):
+            cache.get_fundamentals("SYN0001")
+        assert cache.get_fundamentals("SYN0009") is None
+        assert cache.get_fundamentals("SYN0009") is None
+    counters = metrics.summary()["counters"]
+    assert counters["cache_requests_total[cache=fundamentals,result=miss]"] == 2
+    assert counters["cache_requests_total[cache=fundamentals,result=memory_hit]"] == 3
+    assert counters["cache_requests_total[cache=fundamentals,result=negative_hit]"] == 1
@@ -0,0 +1,119 @@
+# tests/test_normalize.py
+import json
+import math
+import subprocess
+import sys
+import textwrap
+import pandas as pd
+import pytest
+from agent_lab.data_connectors.insider import InsiderStore
+from agent_lab.data_connectors.normalize import COLUMNS, SCHEMA, apply_schema, frame_records, normalize_frame, normalize_row
+
+AS_OF = "2024-06-30"
+RAWS = {
+    "FULL": {
+        "profile": {"name": "Full Co", "finnhubIndustry": "Tech", "shareOutstanding": 99.0},
+        "ratios": {"metric": {"peTTM": 12.5, "forwardPE": 30.0, "roeTTM": 18.0, "roiTTM": 0.0, "roicTTM": 7.0,
+                              "pfcfShareTTM": 21.0, "revenueGrowth5Y": 9.0, "revenueGrowthQuarterlyYoy": 3.0,
+                              "totalDebt/totalEquityAnnual": 0.4, "enterpriseValue": 1000.0,
+                              "ebitdPerShareTTM": 2.0, "sharesOutstanding": 50.0}},
+        "insider": [
+            {"filingDate": "2024-06-01", "change": 100},
+            {"filingDate": "2024-05-01", "transactionDate": "2024-04-01", "change": -40},
+            {"filingDate": "2024-01-01", "change": 999},      # outside the 90-day window
+            {"filingDate": "2024-07-01", "change": 999},      # after as_of
+            {"filingDate": "2024-06-02", "change": "n/a"},
+        ],
+    },
+    "FALLBACK": {
+        "profile": {"name": "Fallback Inc", "shareOutstanding": 10.0},
+        "ratios": {"metric": {"peTTM": "bad", "forwardPE": 15.0, "roiTTM": None, "roicTTM": 6.0,
+                              "freeCashFlowTTM": 5.0, "currentEv/freeCashFlowTTM": 80.0,
+                              "revenueGrowth3Y": float("inf"), "enterpriseValue": 300.0, "ebitdPerShareTTM": 3.0}},
+        "insider": [],
+    },
+    "EV_ONLY": {"profile": {}, "ratios": {"metric": {"currentEv/freeCashFlowTTM": 80.0, "ebitdPerShareTTM": 0.0}}},
+    "MISSING": None,
+}
+
+def test_row_rules():
+    full, fallback, ev_only, missing = (normalize_row(s, raw, as_of=AS_OF) for s, raw in RAWS.items())
+    assert list(full) == ["symbol", *COLUMNS]
+    assert (full["company"], full["sector"]) == ("Full Co", "Tech")
+    assert full["pe"] == 12.5 and full["roic"] == 0.0      # 0 is a value, not a miss
+    assert full["ev_ebitda"] == 1000.0 / (2.0 * 50.0)
+    assert (full["recent_insider_buy"], full["recent_insider_sell"]) == (100.0, 40.0)
+
+    assert fallback["pe"] == 15.0 and fallback["roic"] == 6.0
+    assert fallback["free_cashflow"] == 5.0
+    assert math.isnan(fallback["revenue_growth_cagr"]) and math.isnan(fallback["roe"])
+    assert fallback["ev_ebitda"] == 300.0 / (3.0 * 10.0)    # profile share count when the metric has none
+    assert fallback["sector"] is None
+    assert (fallback["recent_insider_buy"], fallback["recent_insider_sell"]) == (0.0, 0.0)
+
+    # an EV/FCF multiple is not a cash flow
+    assert math.isnan(ev_only["free_cashflow"]) and math.isnan(ev_only["ev_ebitda"])
+    assert math.isnan(missing["recent_insider_buy"]) and missing["company"] is None
+
+@pytest.mark.parametrize("with_store", [False, True])
+def test_frame_matches_rows(with_store):
+    store = None
+    if with_store:
+        store = InsiderStore()
+        for s, raw in RAWS.items():
+            if raw is not None:
+                store.update(s, raw.get("insider") or [])
+    frame = normalize_frame(RAWS, as_of=AS_OF, insider=store)
+    assert list(frame.columns) == COLUMNS and list(frame.index) == list(RAWS)
+    for s, raw in RAWS.items():
+        row = normalize_row(s, raw, as_of=AS_OF, insider=store)
+        for col in COLUMNS:
+            got, want = frame.at[s, col], row[col]
+            if want is None or (isinstance(want, float) and math.isnan(want)):
+                assert pd.isna(got), (s, col, got)
+            elif isinstance(want, float):
+                assert got == pytest.approx(want, rel=1e-6), (s, col)
+            else:
+                assert got == want, (s, col)
+
+def test_per_symbol_path_never_imports_pandas():
+    # the fundamentals cache normalizes one payload, insider totals included, in pure Python and numpy
+    code = textwrap.dedent("""
+        import sys
+        from agent_lab.data_connectors import cache
+        from agent_lab.data_connectors.insider import InsiderStore
+        from agent_lab.data_connectors.normalize import normalize_row
+        store = InsiderStore()
+        store.update("AAA", [{"filingDate": "2024-06-01", "change": 100, "transactionPrice": 2.0}])
+        row = normalize_row("AAA", {"profile": {"name": "A"}, "ratios": {"metric": {"peTTM": 9}},
+                                    "insider": []}, as_of="2024-06-30", insider=store)
+        assert row["recent_insider_buy"] == 100 and row["pe"] == 9, row
+        print("pandas" in sys.modules)
+    """)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+def test_frame_is_typed_by_schema_and_records_are_json_safe():
+    frame = normalize_frame(RAWS, as_of=AS_OF)
+    assert {c: str(t) for c, t in frame.dtypes.items()} == SCHEMA
+    assert frame.at["MISSING", "recent_insider_buy"] is pd.NA
+    assert frame.memory_usage(deep=True).sum() < frame.astype({c: "float64" for c in COLUMNS[2:]}).memory_usage(deep=True).sum()
+    empty = normalize_frame({})
+    assert empty.empty and {c: str(t) for c, t in empty.dtypes.items()} == SCHEMA
+
+    records = frame_records(frame)
+    json.dumps(records, allow_nan=False)
+    assert list(records) == list(RAWS)
+    full = records["FULL"]
+    assert full["company"] == "Full Co" and full["sector"] == "Tech"
+    assert full["pe"] == 12.5 and type(full["recent_insider_buy"]) is int and full["recent_insider_buy"] == 100
+    assert records["FALLBACK"]["sector"] is None and records["FALLBACK"]["revenue_growth_cagr"] is None
+    assert set(records["MISSING"].values()) == {None}
+
+    # float32 columns come back at their shortest repr, not float32 -> float64 noise
+    odd = apply_schema(pd.DataFrame({"pe": [39.2864, 0.1]}, index=["A", "B"]))
+    assert odd["pe"].dtype == "float32" and frame_records(odd)["A"]["pe"] == 39.2864
+
+    # records read back (as the scoring service stores them) are the same frame
+    back = apply_schema(pd.DataFrame.from_dict(records, orient="index")).rename_axis("symbol")
+    pd.testing.assert_frame_equal(back, frame, check_categorical=False)
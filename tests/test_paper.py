@@ -0,0 +1,53 @@
+# tests/test_paper.py
+import numpy as np
+import pytest
+from agent_lab.agents.base import decide_many
+from agent_lab.agents.registry import get_agent
+from agent_lab.backtesting.engine import BacktestEngine
+from agent_lab.backtesting.paper import PaperTrader, ReplayFeed, SourceFeed
+from agent_lab.data_connectors.sources import SyntheticSource, use_data_source
+from agent_lab.ensemble.learning import LearningDecider
+from agent_lab.seeding import with_seed
+
+def test_paper_replay_matches_backtest(tmp_path, prices, fundamentals):
+    agent = with_seed(get_agent("buffett"), 0)
+    decisions = decide_many(agent, list(prices.columns), fundamentals)
+    expected = BacktestEngine(prices, seed=0).run(lambda dt: decisions)
+
+    path = str(tmp_path / "buffett")
+    trader = PaperTrader.create(path, "buffett", prices.columns)
+    trader.run(ReplayFeed(prices.iloc[:100], fundamentals=fundamentals))
+    # the rest of the days in a fresh trader, as in a new process
+    PaperTrader(path).run(ReplayFeed(prices.iloc[100:]))
+    equity = PaperTrader(path).equity()
+    np.testing.assert_allclose(equity["equity"].to_numpy(), expected["equity"].to_numpy(), rtol=1e-12)
+    assert len(PaperTrader(path).ledger())
+
+def test_source_feed_skips_failed_symbols(capsys):
+    source = SyntheticSource(n_symbols=3, years=1)
+    with use_data_source(source):
+        update = SourceFeed(source.universe() + ["NOPE"]).latest()
+    assert update.date == source.as_of
+    assert np.isnan(update.close["NOPE"]) and update.close.drop("NOPE").notna().all()
+    assert list(update.fundamentals.index) == source.universe()
+    captured = capsys.readouterr()
+    assert captured.out == "" and "[paper] prices NOPE failed" in captured.err
+
+@pytest.mark.parametrize("horizon", [5, 21])
+def test_learning_paper_matches_learning_backtest(tmp_path, prices, fundamentals, horizon):
+    oversight = with_seed(get_agent("oversight"), 0)
+    members = {a.name: decide_many(a, list(prices.columns), fundamentals) for a in oversight.agents}
+    sectors = fundamentals["sector"].astype(object)
+    decider = LearningDecider(oversight, lambda dt: members, prices, horizon, sectors=sectors)
+    expected = BacktestEngine(prices, seed=0).run(decider)
+
+    weights = tmp_path / "oversight.json"
+    trader = PaperTrader.create(str(tmp_path / "oversight"), "oversight", prices.columns, learn=True,
+                                horizon=horizon, weights_path=str(weights))
+    trader.run(ReplayFeed(prices, fundamentals=fundamentals))
+
+    np.testing.assert_allclose(trader.equity()["equity"].to_numpy(), expected["equity"].to_numpy(), rtol=1e-12)
+    learned = PaperTrader(str(tmp_path / "oversight")).learning["learner"]
+    assert learned.updates == oversight.learner.updates > 0
+    assert learned.weights() == pytest.approx(oversight.learner.weights(), rel=1e-12)
+    assert weights.exists()
@@ -0,0 +1,43 @@
+# tests/test_portfolio.py
+import numpy as np
+import pytest
+from agent_lab import portfolio
+from agent_lab.portfolio import project_capped_simplex
+
+def test_projection_worked_example():
+    # clip(v - tau, 0, 0.4) with tau = -0.05: the first entry is capped, the rest shift up
+    w = project_capped_simplex(np.array([[0.5, 0.3, 0.2]]), np.ones((1, 3), bool), np.array([1.0]), cap=0.4)
+    np.testing.assert_allclose(w, [[0.4, 0.35, 0.25]], atol=1e-12)
+
+@pytest.mark.parametrize("cap", [0.05, 0.1, 0.3, 1.0])
+def test_projection_is_the_euclidean_projection(cap):
+    rng = np.random.default_rng(0)
+    v = rng.normal(0.0, 0.2, (200, 30))
+    eligible = rng.random((200, 30)) < 0.6
+    eligible[0] = False                         # a row with nothing to hold
+    total = np.minimum(1.0, cap * eligible.sum(axis=1))
+    w = project_capped_simplex(v, eligible, total, cap)
+
+    assert np.all(w[~eligible] == 0.0)
+    assert np.all((w >= 0.0) & (w <= cap + 1e-12))
+    np.testing.assert_allclose(w.sum(axis=1), total, atol=1e-9)
+    # optimality: one shift tau per row with free entries at v - tau, zeros at v <= tau, caps at v >= tau + cap
+    for row, e in enumerate(eligible):
+        x, y = v[row, e], w[row, e]
+        free = (y > 1e-12) & (y < cap - 1e-12)
+        if not free.any():
+            continue
+        tau = np.mean(x[free] - y[free])
+        np.testing.assert_allclose(x[free] - y[free], tau, atol=1e-9)
+        assert np.all(x[y <= 1e-12] <= tau + 1e-9)
+        assert np.all(x[y >= cap - 1e-12] >= tau + cap - 1e-9)
+
+def test_score_weights_redistribute_capped_excess():
+    signal = np.array([[10.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0]])
+    eligible = np.ones_like(signal, dtype=bool)
+    legacy = portfolio.target_weights("legacy", signal, eligible, cap=0.1)
+    score = portfolio.target_weights("score", signal, eligible, cap=0.1)
+    # legacy clips the big position and leaves the excess in cash; score hands it to the others
+    assert legacy.sum() < 1.0
+    np.testing.assert_allclose(score.sum(), 1.0)
+    assert score.max() <= 0.1 + 1e-12
@@ -0,0 +1,90 @@
+# tests/test_profiling.py
+import os
+import pstats
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agent_lab import profiling
+from agent_lab.agents.registry import get_agent
+from agent_lab.api.scoring import ScoringService
+from agent_lab.backtesting.engine import BacktestEngine
+from conftest import random_decider
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+def _busy(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_modes():
+    assert [profiling.normalize_mode(v) for v in (None, False, "0", "off", True, "1", "sample")] == \
+           [None, None, None, None, "cprofile", "cprofile", "sample"]
+    with pytest.raises(ValueError):
+        profiling.normalize_mode("perf")
+
+def test_disabled_profiling_writes_nothing(profile_dir):
+    with profiling.profiled("off", mode=False) as prof:
+        _busy(0.001)
+    assert prof is None and not profile_dir.exists()
+
+def test_cprofile_and_sample_outputs(profile_dir):
+    with profiling.profiled("run", "cprofile") as prof:
+        _busy()
+    assert prof.path.endswith(".prof") and os.path.dirname(prof.path) == str(profile_dir)
+    assert "_busy" in prof.summary and prof.seconds >= 0.05
+    assert any(fn == "_busy" for _, _, fn in pstats.Stats(prof.path).stats)
+
+    with profiling.profiled("run", "sample", interval=0.001) as prof:
+        _busy(0.1)
+    assert prof.path.endswith(".folded") and prof.path != os.path.join(profile_dir, "run.folded")
+    lines = open(prof.path).read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("test_profiling.py:_busy" in line for line in lines)
+    assert prof.summary.startswith(f"{sum(prof.folded.values())} samples")
+
+def test_backtest_profile(prices):
+    engine = BacktestEngine(prices)
+    equity = engine.run(random_decider(prices.columns), profile=True)
+    assert len(equity) == len(prices)
+    assert engine.profile.name == "backtest" and os.path.isfile(engine.profile.path)
+
+def _app(fundamentals, enabled=True):
+    app = FastAPI()
+    service = ScoringService({"buffett": get_agent("buffett")},
+                             loader=lambda s: fundamentals.loc[fundamentals.index.intersection(s)])
+    profiling.install_request_profiling(app, enabled=enabled)
+
+    @app.get("/score")
+    async def score():
+        return {"n": len(await service.score("buffett", list(fundamentals.index)))}
+
+    @app.get("/inline")
+    async def inline():
+        _busy()     # on the event loop, not handed off
+        return {}
+    return app
+
+def test_request_profiles_cover_the_scoring_job(fundamentals):
+    client = TestClient(_app(fundamentals))
+    assert "X-Profile-File" not in client.get("/score").headers
+    res = client.get("/score", headers={"X-Profile": "cprofile"})
+    name = res.headers["X-Profile-File"]
+    assert name.startswith("scoring-buffett") and name.endswith(".prof")
+    profile = client.get(f"/profiles/{name}")
+    assert profile.status_code == 200 and profile.content
+    assert client.get("/profiles/nope.prof").status_code == 404
+    # cprofile only covers handed-off work; sample mode falls back to the event loop thread
+    assert "X-Profile-File" not in client.get("/inline?profile=cprofile").headers
+    assert client.get("/inline?profile=sample").headers["X-Profile-File"].startswith("api-inline")
+    assert "X-Profile-File" not in client.get("/score?profile=bogus").headers
+
+def test_request_profiling_is_off_unless_enabled(fundamentals, monkeypatch):
+    monkeypatch.delenv("AGENT_LAB_PROFILING", raising=False)
+    client = TestClient(_app(fundamentals, enabled=None))
+    assert "X-Profile-File" not in client.get("/score", headers={"X-Profile": "cprofile"}).headers
+    assert client.get("/profiles/anything.prof").status_code == 404
@@ -0,0 +1,88 @@
+# tests/test_result_cache.py
+import os
+import numpy as np
+import pytest
+from agent_lab.agents.base import decide_many
+from agent_lab.agents.registry import get_agent
+from agent_lab.backtesting.engine import BacktestEngine
+from agent_lab.backtesting.result_cache import BacktestCache, fingerprint
+from agent_lab.seeding import with_seed
+
+@pytest.fixture
+def setup(tmp_path, prices, fundamentals):
+    agent = with_seed(get_agent("buffett"), 0)
+    decisions = decide_many(agent, list(prices.columns), fundamentals)
+    seen = []
+    def decider(dt):
+        seen.append(dt)
+        return decisions
+    return agent, decider, seen, BacktestCache(str(tmp_path / "cache"))
+
+def test_same_inputs_hit_and_changed_inputs_miss(prices, fundamentals, setup):
+    agent, decider, seen, cache = setup
+    first = BacktestEngine(prices, seed=0).run(decider, agent=agent, inputs=fundamentals, cache=cache)
+    assert seen
+    seen.clear()
+    again = BacktestEngine(prices, seed=0).run(decider, agent=agent, inputs=fundamentals, cache=cache)
+    assert not seen
+    np.testing.assert_array_equal(again["equity"].to_numpy(), first["equity"].to_numpy())
+
+    for engine, kwargs in [
+        (BacktestEngine(prices, seed=1), {}),
+        (BacktestEngine(prices, seed=0, cost_bps=20), {}),
+        (BacktestEngine(prices, seed=0), {"cash": 50_000.0}),
+        (BacktestEngine(prices, seed=0), {"agent": get_agent("ackman")}),
+        (BacktestEngine(prices, seed=0), {"inputs": fundamentals.iloc[:-1]}),
+    ]:
+        seen.clear()
+        engine.run(decider, **{"agent": agent, "inputs": fundamentals, "cache": cache, **kwargs})
+        assert seen, kwargs
+
+def test_extended_panel_resumes_from_the_cached_prefix(prices, fundamentals, setup):
+    agent, decider, seen, cache = setup
+    expected = BacktestEngine(prices, seed=0).run(decider)
+    BacktestEngine(prices.iloc[:100], seed=0).run(decider, agent=agent, inputs=fundamentals, cache=cache)
+    seen.clear()
+    engine = BacktestEngine(prices, seed=0)
+    equity = engine.run(decider, agent=agent, inputs=fundamentals, cache=cache)
+    assert seen and min(seen) > prices.index[99]
+    np.testing.assert_allclose(equity["equity"].to_numpy(), expected["equity"].to_numpy(), rtol=1e-12)
+    # a panel whose history was revised doesn't resume from a stale prefix
+    revised = prices.copy()
+    revised.iloc[10] *= 1.01
+    seen.clear()
+    BacktestEngine(revised, seed=0).run(decider, agent=agent, inputs=fundamentals, cache=cache)
+    assert min(seen) <= prices.index[10]
+
+def test_state_and_start_continue_a_run(prices, setup):
+    _, decider, _, _ = setup
+    expected = BacktestEngine(prices, seed=0).run(decider)
+    head = BacktestEngine(prices.iloc[:100], seed=0)
+    first = head.run(decider)
+    rest = BacktestEngine(prices, seed=0).run(decider, state=head.state, start=prices.index[100])
+    equity = np.concatenate([first["equity"].to_numpy(), rest["equity"].to_numpy()])
+    np.testing.assert_allclose(equity, expected["equity"].to_numpy(), rtol=1e-12)
+
+def test_fingerprint_refuses_unstable_configs():
+    class Private:
+        def __init__(self):
+            self._weights = {"a": 1}
+    assert fingerprint({"b": 1, "a": [1.0, "x"]}) == fingerprint({"a": [1.0, "x"], "b": 1})
+    assert fingerprint(get_agent("buffett")) != fingerprint(with_seed(get_agent("cathie"), 0))
+    with pytest.raises(TypeError):
+        fingerprint(lambda dt: None)
+    with pytest.raises(TypeError):
+        fingerprint(Private())
+
+def test_eviction_keeps_the_directory_under_max_bytes(tmp_path, prices, setup):
+    agent, decider, _, _ = setup
+    cache = BacktestCache(str(tmp_path / "small"), max_bytes=1)
+    for seed in range(3):
+        BacktestEngine(prices, seed=seed).run(decider, agent=agent, cache=cache)
+    assert os.listdir(cache.root) == []
+    cache.max_bytes = 10**9
+    for seed in range(3):
+        BacktestEngine(prices, seed=seed).run(decider, agent=agent, cache=cache)
+    assert len(os.listdir(cache.root)) == 3
+    cache.clear()
+    assert os.listdir(cache.root) == []
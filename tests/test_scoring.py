@@ -0,0 +1,82 @@
+# tests/test_scoring.py
+import asyncio
+import pytest
+from agent_lab import metrics
+from agent_lab.agents.base import Action
+from agent_lab.agents.registry import get_agent
+from agent_lab.api.scoring import ScoringService
+
+@pytest.fixture
+def service(fundamentals):
+    calls = []
+    def loader(symbols):
+        calls.append(list(symbols))
+        return fundamentals.loc[fundamentals.index.intersection(symbols)]
+    svc = ScoringService({"buffett": get_agent("buffett"), "cathie": get_agent("cathie")}, loader=loader, max_wait=0.05)
+    svc.calls = calls
+    metrics.reset()
+    yield svc
+    svc.close()
+
+def _rows(batch):
+    return [(d.symbol, d.action, d.confidence, d.score) for d in batch]
+
+def test_concurrent_requests_share_one_batch(service, fundamentals):
+    symbols = list(fundamentals.index)
+    requests = [symbols[:5], symbols[3:9], [symbols[0], "NOPE", symbols[12]]]
+
+    async def main():
+        return await asyncio.gather(*(service.score("buffett", r) for r in requests))
+
+    batches = asyncio.run(main())
+    union = list(dict.fromkeys(s for r in requests for s in r))
+    assert service.calls == [union]
+    counters = metrics.summary()["counters"]
+    assert counters["scoring_batches_total[agent=buffett]"] == 1
+    assert counters["scoring_requests_total[agent=buffett]"] == 3
+    # each caller gets its own symbols, in its own order, as if scored alone
+    for r, batch in zip(requests, batches):
+        assert _rows(batch) == _rows(service.score_sync("buffett", r))
+    assert batches[2].get("NOPE").action == Action.HOLD
+    assert service.calls == [union]     # the store answered score_sync
+
+def test_batches_flush_early_and_per_agent(service, fundamentals):
+    symbols = list(fundamentals.index)
+    service.max_batch = 4
+
+    async def main():
+        return await asyncio.gather(service.score("buffett", symbols[:2]), service.score("buffett", symbols[2:4]),
+                                    service.score("buffett", symbols[4:5]), service.score("cathie", symbols[:2]))
+
+    asyncio.run(main())
+    counters = metrics.summary()["counters"]
+    assert counters["scoring_batches_total[agent=buffett]"] == 2
+    assert counters["scoring_batches_total[agent=cathie]"] == 1
+    with pytest.raises(KeyError):
+        asyncio.run(service.score("nobody", symbols[:1]))
+
+def test_loader_errors_reach_every_caller(fundamentals):
+    def loader(symbols):
+        raise RuntimeError("vendor down")
+    service = ScoringService({"buffett": get_agent("buffett")}, loader=loader)
+
+    async def main():
+        return await asyncio.gather(service.score("buffett", ["A"]), service.score("buffett", ["B"]),
+                                    return_exceptions=True)
+
+    assert [str(e) for e in asyncio.run(main())] == ["vendor down", "vendor down"]
+    service.close()
+
+def test_store_updates_in_place_and_survives_restarts(service, fundamentals):
+    symbols = list(fundamentals.index[:3])
+    service.update({symbols[0]: None})
+    frame = service.fundamentals(symbols + ["NOPE"])
+    assert list(frame.index) == symbols[1:]
+    assert service.calls == [symbols[1:] + ["NOPE"]]
+    service.fundamentals(symbols + ["NOPE"])
+    assert len(service.calls) == 1     # rows and "no data" both stay in the store
+
+    # the API closes the service on shutdown; a restarted app scores again
+    first = _rows(asyncio.run(service.score("buffett", symbols)))
+    service.close()
+    assert _rows(asyncio.run(service.score("buffett", symbols))) == first
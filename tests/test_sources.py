@@ -0,0 +1,83 @@
+# tests/test_sources.py
+import pandas as pd
+import pytest
+from agent_lab.data_connectors import cache
+from agent_lab.data_connectors.sources import (
+    MissingRecording, RecordingSource, ReplaySource, SyntheticSource, data_source_from_spec, use_data_source,
+)
+
+def test_synthetic_responses_depend_only_on_seed_and_symbol():
+    small, large = SyntheticSource(3, 1), SyntheticSource(50, 1)
+    # generated in a different order, by a source with a different universe size
+    for s in reversed(small.universe()):
+        assert large.company_basic_financials(s) == small.company_basic_financials(s)
+        assert large.stock_insider_transactions(s) == small.stock_insider_transactions(s)
+        pd.testing.assert_frame_equal(large.price_history(s), small.price_history(s))
+    assert SyntheticSource(3, 1, seed=1).company_profile2("SYN0000") != small.company_profile2("SYN0000")
+    with pytest.raises(MissingRecording):
+        small.company_profile2("SYN0003")
+    with pytest.raises(MissingRecording):
+        small.price_history("AAPL")
+
+def test_synthetic_price_windows():
+    source = SyntheticSource(2, 2)
+    full = source.price_history("SYN0001")
+    assert len(full) == 2 * 252 and full.index[-1] == source.end
+    six = source.price_history("SYN0001", period="6mo")
+    pd.testing.assert_frame_equal(six, full.loc[full.index >= source.end - pd.DateOffset(months=6)])
+    window = source.price_history("SYN0001", start="2024-03-01", end="2024-03-31")
+    assert window.index.min() >= pd.Timestamp("2024-03-01") and window.index.max() <= pd.Timestamp("2024-03-31")
+    # a session's intraday bars don't depend on the window asked for
+    day = source.price_history("SYN0001", start="2024-06-03", end="2024-06-03", interval="15m")
+    month = source.price_history("SYN0001", start="2024-06-01", end="2024-06-30", interval="15m")
+    pd.testing.assert_frame_equal(month.loc[day.index], day)
+    assert day["Close"].iloc[-1] == pytest.approx(full.loc["2024-06-03", "Close"])
+
+def test_record_then_replay_round_trip(tmp_path, monkeypatch):
+    inner = SyntheticSource(3, 1)
+    recorder = RecordingSource(inner, str(tmp_path / "rec"))
+    for s in inner.universe():
+        recorder.company_profile2(s)
+        recorder.company_basic_financials(s)
+        recorder.stock_insider_transactions(s)
+        recorder.price_history(s, start="2024-07-01")
+        recorder.price_history(s, end="2024-03-01")
+    recorder.ticker_info("SYN0000")
+
+    monkeypatch.setenv("AGENT_LAB_OFFLINE", "1")  # replay never needs the network
+    replay = ReplaySource.from_root(str(tmp_path / "rec"))
+    assert replay.universe() == inner.universe()
+    for s in inner.universe():
+        assert replay.company_profile2(s) == inner.company_profile2(s)
+        assert replay.company_basic_financials(s) == inner.company_basic_financials(s)
+        assert replay.stock_insider_transactions(s)["data"] == inner.stock_insider_transactions(s)["data"]
+        # both recorded windows, merged
+        recorded = pd.concat([inner.price_history(s, end="2024-03-01"), inner.price_history(s, start="2024-07-01")])
+        pd.testing.assert_frame_equal(replay.price_history(s), recorded, check_freq=False)
+        pd.testing.assert_frame_equal(replay.price_history(s, start="2024-07-01"),
+                                      inner.price_history(s, start="2024-07-01"), check_freq=False)
+    assert replay.ticker_info("SYN0000")["longName"] == inner.ticker_info("SYN0000")["longName"]
+    with pytest.raises(MissingRecording):
+        replay.ticker_info("SYN0001")
+    with pytest.raises(MissingRecording):
+        replay.company_profile2("AAPL")
+
+    with use_data_source(inner):
+        expected = cache.get_fundamentals("SYN0002")
+    cache.clear_cache()  # a recording shares its inner source's cache key
+    with use_data_source(RecordingSource(inner, str(tmp_path / "again"))):
+        assert cache.get_fundamentals("SYN0002") == pytest.approx(expected, nan_ok=True)
+    with use_data_source(replay):
+        replayed = cache.get_fundamentals("SYN0002")
+    # a replay's insider window ends today, not at the synthetic source's as_of
+    insider = ("recent_insider_buy", "recent_insider_sell")
+    assert {k: v for k, v in replayed.items() if k not in insider} == \
+        pytest.approx({k: v for k, v in expected.items() if k not in insider}, nan_ok=True)
+
+def test_specs():
+    assert isinstance(data_source_from_spec("synthetic:7:2:3"), SyntheticSource)
+    assert data_source_from_spec("synthetic:7:2:3").key == SyntheticSource(7, 2, 3).key
+    assert data_source_from_spec("replay:rec").fundamentals_dir.endswith("rec/fundamentals")
+    assert data_source_from_spec("record:rec").root == "rec"
+    with pytest.raises(ValueError):
+        data_source_from_spec("bogus")
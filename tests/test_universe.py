@@ -0,0 +1,18 @@
+# tests/test_universe.py
+import pytest
+from agent_lab.data_connectors.universe import load_universe
+
+@pytest.mark.parametrize("text", [
+    "AAPL\nmsft\n\n# a comment\nAAPL  # again\nnvda\n",
+    "symbol\nAAPL\nMSFT\nNVDA\n",                     # single-column CSV with a header
+    "Ticker\nAAPL\nMSFT\nNVDA\n",
+    "ticker,name\nAAPL,Apple\nMSFT,Microsoft\nNVDA,Nvidia\n",
+    "name,Symbol,sector\nApple,AAPL,Tech\nMicrosoft,MSFT,Tech\nNvidia,NVDA,Tech\n",
+    "AAPL,Apple\nMSFT,Microsoft\nNVDA,Nvidia\n",      # no header: the first column
+    '"symbol","name"\n"AAPL","Apple"\n"MSFT","Microsoft"\n"NVDA","Nvidia"\n',
+])
+def test_universe_shapes(tmp_path, text):
+    path = tmp_path / "universe.csv"
+    path.write_text(text)
+    symbols = load_universe(str(path))
+    assert symbols == ["AAPL", "MSFT", "NVDA"]
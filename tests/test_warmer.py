@@ -0,0 +1,57 @@
+# tests/test_warmer.py
+import pytest
+from agent_lab import metrics
+from agent_lab.data_connectors import cache
+from agent_lab.data_connectors.warmer import AccessTracker, CacheWarmer
+
+def warmer(symbols, **kwargs):
+    return CacheWarmer(universe=symbols, calls_per_min=1e6, prices=False, tracker=AccessTracker(), **kwargs)
+
+def failures() -> float:
+    return metrics.summary()["counters"].get("warm_failures_total[what=fundamentals]", 0.0)
+
+def test_failed_refreshes_are_counted_as_failures(live_like):
+    ok, bad = live_like.universe()[:2]
+    live_like.failing.add(bad)
+    before = failures()
+    assert warmer([ok, bad]).run_once()["fundamentals"] == 1
+    assert failures() == before + 1
+    assert cache.fundamentals_state(ok) == cache.FRESH and cache.fundamentals_state(bad) == cache.FAILED
+
+    # the next pass leaves the failed symbol alone for the negative-cache delay
+    assert warmer([ok, bad]).run_once()["fundamentals"] == 0
+    assert live_like.fetches == {ok: 1, bad: 1}
+
+def test_failed_refresh_of_a_cached_symbol_keeps_serving_it(live_like):
+    sym = live_like.universe()[0]
+    every_pass = warmer([sym], refresh_ahead=0.0)
+    assert every_pass.run_once()["fundamentals"] == 1
+    row = cache.get_fundamentals(sym)
+    live_like.failing.add(sym)
+    before = failures()
+    assert every_pass.run_once()["fundamentals"] == 0
+    assert failures() == before + 1
+    assert cache.fundamentals_state(sym) == cache.STALE
+    assert cache.get_fundamentals(sym) == row
+
+def test_hottest_and_then_oldest_symbols_are_refreshed_first():
+    tracker = AccessTracker(half_life=3600)
+    for sym, hits in (("A", 1), ("B", 3), ("C", 2)):
+        for _ in range(hits):
+            tracker.record(sym)
+    w = CacheWarmer(universe=["D", "E"], tracker=tracker)
+    ages = {"A": None, "B": 90_000.0, "C": 10.0, "D": 100_000.0, "E": None}
+    # C is fresh; the rest are due, by access score and then age (missing counts as oldest)
+    assert w.due(ages.get, ttl=86_400) == ["B", "A", "E", "D"]
+
+def test_access_scores_decay_and_cold_symbols_are_pruned():
+    tracker = AccessTracker(half_life=100.0, prune_below=0.1, max_symbols=10)
+    tracker.record("A", now=0.0)
+    tracker.record("A", now=0.0)
+    tracker.record("B", now=0.0)
+    assert tracker.score("A", now=100.0) == pytest.approx(1.0)
+    assert tracker.symbols(now=400.0) == ["A"]         # B has decayed to 1/16 by now
+    for i in range(20):
+        tracker.record(f"S{i}", now=400.0 + i)
+    assert len(tracker.symbols(now=420.0)) <= 10
+    assert "S19" in tracker.symbols(now=420.0)